@@ -1,18 +1,11 @@
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
 from datetime import datetime, date
 import os
 import sys
 import traceback
 
-# 기본 라이브러리 import
-try:
-    import numpy as np
-except ImportError:
-    st.error("numpy 라이브러리가 필요합니다.")
-    st.stop()
-
 # 모듈 import - 단계별로 시도
 modules_loaded = False
 try:
@@ -32,6 +25,10 @@ try:
     from modules.export_utils import ExportManager
     st.success("✅ ExportManager 로드 완료")
     
+    from modules.profiling import profiler
+    from modules.bulk_import import preview_import, import_months
+    from modules.serialization import loads
+    
     modules_loaded = True
     st.success("🎉 모든 모듈이 성공적으로 로드되었습니다!")
     
@@ -445,15 +442,34 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# 프로세스 전체에서 공유하는 컴포넌트 (모든 브라우저 세션이 같은 인스턴스 사용)
+@st.cache_resource
+def get_data_manager():
+    """공유 DataManager - 데이터는 프로세스당 한 번만 로드되고 저장 즉시 모든 세션에 반영"""
+    with profiler.measure("startup.data_manager"):
+        return DataManager(backend=os.environ.get("RTB_STORAGE_BACKEND", "journal"),
+                           year_partitions=True, write_delay=0.25)
+
+@st.cache_resource
+def get_report_generator():
+    """공유 ReportGenerator - 월 데이터 저장 시 해당 기간의 캐시된 보고서를 무효화"""
+    report_generator = ReportGenerator()
+    get_data_manager().add_change_listener(report_generator.invalidate_month)
+    return report_generator
+
+@st.cache_resource
+def get_viz_manager():
+    return VisualizationManager(categories=get_data_manager().categories)
+
+@st.cache_resource
+def get_export_manager():
+    return ExportManager(categories=get_data_manager().categories)
+
 # 세션 상태 초기화
-if 'data_manager' not in st.session_state:
-    st.session_state.data_manager = DataManager()
-if 'report_generator' not in st.session_state:
-    st.session_state.report_generator = ReportGenerator()
-if 'viz_manager' not in st.session_state:
-    st.session_state.viz_manager = VisualizationManager()
-if 'export_manager' not in st.session_state:
-    st.session_state.export_manager = ExportManager()
+st.session_state.data_manager = get_data_manager()
+st.session_state.report_generator = get_report_generator()
+st.session_state.viz_manager = get_viz_manager()
+st.session_state.export_manager = get_export_manager()
 
 def check_admin_access():
     """관리자 인증 확인"""
@@ -558,7 +574,11 @@ def main():
         today = date.today()
         st.markdown(f"**오늘 날짜:** {today.strftime('%Y년 %m월 %d일')}")
     
-    # 메뉴별 페이지 라우팅
+    # 메뉴별 페이지 라우팅 (페이지별 렌더링 시간 기록)
+    with profiler.measure(f"page.{menu}"):
+        show_page(menu, is_admin)
+
+def show_page(menu, is_admin):
     if menu == "📝 데이터 입력":
         if is_admin:
             show_data_input()
@@ -597,16 +617,8 @@ def show_data_input():
     # 기존 데이터 로드
     existing_data = st.session_state.data_manager.get_month_data(month_key)
     
-    # 초기화
-    if 'revenue_sources' not in st.session_state:
-        st.session_state.revenue_sources = {
-            'electronic_tax': ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"],
-            'zero_rated': ["Everllence LEO", "Mitsui"],
-            'other': ["기타"]
-        }
-    
-    if 'expense_items' not in st.session_state:
-        st.session_state.expense_items = ["급여", "수당", "법인카드 사용액", "전자세금계산서", "세금", "이자", "퇴직금", "기타"]
+    # 매출처/매입 항목 분류 (설정 메뉴에서 관리, 모든 세션이 공유)
+    categories = st.session_state.data_manager.categories
     
     # 안내 메시지
     st.info("**매출처/매입처 수정**: '설정' 메뉴에서 매출처와 매입처를 추가/삭제할 수 있습니다.")
@@ -621,7 +633,7 @@ def show_data_input():
         # 전자세금계산서매출
         st.markdown("**전자세금계산서매출**")
         electronic_total = 0
-        for source in st.session_state.revenue_sources['electronic_tax']:
+        for source in categories.revenue_sources('전자세금계산서'):
             current_value = existing_data.get('매출', {}).get(source, 0)
             value = st.number_input(f"{source}", value=current_value, min_value=0, step=1000000, key=f"electronic_{source}")
             revenue_data[source] = value
@@ -631,21 +643,18 @@ def show_data_input():
         # 영세매출
         st.markdown("**영세매출**")
         zero_total = 0
-        for source in st.session_state.revenue_sources['zero_rated']:
+        for source in categories.revenue_sources('영세'):
             current_value = existing_data.get('매출', {}).get(source, 0)
             value = st.number_input(f"{source}", value=current_value, min_value=0, step=1000000, key=f"zero_{source}")
-            if source == "Mitsui" and source in revenue_data:
-                revenue_data[source] += value
-            else:
-                revenue_data[source] = value
+            revenue_data[source] = value
             zero_total += value
         st.info(f"소계: {zero_total:,}원")
         
         # 기타 매출
         st.markdown("**기타 매출**")
-        current_other = existing_data.get('매출', {}).get("기타", 0)
-        other_revenue = st.number_input("기타", value=current_other, min_value=0, step=1000000, key="other_revenue")
-        revenue_data["기타"] = other_revenue
+        for source in categories.revenue_sources('기타'):
+            current_value = existing_data.get('매출', {}).get(source, 0)
+            revenue_data[source] = st.number_input(f"{source}", value=current_value, min_value=0, step=1000000, key=f"other_{source}")
         
         total_revenue = sum(revenue_data.values())
         st.markdown(f'<div style="background-color: #f0f2f6; padding: 1rem; border-radius: 0.5rem; border-left: 4px solid red;"><h4 style="margin: 0;">총 매출: <span style="color: red !important;">{total_revenue:,}원</span></h4></div>', unsafe_allow_html=True)
@@ -654,7 +663,7 @@ def show_data_input():
         st.subheader("매입")
         expense_data = {}
         
-        for item in st.session_state.expense_items:
+        for item in categories.expense_items():
             current_value = existing_data.get('매입', {}).get(item, 0)
             value = st.number_input(f"{item}", value=current_value, min_value=0, step=100000, key=f"expense_{item}")
             expense_data[item] = value
@@ -734,16 +743,19 @@ def show_monthly_report():
     with col1:
         st.subheader("매출 현황")
         
+        # 분류별 소계/총계는 저장 시 계산된 값 사용
+        categories = st.session_state.data_manager.categories
+        subtotals = categories.subtotals(data)
+        
         # 전자세금계산서매출 카드
-        electronic_tax_sources = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"]
-        electronic_total = 0
+        electronic_tax_sources = categories.revenue_sources('전자세금계산서')
+        electronic_total = subtotals['전자세금계산서매출']
         electronic_items = []
         
         for source in electronic_tax_sources:
             amount = data['매출'].get(source, 0)
             if amount > 0:  # 0원이 아닌 경우만 표시
                 electronic_items.append(f'<div style="display: flex; justify-content: space-between; padding: 0.3rem 0; border-bottom: 1px solid #e9ecef;"><span>{source}</span><span style="font-weight: 600;">{amount:,}원</span></div>')
-                electronic_total += amount
         
         electronic_content = ''.join(electronic_items) if electronic_items else '<div style="text-align: center; color: #6c757d;">데이터 없음</div>'
         
@@ -760,15 +772,14 @@ def show_monthly_report():
         ''', unsafe_allow_html=True)
         
         # 영세매출 카드
-        zero_rated_sources = ["Everllence LEO", "Mitsui"]
-        zero_total = 0
+        zero_rated_sources = categories.revenue_sources('영세')
+        zero_total = subtotals['영세매출']
         zero_items = []
         
         for source in zero_rated_sources:
             amount = data['매출'].get(source, 0)
             if amount > 0:  # 0원이 아닌 경우만 표시
                 zero_items.append(f'<div style="display: flex; justify-content: space-between; padding: 0.3rem 0; border-bottom: 1px solid #e9ecef;"><span>{source}</span><span style="font-weight: 600;">{amount:,}원</span></div>')
-                zero_total += amount
         
         zero_content = ''.join(zero_items) if zero_items else '<div style="text-align: center; color: #6c757d;">데이터 없음</div>'
         
@@ -785,8 +796,12 @@ def show_monthly_report():
         ''', unsafe_allow_html=True)
         
         # 기타매출 카드
-        other_amount = data['매출'].get("기타", 0)
-        other_content = f'<div style="display: flex; justify-content: space-between; padding: 0.3rem 0;"><span>기타</span><span style="font-weight: 600;">{other_amount:,}원</span></div>' if other_amount > 0 else '<div style="text-align: center; color: #6c757d;">데이터 없음</div>'
+        other_items = []
+        for source in categories.revenue_sources('기타'):
+            amount = data['매출'].get(source, 0)
+            if amount > 0:  # 0원이 아닌 경우만 표시
+                other_items.append(f'<div style="display: flex; justify-content: space-between; padding: 0.3rem 0;"><span>{source}</span><span style="font-weight: 600;">{amount:,}원</span></div>')
+        other_content = ''.join(other_items) if other_items else '<div style="text-align: center; color: #6c757d;">데이터 없음</div>'
         
         st.markdown(f'''
         <div style="background: #f8f9fa; padding: 1.2rem; border-radius: 8px; border-left: 4px solid #6c757d; margin-bottom: 1rem;">
@@ -798,7 +813,7 @@ def show_monthly_report():
         ''', unsafe_allow_html=True)
         
         # 매출 총계
-        total_revenue = sum(data['매출'].values())
+        total_revenue = subtotals['총매출']
         st.markdown(f'''
         <div style="background: white; border: 3px solid #6c757d; padding: 1.5rem; border-radius: 8px; margin-top: 1rem;">
             <h3 style="margin: 0; text-align: center; font-size: 1.4rem; font-weight: 700;">
@@ -828,7 +843,7 @@ def show_monthly_report():
         ''', unsafe_allow_html=True)
         
         # 매입 총계
-        total_expense = sum(data['매입'].values())
+        total_expense = subtotals['총매입']
         st.markdown(f'''
         <div style="background: white; border: 3px solid #6c757d; padding: 1.5rem; border-radius: 8px; margin-top: 1rem;">
             <h3 style="margin: 0; text-align: center; font-size: 1.4rem; font-weight: 700;">
@@ -837,8 +852,8 @@ def show_monthly_report():
         </div>
         ''', unsafe_allow_html=True)
     
-    # 순이익 계산
-    net_profit = total_revenue - total_expense
+    # 순이익
+    net_profit = subtotals['순이익']
     st.markdown("---")
     profit_color = "red" if net_profit >= 0 else "blue"
     
@@ -869,29 +884,27 @@ def show_monthly_report():
     
     with col1:
         if st.button("📄 PDF", key="monthly_pdf", use_container_width=True):
-            pdf_file = st.session_state.export_manager.generate_pdf_report(report, f"RTB_{year}년_{month}월_월말보고서")
-            with open(pdf_file, "rb") as file:
-                st.download_button(
-                    label="다운로드",
-                    data=file.read(),
-                    file_name=f"RTB_{year}년_{month}월_월말보고서.pdf",
-                    mime="application/pdf",
-                    key="monthly_pdf_download",
-                    use_container_width=True
-                )
+            pdf_bytes = st.session_state.export_manager.render_pdf_bytes(report)
+            st.download_button(
+                label="다운로드",
+                data=pdf_bytes,
+                file_name=f"RTB_{year}년_{month}월_월말보고서.pdf",
+                mime="application/pdf",
+                key="monthly_pdf_download",
+                use_container_width=True
+            )
     
     with col2:
         if st.button("📊 Excel", key="monthly_excel", use_container_width=True):
-            excel_file = st.session_state.export_manager.generate_excel_report(data, f"RTB_{year}년_{month}월_월말보고서")
-            with open(excel_file, "rb") as file:
-                st.download_button(
-                    label="다운로드",
-                    data=file.read(),
-                    file_name=f"RTB_{year}년_{month}월_월말보고서.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    key="monthly_excel_download",
-                    use_container_width=True
-                )
+            excel_bytes = st.session_state.export_manager.render_excel_bytes(data)
+            st.download_button(
+                label="다운로드",
+                data=excel_bytes,
+                file_name=f"RTB_{year}년_{month}월_월말보고서.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="monthly_excel_download",
+                use_container_width=True
+            )
 
 def show_semi_annual_report():
     st.header("반기 보고서")
@@ -911,20 +924,16 @@ def show_semi_annual_report():
         period_name = "하반기"
     
     # 데이터 수집 및 집계
-    all_data = st.session_state.data_manager.get_all_data()
-    period_data = {}
-    
-    for month in months:
-        month_key = f"{year}-{month:02d}"
-        if month_key in all_data:
-            period_data[month_key] = all_data[month_key]
+    period_data = st.session_state.data_manager.get_period_data(year, months[0], months[-1])
     
     if not period_data:
         st.info("**데이터 입력 안내**: '데이터 입력' 메뉴에서 월별 데이터를 입력하면 자동으로 반기 보고서에 반영됩니다.")
         return
     
-    # 반기 집계
-    semi_annual_summary = st.session_state.data_manager.aggregate_period_data(period_data)
+    # 반기 집계 (저장 시 증분 갱신되는 집계 캐시에서 조회)
+    half_index = 1 if period_name == "상반기" else 2
+    semi_annual_summary = st.session_state.data_manager.get_rollup('half', year, half_index)
+    semi_annual_totals = st.session_state.data_manager.get_rollup_totals('half', year, half_index)
     
     st.markdown("---")
     
@@ -949,8 +958,8 @@ def show_semi_annual_report():
     # 요약 정보
     col1, col2, col3 = st.columns(3)
     
-    total_revenue = sum(semi_annual_summary['매출'].values())
-    total_expense = sum(semi_annual_summary['매입'].values())
+    total_revenue = semi_annual_totals['매출']
+    total_expense = semi_annual_totals['매입']
     net_profit = total_revenue - total_expense
     
     with col1:
@@ -986,8 +995,9 @@ def show_semi_annual_report():
         st.subheader("매출처별 집계")
         
         # 매출처를 카테고리별로 분류하여 표시
-        electronic_tax_sources = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"]
-        zero_rated_sources = ["Everllence LEO", "Mitsui"]
+        categories = st.session_state.data_manager.categories
+        electronic_tax_sources = categories.revenue_sources('전자세금계산서')
+        zero_rated_sources = categories.revenue_sources('영세')
         
         # 전자세금계산서매출 집계
         electronic_total = 0
@@ -1034,13 +1044,19 @@ def show_semi_annual_report():
             ''', unsafe_allow_html=True)
         
         # 기타매출 집계
-        other_amount = semi_annual_summary['매출'].get("기타", 0)
+        other_amount = 0
+        other_items = []
+        for source in categories.revenue_sources('기타'):
+            amount = semi_annual_summary['매출'].get(source, 0)
+            if amount > 0:
+                other_items.append(f'<div style="display: flex; justify-content: space-between; padding: 0.2rem 0;"><span style="font-size: 0.9rem;">{source}</span><span style="font-weight: 600; font-size: 0.9rem;">{amount:,}원</span></div>')
+                other_amount += amount
         if other_amount > 0:
             st.markdown(f'''
             <div style="background: #f8f9fa; padding: 1rem; border-radius: 6px; margin-bottom: 1rem; border-left: 3px solid #6c757d;">
                 <h5 style="margin: 0 0 0.5rem 0; color: #2c3e50; font-weight: 600;">기타매출</h5>
                 <div style="background: white; padding: 0.8rem; border-radius: 4px; margin-bottom: 0.5rem;">
-                    <div style="display: flex; justify-content: space-between; padding: 0.2rem 0;"><span style="font-size: 0.9rem;">기타</span><span style="font-weight: 600; font-size: 0.9rem;">{other_amount:,}원</span></div>
+                    {''.join(other_items)}
                 </div>
                 <div style="text-align: right; font-size: 1.1rem; font-weight: 700; color: red;">
                     소계: {other_amount:,}원
@@ -1063,32 +1079,31 @@ def show_semi_annual_report():
         if st.button("📄 PDF", key="semi_pdf", use_container_width=True):
             report_data = {
                 'period': f"{year}년 {period_name}",
+                'generated_at': datetime.now().isoformat(),
                 'summary': semi_annual_summary,
                 'months_data': period_data
             }
-            pdf_file = st.session_state.export_manager.generate_pdf_report(report_data, f"RTB_{year}년_{period_name}_보고서")
-            with open(pdf_file, "rb") as file:
-                st.download_button(
-                    label="다운로드",
-                    data=file.read(),
-                    file_name=f"RTB_{year}년_{period_name}_보고서.pdf",
-                    mime="application/pdf",
-                    key="semi_pdf_download",
-                    use_container_width=True
-                )
+            pdf_bytes = st.session_state.export_manager.render_pdf_bytes(report_data)
+            st.download_button(
+                label="다운로드",
+                data=pdf_bytes,
+                file_name=f"RTB_{year}년_{period_name}_보고서.pdf",
+                mime="application/pdf",
+                key="semi_pdf_download",
+                use_container_width=True
+            )
     
     with col2:
         if st.button("📊 Excel", key="semi_excel", use_container_width=True):
-            excel_file = st.session_state.export_manager.generate_excel_report(semi_annual_summary, f"RTB_{year}년_{period_name}_보고서")
-            with open(excel_file, "rb") as file:
-                st.download_button(
-                    label="다운로드",
-                    data=file.read(),
-                    file_name=f"RTB_{year}년_{period_name}_보고서.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    key="semi_excel_download",
-                    use_container_width=True
-                )
+            excel_bytes = st.session_state.export_manager.render_excel_bytes(semi_annual_summary)
+            st.download_button(
+                label="다운로드",
+                data=excel_bytes,
+                file_name=f"RTB_{year}년_{period_name}_보고서.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="semi_excel_download",
+                use_container_width=True
+            )
 
 def show_annual_report():
     st.header("연말 보고서")
@@ -1096,21 +1111,16 @@ def show_annual_report():
     year = st.selectbox("년도", list(range(2020, 2030)), index=5, key="annual_year")
     
     # 연간 데이터 수집
-    all_data = st.session_state.data_manager.get_all_data()
-    annual_data = {}
-    
-    for month in range(1, 13):
-        month_key = f"{year}-{month:02d}"
-        if month_key in all_data:
-            annual_data[month_key] = all_data[month_key]
+    annual_data = st.session_state.data_manager.get_period_data(year, 1, 12)
     
     if not annual_data:
         st.warning(f"{year}년 데이터가 없습니다.")
         st.info("**데이터 입력 안내**: '데이터 입력' 메뉴에서 월별 데이터를 입력하면 자동으로 연말 보고서에 반영됩니다.")
         return
     
-    # 연간 집계
-    annual_summary = st.session_state.data_manager.aggregate_period_data(annual_data)
+    # 연간 집계 (저장 시 증분 갱신되는 집계 캐시에서 조회)
+    annual_summary = st.session_state.data_manager.get_rollup('year', year)
+    annual_totals = st.session_state.data_manager.get_rollup_totals('year', year)
     
     st.markdown("---")
     
@@ -1129,8 +1139,8 @@ def show_annual_report():
     st.markdown("---")
     
     # 핵심 지표 (큰 숫자로 강조)
-    total_revenue = sum(annual_summary['매출'].values())
-    total_expense = sum(annual_summary['매입'].values())
+    total_revenue = annual_totals['매출']
+    total_expense = annual_totals['매입']
     net_profit = total_revenue - total_expense
     
     col1, col2, col3 = st.columns(3)
@@ -1174,8 +1184,9 @@ def show_annual_report():
         st.markdown("#### 매출 세부 내역")
         
         # 매출처를 카테고리별로 분류하여 표시
-        electronic_tax_sources = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"]
-        zero_rated_sources = ["Everllence LEO", "Mitsui"]
+        categories = st.session_state.data_manager.categories
+        electronic_tax_sources = categories.revenue_sources('전자세금계산서')
+        zero_rated_sources = categories.revenue_sources('영세')
         
         # 전자세금계산서매출 집계
         electronic_total = 0
@@ -1222,13 +1233,19 @@ def show_annual_report():
             ''', unsafe_allow_html=True)
         
         # 기타매출 집계
-        other_amount = annual_summary['매출'].get("기타", 0)
+        other_amount = 0
+        other_items = []
+        for source in categories.revenue_sources('기타'):
+            amount = annual_summary['매출'].get(source, 0)
+            if amount > 0:
+                other_items.append(f'<div style="display: flex; justify-content: space-between; padding: 0.15rem 0;"><span style="font-size: 0.85rem;">{source}</span><span style="font-weight: 600; font-size: 0.85rem;">{amount:,}원</span></div>')
+                other_amount += amount
         if other_amount > 0:
             st.markdown(f'''
             <div style="background: #f8f9fa; padding: 0.8rem; border-radius: 6px; margin-bottom: 0.8rem; border-left: 3px solid #6c757d;">
                 <h6 style="margin: 0 0 0.4rem 0; color: #2c3e50; font-weight: 600;">기타매출</h6>
                 <div style="background: white; padding: 0.6rem; border-radius: 4px; margin-bottom: 0.4rem;">
-                    <div style="display: flex; justify-content: space-between; padding: 0.15rem 0;"><span style="font-size: 0.85rem;">기타</span><span style="font-weight: 600; font-size: 0.85rem;">{other_amount:,}원</span></div>
+                    {''.join(other_items)}
                 </div>
                 <div style="text-align: right; font-size: 1rem; font-weight: 700; color: red;">
                     소계: {other_amount:,}원
@@ -1284,41 +1301,40 @@ def show_annual_report():
         if st.button("📄 PDF", key="annual_pdf", use_container_width=True):
             report_data = {
                 'period': f"{year}년",
+                'generated_at': datetime.now().isoformat(),
                 'summary': annual_summary,
                 'total_revenue': total_revenue,
                 'total_expense': total_expense,
                 'net_profit': net_profit,
                 'revenue_summary': revenue_summary
             }
-            pdf_file = st.session_state.export_manager.generate_pdf_report(report_data, f"RTB_{year}년_연말보고서")
-            with open(pdf_file, "rb") as file:
-                st.download_button(
-                    label="다운로드",
-                    data=file.read(),
-                    file_name=f"RTB_{year}년_연말보고서.pdf",
-                    mime="application/pdf",
-                    key="annual_pdf_download",
-                    use_container_width=True
-                )
+            pdf_bytes = st.session_state.export_manager.render_pdf_bytes(report_data)
+            st.download_button(
+                label="다운로드",
+                data=pdf_bytes,
+                file_name=f"RTB_{year}년_연말보고서.pdf",
+                mime="application/pdf",
+                key="annual_pdf_download",
+                use_container_width=True
+            )
     
     with col2:
         if st.button("📊 Excel", key="annual_excel", use_container_width=True):
-            excel_file = st.session_state.export_manager.generate_excel_report(annual_summary, f"RTB_{year}년_연말보고서")
-            with open(excel_file, "rb") as file:
-                st.download_button(
-                    label="다운로드",
-                    data=file.read(),
-                    file_name=f"RTB_{year}년_연말보고서.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    key="annual_excel_download",
-                    use_container_width=True
-                )
+            excel_bytes = st.session_state.export_manager.render_excel_bytes(annual_summary)
+            st.download_button(
+                label="다운로드",
+                data=excel_bytes,
+                file_name=f"RTB_{year}년_연말보고서.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="annual_excel_download",
+                use_container_width=True
+            )
 
 def show_settings():
     st.header("시스템 설정")
     
     # 탭으로 설정 메뉴 구분
-    tab1, tab2, tab3 = st.tabs(["매출처/매입처 관리", "데이터 관리", "시스템 정보"])
+    tab1, tab2, tab3, tab4 = st.tabs(["매출처/매입처 관리", "데이터 관리", "시스템 정보", "성능"])
     
     with tab1:
         st.subheader("매출처 및 매입처 관리")
@@ -1326,17 +1342,15 @@ def show_settings():
         # 매출처 관리
         st.markdown("#### 매출처 관리")
         
-        # 세션 상태에 매출처 정보가 없으면 기본값 설정
-        if 'revenue_sources' not in st.session_state:
-            st.session_state.revenue_sources = {
-                'electronic_tax': ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"],
-                'zero_rated': ["Everllence LEO", "Mitsui"],
-                'other': ["기타"]
-            }
+        # 분류 설정은 data/counterparties.json에 저장되어 모든 세션/화면이 공유
+        categories = st.session_state.data_manager.categories
+        
+        # 이름을 바꾼 거래처의 이전 이름은 기존 거래처로 연결되므로, 같은 이름의 새 거래처는 명시적으로 해제 후 추가
+        retire_alias = st.checkbox("이전 이름과 같은 이름은 새 거래처로 추가 (이전 이름 연결 해제)", key="retire_alias")
         
         # 전자세금계산서매출
         st.markdown("**전자세금계산서매출**")
-        electronic_tax_sources = st.session_state.revenue_sources['electronic_tax']
+        electronic_tax_sources = categories.revenue_sources('전자세금계산서')
         
         col1, col2 = st.columns([3, 1])
         with col1:
@@ -1344,9 +1358,13 @@ def show_settings():
         with col2:
             if st.button("추가", key="add_electronic"):
                 if new_electronic_source and new_electronic_source not in electronic_tax_sources:
-                    st.session_state.revenue_sources['electronic_tax'].append(new_electronic_source)
-                    st.success(f"'{new_electronic_source}' 추가됨")
-                    st.rerun()
+                    try:
+                        categories.add('매출', new_electronic_source, '전자세금계산서', retire_alias=retire_alias)
+                    except ValueError as e:
+                        st.error(f"추가 오류: {e}")
+                    else:
+                        st.success(f"'{new_electronic_source}' 추가됨")
+                        st.rerun()
         
         # 기존 전자세금계산서매출처 수정/삭제
         for i, source in enumerate(electronic_tax_sources):
@@ -1356,12 +1374,17 @@ def show_settings():
             with col2:
                 if st.button("수정", key=f"update_electronic_{i}"):
                     if new_name != source:
-                        st.session_state.revenue_sources['electronic_tax'][i] = new_name
-                        st.success(f"'{source}' → '{new_name}' 변경됨")
-                        st.rerun()
+                        try:
+                            # 거래처 테이블의 이름만 바꾸므로 기존 월 데이터도 새 이름으로 연결됨
+                            st.session_state.data_manager.rename_counterparty('매출', source, new_name)
+                        except ValueError as e:
+                            st.error(f"이름 변경 오류: {e}")
+                        else:
+                            st.success(f"'{source}' → '{new_name}' 변경됨")
+                            st.rerun()
             with col3:
                 if st.button("삭제", key=f"delete_electronic_{i}"):
-                    st.session_state.revenue_sources['electronic_tax'].remove(source)
+                    categories.remove('매출', source)
                     st.success(f"'{source}' 삭제됨")
                     st.rerun()
         
@@ -1369,7 +1392,7 @@ def show_settings():
         
         # 영세매출
         st.markdown("**영세매출**")
-        zero_rated_sources = st.session_state.revenue_sources['zero_rated']
+        zero_rated_sources = categories.revenue_sources('영세')
         
         col1, col2 = st.columns([3, 1])
         with col1:
@@ -1377,9 +1400,13 @@ def show_settings():
         with col2:
             if st.button("추가", key="add_zero"):
                 if new_zero_source and new_zero_source not in zero_rated_sources:
-                    st.session_state.revenue_sources['zero_rated'].append(new_zero_source)
-                    st.success(f"'{new_zero_source}' 추가됨")
-                    st.rerun()
+                    try:
+                        categories.add('매출', new_zero_source, '영세', retire_alias=retire_alias)
+                    except ValueError as e:
+                        st.error(f"추가 오류: {e}")
+                    else:
+                        st.success(f"'{new_zero_source}' 추가됨")
+                        st.rerun()
         
         # 기존 영세매출처 수정/삭제
         for i, source in enumerate(zero_rated_sources):
@@ -1389,12 +1416,17 @@ def show_settings():
             with col2:
                 if st.button("수정", key=f"update_zero_{i}"):
                     if new_name != source:
-                        st.session_state.revenue_sources['zero_rated'][i] = new_name
-                        st.success(f"'{source}' → '{new_name}' 변경됨")
-                        st.rerun()
+                        try:
+                            # 거래처 테이블의 이름만 바꾸므로 기존 월 데이터도 새 이름으로 연결됨
+                            st.session_state.data_manager.rename_counterparty('매출', source, new_name)
+                        except ValueError as e:
+                            st.error(f"이름 변경 오류: {e}")
+                        else:
+                            st.success(f"'{source}' → '{new_name}' 변경됨")
+                            st.rerun()
             with col3:
                 if st.button("삭제", key=f"delete_zero_{i}"):
-                    st.session_state.revenue_sources['zero_rated'].remove(source)
+                    categories.remove('매출', source)
                     st.success(f"'{source}' 삭제됨")
                     st.rerun()
         
@@ -1403,11 +1435,7 @@ def show_settings():
         # 매입처 관리
         st.markdown("#### 매입 항목 관리")
         
-        # 세션 상태에 매입 항목이 없으면 기본값 설정
-        if 'expense_items' not in st.session_state:
-            st.session_state.expense_items = ["급여", "수당", "법인카드 사용액", "전자세금계산서", "세금", "이자", "퇴직금", "기타"]
-        
-        expense_items = st.session_state.expense_items
+        expense_items = categories.expense_items()
         
         col1, col2 = st.columns([3, 1])
         with col1:
@@ -1415,9 +1443,13 @@ def show_settings():
         with col2:
             if st.button("추가", key="add_expense"):
                 if new_expense_item and new_expense_item not in expense_items:
-                    st.session_state.expense_items.append(new_expense_item)
-                    st.success(f"'{new_expense_item}' 추가됨")
-                    st.rerun()
+                    try:
+                        categories.add('매입', new_expense_item, retire_alias=retire_alias)
+                    except ValueError as e:
+                        st.error(f"추가 오류: {e}")
+                    else:
+                        st.success(f"'{new_expense_item}' 추가됨")
+                        st.rerun()
         
         # 기존 매입 항목 수정/삭제
         for i, item in enumerate(expense_items):
@@ -1427,17 +1459,22 @@ def show_settings():
             with col2:
                 if st.button("수정", key=f"update_expense_{i}"):
                     if new_name != item:
-                        st.session_state.expense_items[i] = new_name
-                        st.success(f"'{item}' → '{new_name}' 변경됨")
-                        st.rerun()
+                        try:
+                            # 거래처 테이블의 이름만 바꾸므로 기존 월 데이터도 새 이름으로 연결됨
+                            st.session_state.data_manager.rename_counterparty('매입', item, new_name)
+                        except ValueError as e:
+                            st.error(f"이름 변경 오류: {e}")
+                        else:
+                            st.success(f"'{item}' → '{new_name}' 변경됨")
+                            st.rerun()
             with col3:
                 if st.button("삭제", key=f"delete_expense_{i}"):
-                    st.session_state.expense_items.remove(item)
+                    categories.remove('매입', item)
                     st.success(f"'{item}' 삭제됨")
                     st.rerun()
         
         st.markdown("---")
-        st.warning("⚠️ 매출처나 매입처를 변경하면 기존 데이터와 일치하지 않을 수 있습니다. 변경 전 데이터를 백업하는 것을 권장합니다.")
+        st.info("ℹ️ 매출처/매입처 이름을 변경하면 기존 월 데이터도 새 이름으로 연결됩니다. 삭제는 입력 목록에서만 제외되며 기존 데이터는 유지됩니다.")
     
     with tab2:
         st.subheader("📊 데이터 관리")
@@ -1447,17 +1484,77 @@ def show_settings():
             backup_file = st.session_state.data_manager.backup_data()
             st.success(f"✅ 데이터가 백업되었습니다: {backup_file}")
         
+        # 전체 이력 내보내기 (행 단위 스트리밍 - 이력이 길어도 메모리 사용량 일정)
+        st.markdown("#### 📤 전체 이력 내보내기")
+        export_formats = {"Excel (.xlsx)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+                          "CSV (.csv)": ("csv", "text/csv"),
+                          "Parquet (.parquet)": ("parquet", "application/octet-stream")}
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            export_format = st.selectbox("형식", list(export_formats), key="history_export_format")
+        with col2:
+            st.write("")
+            generate_history = st.button("📤 생성", key="history_export", use_container_width=True)
+        if generate_history:
+            fmt, mime = export_formats[export_format]
+            try:
+                history_file = st.session_state.export_manager.export_backup_stream(
+                    st.session_state.data_manager, "RTB_전체이력", fmt)
+                with open(history_file, 'rb') as f:
+                    st.download_button(
+                        label="다운로드",
+                        data=f,
+                        file_name=f"RTB_전체이력_{datetime.now().strftime('%Y%m%d')}.{fmt}",
+                        mime=mime,
+                        key="history_export_download"
+                    )
+            except Exception as e:
+                st.error(f"❌ 내보내기 실패: {str(e)}")
+        
+        st.markdown("---")
+        
         # 데이터 복원
         uploaded_file = st.file_uploader("📥 백업 파일 업로드", type=['json'])
         if uploaded_file is not None:
             if st.button("🔄 데이터 복원"):
                 try:
-                    backup_data = json.load(uploaded_file)
+                    backup_data = loads(uploaded_file.read())
                     st.session_state.data_manager.restore_data(backup_data)
                     st.success("✅ 데이터가 복원되었습니다.")
                     st.rerun()
                 except Exception as e:
                     st.error(f"❌ 복원 실패: {str(e)}")
+        
+        st.markdown("---")
+        
+        # 여러 달 일괄 가져오기 (백업 Excel과 같은 긴 형식)
+        st.markdown("#### 📥 일괄 가져오기 (Excel/CSV)")
+        st.caption("열 구성: 년도, 월, 구분(매출/매입), 항목, 금액 - 백업 Excel의 '전체데이터' 시트와 같은 형식입니다. 파일에 포함된 월은 파일 내용으로 교체됩니다.")
+        import_file = st.file_uploader("📥 가져올 파일 업로드", type=['xlsx', 'csv'], key="bulk_import_file")
+        allow_new_items = st.checkbox("등록되지 않은 항목은 새 매출처/매입 항목으로 추가", key="bulk_import_allow_new")
+        if import_file is not None:
+            try:
+                preview = preview_import(import_file, import_file.name, st.session_state.data_manager, allow_new_items)
+            except Exception as e:
+                st.error(f"❌ 파일 읽기 실패: {str(e)}")
+            else:
+                months = preview['months']
+                if not preview['errors'].empty:
+                    st.error(f"❌ {len(preview['errors']):,}개 행에 오류가 있습니다. 수정 후 다시 업로드해주세요.")
+                    st.dataframe(preview['errors'], hide_index=True, use_container_width=True)
+                elif not months:
+                    st.warning("가져올 데이터가 없습니다.")
+                else:
+                    st.info(f"{preview['rows']:,}행, {len(months)}개월 ({min(months)} ~ {max(months)})")
+                    if preview['overwritten']:
+                        st.warning(f"기존 데이터가 있는 {len(preview['overwritten'])}개월은 파일 내용으로 교체됩니다: {', '.join(preview['overwritten'])}")
+                    if st.button("📥 일괄 저장", type="primary"):
+                        try:
+                            count = import_months(st.session_state.data_manager, months)
+                            st.success(f"✅ {count}개월 데이터가 저장되었습니다.")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ 일괄 저장 실패: {str(e)}")
     
     with tab3:
         # 시스템 정보
@@ -1470,6 +1567,56 @@ def show_settings():
         • 지원: 매출처별 분석, PDF/Excel 내보내기
         • 업데이트: 2025년 7월
         """)
+    
+    with tab4:
+        show_performance_stats()
+
+def show_performance_stats():
+    """구간별 실행 시간 통계 (관리자 전용)"""
+    if not st.session_state.get('is_admin'):
+        st.error("🔒 관리자만 접근 가능한 메뉴입니다.")
+        return
+    
+    st.subheader("구간별 실행 시간")
+    stats = profiler.snapshot()
+    if not stats:
+        st.info("아직 기록된 실행 시간이 없습니다.")
+    else:
+        stats_df = pd.DataFrame([
+            {
+                '구간': name,
+                '호출 횟수': stat['count'],
+                '누적(ms)': round(stat['total_seconds'] * 1000, 2),
+                '평균(ms)': round(stat['avg_seconds'] * 1000, 2),
+                '최대(ms)': round(stat['max_seconds'] * 1000, 2),
+                '최근(ms)': round(stat['last_seconds'] * 1000, 2),
+                '최근 데이터 크기': stat['payload_last']
+            }
+            for name, stat in stats.items()
+        ]).sort_values('누적(ms)', ascending=False)
+        st.dataframe(stats_df, hide_index=True, use_container_width=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            label="JSON 내보내기",
+            data=profiler.to_json(),
+            file_name="rtb_profile.json",
+            mime="application/json",
+            use_container_width=True
+        )
+    with col2:
+        st.download_button(
+            label="Prometheus 내보내기",
+            data=profiler.to_prometheus(),
+            file_name="rtb_profile.prom",
+            mime="text/plain",
+            use_container_width=True
+        )
+    with col3:
+        if st.button("기록 초기화", use_container_width=True):
+            profiler.reset()
+            st.rerun()
 
 def show_revenue_trend_comparison():
     st.header("업체별 매출변동 비교")
@@ -1485,30 +1632,16 @@ def show_revenue_trend_comparison():
         st.error("시작 연도가 종료 연도보다 클 수 없습니다.")
         return
     
-    # 전체 데이터 수집
-    all_data = st.session_state.data_manager.get_all_data()
-    
-    # 매출처별 연도별 데이터 집계
-    revenue_sources = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR", 
-                      "Everllence LEO", "Mitsui", "기타"]
+    # 연도 × 매출처 매출 큐브 (입력된 모든 매출처 포함, 데이터 1회 순회)
+    yearly_cube = st.session_state.data_manager.get_revenue_cube(start_year, end_year)
+    years = yearly_cube.index.tolist()
     
-    # 연도별 매출처별 데이터 구조: {year: {source: total_amount}}
-    yearly_data = {}
-    years = list(range(start_year, end_year + 1))
-    
-    for year in years:
-        yearly_data[year] = {source: 0 for source in revenue_sources}
-        
-        # 해당 연도의 모든 월 데이터 합계
-        for month in range(1, 13):
-            month_key = f"{year}-{month:02d}"
-            if month_key in all_data:
-                month_data = all_data[month_key].get('매출', {})
-                for source in revenue_sources:
-                    yearly_data[year][source] += month_data.get(source, 0)
+    # 0이 아닌 데이터가 있는 매출처만 사용
+    yearly_cube = yearly_cube.loc[:, (yearly_cube > 0).any(axis=0)]
+    revenue_sources = yearly_cube.columns.tolist()
     
     # 데이터가 있는지 확인
-    has_data = any(sum(yearly_data[year].values()) > 0 for year in years)
+    has_data = bool((yearly_cube.sum(axis=1) > 0).any())
     if not has_data:
         st.warning(f"{start_year}년부터 {end_year}년까지 매출 데이터가 없습니다.")
         st.info("**데이터 입력 안내**: '데이터 입력' 메뉴에서 월별 데이터를 입력하면 자동으로 반영됩니다.")
@@ -1540,19 +1673,15 @@ def show_revenue_trend_comparison():
     colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9', '#F8C471']
     
     for i, source in enumerate(revenue_sources):
-        amounts = [yearly_data[year][source] for year in years]
-        
-        # 0이 아닌 데이터가 있는 경우만 그래프에 추가
-        if any(amount > 0 for amount in amounts):
-            fig.add_trace(go.Scatter(
-                x=years,
-                y=amounts,
-                mode='lines+markers',
-                name=source,
-                line=dict(color=colors[i % len(colors)], width=3),
-                marker=dict(size=8, symbol='circle'),
-                hovertemplate=f'<b>{source}</b><br>연도: %{{x}}<br>매출: %{{y:,.0f}}원<extra></extra>'
-            ))
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=yearly_cube[source].tolist(),
+            mode='lines+markers',
+            name=source,
+            line=dict(color=colors[i % len(colors)], width=3),
+            marker=dict(size=8, symbol='circle'),
+            hovertemplate=f'<b>{source}</b><br>연도: %{{x}}<br>매출: %{{y:,.0f}}원<extra></extra>'
+        ))
     
     fig.update_layout(
         title='매출처별 연도별 매출 추이',
@@ -1580,28 +1709,20 @@ def show_revenue_trend_comparison():
     st.markdown("---")
     st.subheader("매출처별 요약 통계")
     
-    # 각 매출처별 통계 계산
-    summary_data = []
-    for source in revenue_sources:
-        amounts = [yearly_data[year][source] for year in years]
-        if any(amount > 0 for amount in amounts):
-            total = sum(amounts)
-            avg = total / len(years)
-            max_amount = max(amounts)
-            min_amount = min(amounts)
-            max_year = years[amounts.index(max_amount)]
-            min_year = years[amounts.index(min_amount)]
-            
-            summary_data.append({
-                '매출처': source,
-                '총 매출': f"{total:,}원",
-                '연평균': f"{avg:,.0f}원",
-                '최고매출': f"{max_amount:,}원 ({max_year}년)",
-                '최저매출': f"{min_amount:,}원 ({min_year}년)"
-            })
-    
-    if summary_data:
-        summary_df = pd.DataFrame(summary_data)
+    # 각 매출처별 통계 계산 (열 단위 벡터 연산)
+    totals = yearly_cube.sum(axis=0)
+    averages = totals / len(years)
+    max_amounts, max_years = yearly_cube.max(axis=0), yearly_cube.idxmax(axis=0)
+    min_amounts, min_years = yearly_cube.min(axis=0), yearly_cube.idxmin(axis=0)
+    
+    if revenue_sources:
+        summary_df = pd.DataFrame({
+            '매출처': revenue_sources,
+            '총 매출': [f"{v:,}원" for v in totals.tolist()],
+            '연평균': [f"{v:,.0f}원" for v in averages.tolist()],
+            '최고매출': [f"{v:,}원 ({y}년)" for v, y in zip(max_amounts.tolist(), max_years.tolist())],
+            '최저매출': [f"{v:,}원 ({y}년)" for v, y in zip(min_amounts.tolist(), min_years.tolist())]
+        })
         st.dataframe(summary_df, use_container_width=True, hide_index=True)
     
     # 매출 증감률 분석
@@ -1609,25 +1730,23 @@ def show_revenue_trend_comparison():
     st.subheader("전년 대비 매출 증감률")
     
     if len(years) > 1:
-        growth_data = []
-        for source in revenue_sources:
-            amounts = [yearly_data[year][source] for year in years]
-            if any(amount > 0 for amount in amounts):
-                for i in range(1, len(years)):
-                    prev_amount = amounts[i-1]
-                    curr_amount = amounts[i]
-                    if prev_amount > 0:
-                        growth_rate = ((curr_amount - prev_amount) / prev_amount) * 100
-                        growth_data.append({
-                            '매출처': source,
-                            '연도': f"{years[i-1]}→{years[i]}",
-                            '이전년도': f"{prev_amount:,}원",
-                            '해당년도': f"{curr_amount:,}원",
-                            '증감률': f"{growth_rate:+.1f}%"
-                        })
-        
-        if growth_data:
-            growth_df = pd.DataFrame(growth_data)
+        # 매출처 × 연도 행렬에서 전년/당해 값을 한 번에 비교 (전년 매출이 있는 경우만)
+        amounts = yearly_cube.to_numpy().T
+        prev_amounts, curr_amounts = amounts[:, :-1], amounts[:, 1:]
+        source_idx, year_idx = np.nonzero(prev_amounts > 0)
+        
+        if len(source_idx):
+            prev_values = prev_amounts[source_idx, year_idx]
+            curr_values = curr_amounts[source_idx, year_idx]
+            growth_rates = (curr_values - prev_values) / prev_values * 100
+            
+            growth_df = pd.DataFrame({
+                '매출처': [revenue_sources[i] for i in source_idx],
+                '연도': [f"{years[i]}→{years[i + 1]}" for i in year_idx],
+                '이전년도': [f"{v:,}원" for v in prev_values.tolist()],
+                '해당년도': [f"{v:,}원" for v in curr_values.tolist()],
+                '증감률': [f"{v:+.1f}%" for v in growth_rates.tolist()]
+            })
             st.dataframe(growth_df, use_container_width=True, hide_index=True)
 
 if __name__ == "__main__":
@@ -0,0 +1,297 @@
+"""RTB 성능 벤치마크
+
+합성 원장(거래처 10/50/500 × 5/20/50년)으로 데이터 로드/저장, 기간 집계,
+보고서 생성, 차트 생성, 내보내기 시간을 측정하고 기준값(baseline)과 비교한다.
+측정 전에 직렬화 모듈이 기존 형식(indent=2 표준 json) 파일과 왕복 호환되는지 확인한다.
+
+사용 예 (저장소 루트에서):
+    python -m benchmarks.run                         # 전체 측정 후 baseline과 비교
+    python -m benchmarks.run --scenarios cp10_y5     # 일부 시나리오만
+    python -m benchmarks.run --update-baseline       # 현재 결과를 기준값으로 저장
+
+baseline과 비교해 중간값(median)이 max_ratio배를 넘고 차이가 min_delta_seconds 이상이면
+회귀로 보고 종료 코드 1을 반환한다.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Callable, Optional
+
+from benchmarks.synthetic import COUNTERPARTY_COUNTS, YEAR_COUNTS, write_ledger
+from modules import serialization
+from modules.data_manager import DataManager
+from modules.export_utils import ExportManager
+from modules.report_generator import ReportGenerator
+from modules.visualization import VisualizationManager
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results", "latest.json")
+
+DEFAULT_THRESHOLDS = {
+    'max_ratio': 1.5,
+    'min_delta_seconds': 0.005,
+    # {"<시나리오>/<벤치마크>": 배율} 형식으로 개별 허용 배율 지정
+    'per_benchmark': {}
+}
+
+
+def scenario_name(counterparties: int, years: int) -> str:
+    return f"cp{counterparties}_y{years}"
+
+
+ALL_SCENARIOS = {
+    scenario_name(counterparties, years): (counterparties, years)
+    for counterparties in COUNTERPARTY_COUNTS
+    for years in YEAR_COUNTS
+}
+
+
+def time_call(func: Callable[[Any], Any], repeat: int, warmup: int = 1,
+              setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """func(setup())의 실행 시간을 repeat번 측정 (setup 시간은 제외)"""
+    for _ in range(warmup):
+        func(setup() if setup else None)
+
+    samples = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state)
+        samples.append(time.perf_counter() - start)
+
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'mean': statistics.fmean(samples),
+        'runs': len(samples)
+    }
+
+
+def check_serialization(data_file: str):
+    """직렬화 모듈과 기존 형식의 왕복 호환성 확인 (불일치 시 AssertionError)"""
+    with open(data_file, 'rb') as f:
+        raw = f.read()
+    legacy = json.loads(raw)
+    assert serialization.loads(raw) == legacy, f"기존 형식 읽기 불일치 ({serialization.BACKEND})"
+    for pretty in (False, True):
+        encoded = serialization.dumps(legacy, pretty=pretty)
+        assert json.loads(encoded) == legacy, f"표준 json으로 다시 읽기 불일치 ({serialization.BACKEND}, pretty={pretty})"
+        assert serialization.loads(encoded) == legacy, f"왕복 불일치 ({serialization.BACKEND}, pretty={pretty})"
+
+
+def scenario_benchmarks(data_file: str, work_dir: str, backend: str) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """한 시나리오의 벤치마크 목록 {이름: 측정 함수(repeat, warmup)}"""
+    data_manager = DataManager(data_file=data_file, backend=backend, year_partitions=True)
+    all_data = data_manager.get_all_data()
+    month_keys = sorted(all_data.keys())
+    encoded_data = serialization.dumps(all_data)
+    last_key = month_keys[-1]
+    year, month = (int(part) for part in last_key.split('-'))
+    month_data = all_data[last_key]
+    year_data = data_manager.get_year_data(year)
+    first_half = data_manager.aggregate_period_data(data_manager.get_period_data(year, 1, 6))
+    second_half = data_manager.aggregate_period_data(data_manager.get_period_data(year, 7, 12))
+    annual = data_manager.aggregate_period_data(year_data)
+
+    # 저장 측정은 원본을 건드리지 않도록 복사본에서 수행
+    save_file = os.path.join(work_dir, "save", os.path.basename(data_file))
+    os.makedirs(os.path.dirname(save_file), exist_ok=True)
+    shutil.copy(data_file, save_file)
+    # 첫 로드에서 거래처 ID로 변환된 원장이므로 거래처 테이블도 함께 복사
+    shutil.copy(os.path.join(os.path.dirname(data_file), "counterparties.json"), os.path.dirname(save_file))
+    save_manager = DataManager(data_file=save_file, backend=backend)
+    save_counter = [0]
+
+    def save_month(_):
+        save_counter[0] += 1
+        record = {**month_data, '매출': {**month_data['매출'], '벤치마크': save_counter[0]}}
+        save_manager.save_month_data(last_key, record)
+
+    # 캐시를 끈 인스턴스로 실제 생성 비용을 측정
+    report_generator = ReportGenerator(cache_size=0)
+    viz_manager = VisualizationManager(figure_cache_size=0, categories=data_manager.categories)
+    monthly_report = report_generator.generate_monthly_report(year, month, month_data)
+    total_revenue = sum(annual['매출'].values())
+    total_expense = sum(annual['매입'].values())
+
+    export_root = os.path.join(work_dir, "exports")
+    export_counter = [0]
+
+    def fresh_export_manager():
+        export_counter[0] += 1
+        return ExportManager(cache_dir=os.path.join(export_root, str(export_counter[0])),
+                             categories=data_manager.categories)
+
+    def run(func, setup=None):
+        return lambda repeat, warmup: time_call(func, repeat, warmup, setup)
+
+    return {
+        'data_manager.load_data': run(lambda _: data_manager.load_data()),
+        'data_manager.save_month_data': run(save_month),
+        'data_manager.aggregate_period_data.year': run(lambda _: data_manager.aggregate_period_data(year_data)),
+        'data_manager.aggregate_period_data.all': run(lambda _: data_manager.aggregate_period_data(all_data)),
+        'serialization.dumps': run(lambda _: serialization.dumps(all_data)),
+        'serialization.loads': run(lambda _: serialization.loads(encoded_data)),
+        'data_manager.get_revenue_cube': run(lambda _: data_manager.get_revenue_cube(int(month_keys[0][:4]), year)),
+
+        'report.generate_monthly_report': run(lambda _: report_generator.generate_monthly_report(year, month, month_data)),
+        'report.generate_semi_annual_report': run(
+            lambda _: report_generator.generate_semi_annual_report(year, "하반기", second_half, data_manager.get_period_data(year, 7, 12))),
+        'report.generate_annual_report': run(lambda _: report_generator.generate_annual_report(year, annual, first_half, second_half)),
+
+        'viz.create_revenue_pie_chart': run(lambda _: viz_manager.create_revenue_pie_chart(month_data['매출'])),
+        'viz.create_expense_pie_chart': run(lambda _: viz_manager.create_expense_pie_chart(month_data['매입'])),
+        'viz.create_monthly_trend_chart': run(lambda _: viz_manager.create_monthly_trend_chart(year_data)),
+        'viz.create_revenue_source_comparison': run(lambda _: viz_manager.create_revenue_source_comparison(year_data)),
+        'viz.create_expense_breakdown_chart': run(lambda _: viz_manager.create_expense_breakdown_chart(annual['매입'])),
+        'viz.create_profit_analysis_chart': run(lambda _: viz_manager.create_profit_analysis_chart(year_data)),
+        'viz.create_revenue_summary_pie_chart': run(lambda _: viz_manager.create_revenue_summary_pie_chart(
+            {"전자세금계산서매출": total_revenue // 2, "영세매출": total_revenue // 3, "기타매출": total_revenue // 6})),
+        'viz.create_simple_monthly_trend': run(lambda _: viz_manager.create_simple_monthly_trend(year_data)),
+        'viz.create_revenue_expense_comparison_chart': run(lambda _: viz_manager.create_revenue_expense_comparison_chart(
+            total_revenue, total_expense, total_revenue - total_expense)),
+
+        'export.generate_pdf_report': run(lambda manager: manager.generate_pdf_report(monthly_report, "bench"),
+                                          setup=fresh_export_manager),
+        'export.generate_excel_report': run(lambda manager: manager.generate_excel_report(month_data, "bench"),
+                                            setup=fresh_export_manager),
+        'export.generate_comparison_excel': run(lambda manager: manager.generate_comparison_excel(year_data, "bench"),
+                                                setup=fresh_export_manager),
+        'export.export_backup_data': run(lambda manager: manager.export_backup_data(all_data, "bench"),
+                                         setup=fresh_export_manager),
+    }
+
+
+def run_benchmarks(scenarios: List[str], repeat: int = 5, warmup: int = 1, backend: str = "json",
+                   seed: int = 0, only: Optional[str] = None) -> Dict[str, Any]:
+    """선택한 시나리오 전체 측정"""
+    results = {}
+    work_root = tempfile.mkdtemp(prefix="rtb_bench_")
+    try:
+        for name in scenarios:
+            counterparties, years = ALL_SCENARIOS[name]
+            work_dir = os.path.join(work_root, name)
+            data_file = write_ledger(os.path.join(work_dir, "rtb_data.json"), counterparties, years, seed=seed)
+            check_serialization(data_file)
+
+            for bench_name, bench in scenario_benchmarks(data_file, work_dir, backend).items():
+                if only and only not in bench_name:
+                    continue
+                key = f"{name}/{bench_name}"
+                try:
+                    results[key] = bench(repeat, warmup)
+                    print(f"{key:<70} {results[key]['median'] * 1000:>10.2f} ms")
+                except Exception as e:
+                    print(f"벤치마크 오류 ({key}): {e}")
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'commit': git_commit(),
+            'backend': backend,
+            'serializer': serialization.BACKEND,
+            'repeat': repeat,
+            'seed': seed
+        },
+        'results': results
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare_with_baseline(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """baseline 대비 회귀 목록 (기준값이 없는 항목은 비교하지 않음)"""
+    thresholds = dict(DEFAULT_THRESHOLDS, **baseline.get('thresholds', {}))
+    regressions = []
+    for key, result in current['results'].items():
+        reference = baseline.get('results', {}).get(key)
+        if not reference:
+            continue
+        max_ratio = thresholds['per_benchmark'].get(key, thresholds['max_ratio'])
+        delta = result['median'] - reference['median']
+        if result['median'] > reference['median'] * max_ratio and delta >= thresholds['min_delta_seconds']:
+            regressions.append(
+                f"{key}: {reference['median'] * 1000:.2f} ms -> {result['median'] * 1000:.2f} ms "
+                f"({result['median'] / reference['median']:.2f}배, 허용 {max_ratio}배)"
+            )
+    return regressions
+
+
+def load_json(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(path: str, payload: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="RTB 성능 벤치마크")
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(ALL_SCENARIOS), default=sorted(ALL_SCENARIOS),
+                        help="측정할 시나리오 (cp<거래처 수>_y<연도 수>)")
+    parser.add_argument('--only', help="이름에 이 문자열이 포함된 벤치마크만 측정")
+    parser.add_argument('--repeat', type=int, default=5, help="반복 측정 횟수")
+    parser.add_argument('--warmup', type=int, default=1, help="측정 전 예열 횟수")
+    parser.add_argument('--backend', default="json", choices=["json", "journal", "sqlite", "parquet"], help="저장소 종류")
+    parser.add_argument('--seed', type=int, default=0, help="합성 데이터 seed")
+    parser.add_argument('--out', default=DEFAULT_OUTPUT, help="결과 JSON 경로")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="기준값 JSON 경로")
+    parser.add_argument('--update-baseline', action='store_true', help="현재 결과를 기준값으로 저장")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.scenarios, args.repeat, args.warmup, args.backend, args.seed, args.only)
+    save_json(args.out, current)
+    print(f"결과 저장: {args.out}")
+
+    baseline = load_json(args.baseline)
+    if args.update_baseline:
+        updated = dict(current, thresholds=(baseline or {}).get('thresholds', DEFAULT_THRESHOLDS))
+        partial = args.only or len(args.scenarios) < len(ALL_SCENARIOS)
+        if baseline and partial:
+            # 일부만 측정한 경우 나머지 기준값은 유지
+            updated['results'] = dict(baseline.get('results', {}), **current['results'])
+        save_json(args.baseline, updated)
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("기준값 파일이 없습니다. --update-baseline으로 먼저 생성하세요.")
+        return 0
+
+    regressions = compare_with_baseline(current, baseline)
+    if regressions:
+        print("성능 회귀 발견:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("기준값 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""실제 rtb_data.json 스키마와 같은 합성 원장 생성기
+
+같은 (거래처 수, 연도 수, seed)이면 항상 같은 데이터를 만든다.
+"""
+import json
+import os
+import random
+from typing import Dict, Any, List
+
+# 실제 매출처/매입처 - 보고서/차트의 고정 목록 경로도 실제 값으로 실행되도록 앞쪽에 배치
+REAL_REVENUE_SOURCES = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR",
+                        "Everllence LEO", "Mitsui", "기타"]
+REAL_EXPENSE_ITEMS = ["급여", "수당", "법인카드 사용액", "전자세금계산서", "세금", "이자", "퇴직금", "기타"]
+
+COUNTERPARTY_COUNTS = (10, 50, 500)
+YEAR_COUNTS = (5, 20, 50)
+
+
+def counterparty_names(real_names: List[str], prefix: str, count: int) -> List[str]:
+    """실제 이름부터 채우고 부족하면 '접두어001' 형식으로 생성"""
+    names = real_names[:count]
+    names += [f"{prefix}{index:03d}" for index in range(1, count - len(names) + 1)]
+    return names
+
+
+def generate_ledger(counterparties: int, years: int, end_year: int = 2025, seed: int = 0) -> Dict[str, Any]:
+    """월별 매출/매입 원장 생성 ({"YYYY-MM": {"매출": {...}, "매입": {...}, "입력일시": ...}})"""
+    rng = random.Random(f"{counterparties}-{years}-{seed}")
+    revenue_sources = counterparty_names(REAL_REVENUE_SOURCES, "매출처", counterparties)
+    expense_items = counterparty_names(REAL_EXPENSE_ITEMS, "매입처", counterparties)
+
+    data = {}
+    for year in range(end_year - years + 1, end_year + 1):
+        for month in range(1, 13):
+            # 실제 데이터처럼 일부 거래처는 해당 월 거래가 없음
+            revenue = {name: rng.randrange(1, 2_000) * 1_000_000 for name in revenue_sources if rng.random() < 0.8}
+            expense = {name: rng.randrange(1, 800) * 1_000_000 for name in expense_items if rng.random() < 0.8}
+            data[f"{year}-{month:02d}"] = {
+                "매출": revenue,
+                "매입": expense,
+                "입력일시": f"{year}-{month:02d}-28T10:00:00"
+            }
+    return data
+
+
+def write_ledger(path: str, counterparties: int, years: int, end_year: int = 2025, seed: int = 0) -> str:
+    """합성 원장을 앱과 같은 형식(indent=2 JSON)으로 저장"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(generate_ledger(counterparties, years, end_year, seed), f, ensure_ascii=False, indent=2)
+    return path
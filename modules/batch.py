@@ -0,0 +1,181 @@
+"""월말/반기/연간 보고서 일괄 생성 (야간 배치용)
+
+사용 예:
+    python -m modules.batch --start-year 2024 --end-year 2025 --out reports --workers 4
+
+출력 폴더의 manifest.json에 산출물별 내용 해시를 기록하여,
+데이터가 바뀐 보고서만 다시 생성한다.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Tuple
+
+from modules.categories import get_category_registry
+from modules.data_manager import DataManager
+from modules.export_utils import ExportManager
+from modules.report_generator import ReportGenerator
+from modules.storage import atomic_file
+
+MANIFEST_FILE = "manifest.json"
+
+HALVES = ((1, "상반기", range(1, 7)), (2, "하반기", range(7, 13)))
+
+# 작업 프로세스마다 하나씩 생성되는 ExportManager (프로세스 내 메모리 캐시 재사용)
+_worker_export_manager = None
+
+
+def _init_worker(counterparty_file: str):
+    global _worker_export_manager
+    _worker_export_manager = ExportManager(categories=get_category_registry(counterparty_file))
+
+
+def _render_artifact(kind: str, payload: Dict[str, Any], filepath: str) -> str:
+    """작업 프로세스에서 PDF/Excel 하나를 내보내기 캐시를 거쳐 생성하고 출력 폴더에 원자적으로 복사"""
+    manager = _worker_export_manager or ExportManager()
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    if kind == 'pdf':
+        cached_path = manager.generate_pdf_report(payload, name)
+    else:
+        cached_path = manager.generate_excel_report(payload, name)
+
+    with open(cached_path, 'rb') as src, atomic_file(filepath) as f:
+        shutil.copyfileobj(src, f)
+    return filepath
+
+
+def load_manifest(out_dir: str) -> Dict[str, str]:
+    """이전 실행의 산출물 해시 목록 로드"""
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"매니페스트 로드 오류: {e}")
+        return {}
+
+
+def save_manifest(out_dir: str, manifest: Dict[str, str]):
+    """산출물 해시 목록 저장"""
+    with atomic_file(os.path.join(out_dir, MANIFEST_FILE)) as f:
+        f.write(json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def plan_artifacts(data_manager: DataManager, report_generator: ReportGenerator,
+                   start_year: int, end_year: int) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """생성 대상 목록 (종류, 파일명, 내용) - 데이터가 있는 기간만 포함"""
+    artifacts = []
+    all_data = data_manager.get_all_data()
+
+    for year in range(start_year, end_year + 1):
+        year_months = [month for month in range(1, 13) if f"{year}-{month:02d}" in all_data]
+        if not year_months:
+            continue
+
+        # 월말 보고서
+        for month in year_months:
+            data = all_data[f"{year}-{month:02d}"]
+            report = report_generator.generate_monthly_report(year, month, data)
+            base_name = f"RTB_{year}년_{month}월_월말보고서"
+            artifacts.append(('pdf', f"{base_name}.pdf", report))
+            artifacts.append(('excel', f"{base_name}.xlsx", data))
+
+        # 반기 보고서
+        half_summaries = {}
+        for half_index, period_name, months in HALVES:
+            aggregated = data_manager.get_rollup('half', year, half_index)
+            half_summaries[half_index] = aggregated
+            if not any(month in year_months for month in months):
+                continue
+            period_data = data_manager.get_period_data(year, months[0], months[-1])
+            report = report_generator.generate_semi_annual_report(year, period_name, aggregated, period_data)
+            base_name = f"RTB_{year}년_{period_name}_보고서"
+            artifacts.append(('pdf', f"{base_name}.pdf", dict(report, data=aggregated)))
+            artifacts.append(('excel', f"{base_name}.xlsx", aggregated))
+
+        # 연말 보고서
+        annual_summary = data_manager.get_rollup('year', year)
+        report = report_generator.generate_annual_report(year, annual_summary, half_summaries[1], half_summaries[2])
+        base_name = f"RTB_{year}년_연말보고서"
+        artifacts.append(('pdf', f"{base_name}.pdf", dict(report, data=annual_summary)))
+        artifacts.append(('excel', f"{base_name}.xlsx", annual_summary))
+
+    return artifacts
+
+
+def run_batch(start_year: int, end_year: int, out_dir: str, workers: int = None,
+              data_file: str = "data/rtb_data.json", backend: str = "journal", force: bool = False) -> Dict[str, int]:
+    """기간 내 모든 보고서를 병렬 생성 (변경된 산출물만)"""
+    os.makedirs(out_dir, exist_ok=True)
+
+    data_manager = DataManager(data_file=data_file, backend=backend)
+    report_generator = ReportGenerator()
+    artifacts = plan_artifacts(data_manager, report_generator, start_year, end_year)
+
+    # 분류 구성도 해시에 포함 (매출처 분류가 바뀌면 보고서를 다시 생성)
+    # 보고서 생성 시각은 실행마다 달라지므로 빼고 비교 - 건너뛴 파일에는 실제로 만든 시각이 남아 있음
+    export_manager = ExportManager(categories=data_manager.categories)
+    manifest = load_manifest(out_dir)
+    stale = []
+    for kind, filename, payload in artifacts:
+        digest = export_manager.artifact_digest(kind, payload, ignore_generated_at=True)
+        filepath = os.path.join(out_dir, filename)
+        if not force and manifest.get(filename) == digest and os.path.exists(filepath):
+            continue
+        stale.append((kind, filename, payload, digest))
+
+    stats = {'total': len(artifacts), 'generated': 0, 'skipped': len(artifacts) - len(stale), 'failed': 0}
+    if not stale:
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_manager.counterparties.path,)) as executor:
+        futures = {
+            executor.submit(_render_artifact, kind, payload, os.path.join(out_dir, filename)): (filename, digest)
+            for kind, filename, payload, digest in stale
+        }
+        for future in as_completed(futures):
+            filename, digest = futures[future]
+            try:
+                future.result()
+                manifest[filename] = digest
+                stats['generated'] += 1
+            except Exception as e:
+                manifest.pop(filename, None)
+                stats['failed'] += 1
+                print(f"보고서 생성 오류 ({filename}): {e}")
+
+    save_manifest(out_dir, manifest)
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="RTB 보고서 일괄 생성")
+    parser.add_argument('--start-year', type=int, required=True, help="시작 연도")
+    parser.add_argument('--end-year', type=int, help="종료 연도 (기본값: 시작 연도)")
+    parser.add_argument('--out', default="reports", help="출력 폴더")
+    parser.add_argument('--workers', type=int, default=None, help="작업 프로세스 수 (기본값: CPU 수)")
+    parser.add_argument('--data-file', default="data/rtb_data.json", help="데이터 파일 경로")
+    parser.add_argument('--backend', default=os.environ.get("RTB_STORAGE_BACKEND", "journal"),
+                        choices=["json", "journal", "sqlite", "parquet"], help="저장소 종류")
+    parser.add_argument('--force', action='store_true', help="변경 여부와 관계없이 모두 다시 생성")
+    args = parser.parse_args(argv)
+
+    end_year = args.end_year or args.start_year
+    if end_year < args.start_year:
+        parser.error("종료 연도는 시작 연도보다 빠를 수 없습니다.")
+
+    stats = run_batch(args.start_year, end_year, args.out, workers=args.workers,
+                      data_file=args.data_file, backend=args.backend, force=args.force)
+    print(f"전체 {stats['total']}개 / 생성 {stats['generated']}개 / "
+          f"최신 상태로 건너뜀 {stats['skipped']}개 / 실패 {stats['failed']}개")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
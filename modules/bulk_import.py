@@ -0,0 +1,135 @@
+"""여러 달 매출/매입 일괄 가져오기 (Excel/CSV)
+
+백업 Excel(ExportManager.export_backup_data)과 같은 긴 형식을 읽는다:
+
+    년도 | 월 | 구분(매출/매입) | 항목 | 금액
+
+검증은 pandas 벡터 연산으로 한 번에 수행하고, 통과한 월은
+DataManager.save_months로 한 번의 쓰기(트랜잭션)에 저장한다.
+파일에 포함된 월은 파일 내용으로 통째로 교체된다.
+"""
+import os
+from datetime import datetime
+from typing import Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.counterparties import KINDS, CounterpartyDirectory
+from modules.long_format import LONG_COLUMNS
+from modules.profiling import profiler
+
+IMPORT_COLUMNS = list(LONG_COLUMNS)
+
+# 백업 Excel에서 원장 데이터가 들어 있는 시트
+BACKUP_SHEET = '전체데이터'
+
+MIN_YEAR = 2000
+MAX_YEAR = 2100
+
+
+def read_import_file(file, filename: str) -> pd.DataFrame:
+    """업로드 파일(xlsx/csv)을 DataFrame으로 읽기 (백업 Excel이면 '전체데이터' 시트 사용)"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        df = pd.read_csv(file, encoding='utf-8-sig', dtype={'구분': str, '항목': str})
+    elif extension in ('.xlsx', '.xlsm'):
+        sheets = pd.read_excel(file, sheet_name=None, dtype={'구분': str, '항목': str})
+        df = sheets.get(BACKUP_SHEET, next(iter(sheets.values())))
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {extension}")
+
+    df.columns = [str(column).strip() for column in df.columns]
+    missing = [column for column in IMPORT_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"필수 열이 없습니다: {', '.join(missing)}")
+    return df[IMPORT_COLUMNS]
+
+
+def validate_rows(df: pd.DataFrame, directory: CounterpartyDirectory,
+                  allow_new_items: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """행 단위 검증 (벡터 연산) - (정상 행, 오류 행) 반환
+
+    오류: 년도/월 형식·범위, 알 수 없는 구분, 빈 항목, 등록되지 않은 항목
+    (allow_new_items가 False인 경우), 금액 형식, 음수 금액, 같은 월/구분/항목 중복.
+    """
+    with profiler.measure("bulk_import.validate", len(df)):
+        rows = pd.DataFrame({
+            '행': df.index.to_numpy() + 2,  # 엑셀 기준 행 번호 (머리글 다음부터)
+            '년도': pd.to_numeric(df['년도'], errors='coerce'),
+            '월': pd.to_numeric(df['월'], errors='coerce'),
+            '구분': df['구분'].fillna('').astype(str).str.strip(),
+            '항목': df['항목'].fillna('').astype(str).str.strip(),
+            '금액': pd.to_numeric(df['금액'], errors='coerce')
+        })
+
+        # 이전 이름으로 입력된 항목은 현재 이름으로 맞춤 (고유한 (구분, 항목) 단위로 한 번만 조회)
+        codes, pairs = pd.factorize(pd.MultiIndex.from_frame(rows[['구분', '항목']]))
+        canonical = []
+        for kind, name in pairs:
+            cp_id = directory.find(kind, name) if kind in KINDS else None
+            canonical.append(directory.by_id[cp_id]['name'] if cp_id is not None else None)
+        resolved = pd.Series(np.array(canonical, dtype=object)[codes] if len(codes) else [], index=rows.index, dtype=object)
+        known = resolved.notna()
+        rows['항목'] = resolved.where(known, rows['항목'])
+
+        checks = [
+            (rows['년도'].isna() | (rows['년도'] % 1 != 0) | ~rows['년도'].between(MIN_YEAR, MAX_YEAR), "년도 형식 오류"),
+            (rows['월'].isna() | (rows['월'] % 1 != 0) | ~rows['월'].between(1, 12), "월 범위 오류 (1~12)"),
+            (~rows['구분'].isin(KINDS), "구분은 매출 또는 매입이어야 합니다"),
+            (rows['항목'] == '', "항목 없음"),
+            (rows['금액'].isna() | (rows['금액'] % 1 != 0), "금액 형식 오류"),
+            (rows['금액'] < 0, "음수 금액"),
+        ]
+        if not allow_new_items:
+            checks.append((rows['구분'].isin(KINDS) & (rows['항목'] != '') & ~known, "등록되지 않은 항목"))
+        checks.append((rows.duplicated(['년도', '월', '구분', '항목'], keep=False), "중복 행 (같은 월/구분/항목)"))
+
+        masks = np.column_stack([mask.to_numpy(dtype=bool) for mask, _ in checks])
+        messages = np.array([message for _, message in checks], dtype=object)
+        invalid = masks.any(axis=1)
+
+        errors = rows.loc[invalid, ['행', '년도', '월', '구분', '항목', '금액']].copy()
+        errors['오류'] = [", ".join(messages[row]) for row in masks[invalid]]
+
+        valid = rows.loc[~invalid].copy()
+        valid['년도'] = valid['년도'].astype(int)
+        valid['월'] = valid['월'].astype(int)
+        valid['금액'] = valid['금액'].astype('int64')
+    return valid, errors
+
+
+def build_months(valid: pd.DataFrame, entered_at: str = None) -> Dict[str, Dict[str, Any]]:
+    """검증된 긴 형식 행을 월별 레코드 {"YYYY-MM": {"매출": {...}, "매입": {...}, "입력일시": ...}}로 변환"""
+    entered_at = entered_at or datetime.now().isoformat()
+    month_keys = valid['년도'].astype(str) + '-' + valid['월'].astype(str).str.zfill(2)
+
+    months = {
+        month_key: {'매출': {}, '매입': {}, '입력일시': entered_at}
+        for month_key in month_keys.unique()
+    }
+    for month_key, kind, name, amount in zip(month_keys, valid['구분'], valid['항목'], valid['금액'].tolist()):
+        months[month_key][kind][name] = amount
+    return dict(sorted(months.items()))
+
+
+def preview_import(file, filename: str, data_manager, allow_new_items: bool = False) -> Dict[str, Any]:
+    """파일을 읽고 검증한 결과 (저장 전 미리보기)"""
+    df = read_import_file(file, filename)
+    valid, errors = validate_rows(df, data_manager.counterparties, allow_new_items)
+    months = build_months(valid) if errors.empty else {}
+    # 다른 세션의 저장을 반영하고 잠금 상태에서 복사한 월 목록 기준으로 덮어쓰기 여부 판단
+    existing = set(data_manager.get_all_data())
+    return {
+        'rows': len(df),
+        'errors': errors,
+        'months': months,
+        'overwritten': sorted(month_key for month_key in months if month_key in existing)
+    }
+
+
+def import_months(data_manager, months: Dict[str, Dict[str, Any]]) -> int:
+    """검증된 월 레코드를 한 번의 쓰기로 저장하고 저장한 월 수 반환"""
+    with profiler.measure("bulk_import.save", len(months)):
+        data_manager.save_months(months)
+    return len(months)
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import threading
+import zlib
+from typing import Dict, Any, Tuple, Optional
+
+from modules.counterparties import CounterpartyDirectory, DEFAULT_COUNTERPARTY_FILE, get_directory
+from modules.serialization import dumps
+
+# 매출 분류 (화면/보고서 표시 순서)
+REVENUE_CATEGORIES = ('전자세금계산서', '영세', '기타')
+EXPENSE_CATEGORY = '매입'
+
+# 보고서/화면에서 쓰는 분류 표시명
+REVENUE_CATEGORY_LABELS = {
+    '전자세금계산서': '전자세금계산서매출',
+    '영세': '영세매출',
+    '기타': '기타매출'
+}
+
+# 월 레코드에 함께 저장하는 파생 소계 키와 스키마 버전 (소계 항목이 바뀌면 올림)
+SUBTOTAL_KEY = '소계'
+SUBTOTAL_SCHEMA_VERSION = 2
+
+
+def month_totals(month_data: Dict[str, Any]) -> Tuple[int, int]:
+    """월 레코드의 (총매출, 총매입) - 저장된 소계가 있으면 사용, 없으면 합산 (집계 데이터 포함)"""
+    stored = month_data.get(SUBTOTAL_KEY)
+    if stored and stored.get('_schema') == SUBTOTAL_SCHEMA_VERSION:
+        return stored['총매출'], stored['총매입']
+    return sum(month_data.get('매출', {}).values()), sum(month_data.get('매입', {}).values())
+
+
+def source_fingerprint(month_data: Dict[str, Any]) -> int:
+    """소계 계산에 쓰인 매출/매입 항목의 지문 (외부에서 금액만 바뀐 레코드 감지용)"""
+    return zlib.crc32(dumps([month_data.get('매출', {}), month_data.get('매입', {})]))
+
+
+class CategorySnapshot:
+    """특정 시점의 분류 구성 (읽기 전용, 조회용 집합/순서 배열을 미리 계산)"""
+
+    def __init__(self, directory: CounterpartyDirectory):
+        by_category = {category: [] for category in REVENUE_CATEGORIES}
+        category_of = {}
+        expense_items = []
+
+        for record in directory.list_by_kind('매출'):
+            category = record['category'] if record['category'] in by_category else '기타'
+            # 비활성 거래처도 과거 데이터 분류를 위해 category_of에는 포함
+            category_of[record['name']] = category
+            if record.get('active', True):
+                by_category[category].append(record['name'])
+        for record in directory.list_by_kind('매입'):
+            if record.get('active', True):
+                expense_items.append(record['name'])
+
+        self.revenue_by_category: Dict[str, Tuple[str, ...]] = {
+            category: tuple(names) for category, names in by_category.items()
+        }
+        # 분류 순서대로 이어 붙인 전체 매출처 목록 (중복 없음)
+        self.revenue_sources: Tuple[str, ...] = tuple(
+            name for category in REVENUE_CATEGORIES for name in self.revenue_by_category[category]
+        )
+        self.expense_items: Tuple[str, ...] = tuple(expense_items)
+        self.revenue_set = frozenset(self.revenue_sources)
+        self.expense_set = frozenset(self.expense_items)
+        self.category_of: Dict[str, str] = category_of
+        self.revenue_index: Dict[str, int] = {name: i for i, name in enumerate(self.revenue_sources)}
+        self.expense_index: Dict[str, int] = {name: i for i, name in enumerate(self.expense_items)}
+
+        layout = [self.revenue_by_category[category] for category in REVENUE_CATEGORIES] + [self.expense_items]
+        self.signature = hashlib.sha1(json.dumps(layout, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class CategoryRegistry:
+    """매출처/매입 항목 분류 설정 (거래처 테이블 기반, 변경 시에만 다시 계산되는 캐시)
+
+    설정 화면의 추가/삭제/이름 변경이 data/counterparties.json에 저장되며,
+    입력 화면/보고서/차트/내보내기가 모두 같은 목록을 읽는다.
+    """
+
+    def __init__(self, directory: CounterpartyDirectory):
+        self.directory = directory
+        self._snapshot: Optional[CategorySnapshot] = None
+        self._snapshot_revision = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> CategorySnapshot:
+        """현재 분류 구성 (거래처 테이블이 바뀐 경우에만 다시 계산)"""
+        self.directory.reload_if_changed()
+        revision = self.directory.revision
+        snapshot = self._snapshot
+        if snapshot is None or self._snapshot_revision != revision:
+            with self._lock:
+                if self._snapshot is None or self._snapshot_revision != revision:
+                    self._snapshot = CategorySnapshot(self.directory)
+                    self._snapshot_revision = revision
+                snapshot = self._snapshot
+        return snapshot
+
+    def revenue_sources(self, category: Optional[str] = None) -> Tuple[str, ...]:
+        """매출처 목록 (category가 없으면 분류 순서대로 전체)"""
+        snapshot = self.snapshot()
+        if category is None:
+            return snapshot.revenue_sources
+        return snapshot.revenue_by_category.get(category, ())
+
+    def expense_items(self) -> Tuple[str, ...]:
+        """매입 항목 목록"""
+        return self.snapshot().expense_items
+
+    def category_of(self, name: str) -> str:
+        """매출처의 분류 (등록되지 않은 매출처는 기타)"""
+        return self.snapshot().category_of.get(name, '기타')
+
+    def revenue_subtotals(self, revenue_data: Dict[str, Any]) -> Dict[str, Any]:
+        """매출 분류별 소계 {전자세금계산서: ..., 영세: ..., 기타: ...}"""
+        category_of = self.snapshot().category_of
+        subtotals = {category: 0 for category in REVENUE_CATEGORIES}
+        for name, amount in revenue_data.items():
+            subtotals[category_of.get(name, '기타')] += amount
+        return subtotals
+    
+    def compute_subtotals(self, month_data: Dict[str, Any]) -> Dict[str, Any]:
+        """월 레코드의 파생 소계 (분류별 매출, 총매출, 총매입, 순이익) - 저장 시 한 번 계산"""
+        revenue = self.revenue_subtotals(month_data.get('매출', {}))
+        total_revenue = sum(revenue.values())
+        total_expense = sum(month_data.get('매입', {}).values())
+        subtotals = {
+            '_schema': SUBTOTAL_SCHEMA_VERSION,
+            '_layout': self.signature(),
+            '_source': source_fingerprint(month_data)
+        }
+        for category in REVENUE_CATEGORIES:
+            subtotals[REVENUE_CATEGORY_LABELS[category]] = revenue[category]
+        subtotals.update({
+            '총매출': total_revenue,
+            '총매입': total_expense,
+            '순이익': total_revenue - total_expense
+        })
+        return subtotals
+    
+    def subtotals_current(self, month_data: Dict[str, Any]) -> bool:
+        """저장된 소계가 현재 스키마/분류 구성 기준인지 여부"""
+        stored = month_data.get(SUBTOTAL_KEY)
+        return bool(stored) and stored.get('_schema') == SUBTOTAL_SCHEMA_VERSION and stored.get('_layout') == self.signature()
+    
+    def subtotals_verified(self, month_data: Dict[str, Any]) -> bool:
+        """저장된 소계가 현재 기준이고 레코드의 금액과도 일치하는지 여부 (디스크에서 읽은 레코드 확인용)"""
+        return self.subtotals_current(month_data) and month_data[SUBTOTAL_KEY].get('_source') == source_fingerprint(month_data)
+    
+    def subtotals(self, month_data: Dict[str, Any]) -> Dict[str, Any]:
+        """월 레코드(또는 집계 데이터)의 소계 - 저장된 값이 유효하면 그대로 사용"""
+        if self.subtotals_current(month_data):
+            return month_data[SUBTOTAL_KEY]
+        return self.compute_subtotals(month_data)
+
+    def signature(self) -> str:
+        """분류 구성 지문 (캐시 키용)"""
+        return self.snapshot().signature
+
+    def add(self, kind: str, name: str, category: Optional[str] = None, retire_alias: bool = False):
+        """매출처/매입 항목 추가 (이미 있으면 분류 변경 및 재활성화)
+
+        다른 거래처의 이전 이름이면 ValueError - retire_alias=True면 이전 이름 연결을 해제하고 새 항목으로 추가
+        """
+        if retire_alias and self.directory.alias_owner(kind, name) is not None:
+            self.directory.retire_alias(kind, name)
+        self.directory.set_category(kind, name, category or (EXPENSE_CATEGORY if kind == '매입' else '기타'))
+
+    def remove(self, kind: str, name: str):
+        """입력 목록에서 제외 (과거 데이터는 유지)"""
+        self.directory.set_active(kind, name, False)
+
+
+_registries: Dict[int, CategoryRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_category_registry(path: str = DEFAULT_COUNTERPARTY_FILE) -> CategoryRegistry:
+    """거래처 테이블 경로별로 프로세스당 하나의 분류 설정 공유"""
+    directory = get_directory(path)
+    with _registries_lock:
+        registry = _registries.get(id(directory))
+        if registry is None:
+            registry = _registries[id(directory)] = CategoryRegistry(directory)
+        return registry
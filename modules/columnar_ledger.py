@@ -0,0 +1,121 @@
+import numpy as np
+from typing import Dict, Any, List, Iterable, Optional
+
+KINDS = ('매출', '매입')
+
+
+class ColumnarLedger:
+    """월 × 구분(매출/매입) × 거래처 int64 배열 기반 원장
+
+    거래처명은 정수 ID로 인터닝하며, 각 월은 하나의 행(values[row])으로 저장된다.
+    """
+
+    def __init__(self, initial_months: int = 16, initial_counterparties: int = 32):
+        self.month_keys: List[Optional[str]] = []
+        self.month_index: Dict[str, int] = {}
+        self.free_rows: List[int] = []
+
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+
+        self.values = np.zeros((initial_months, len(KINDS), initial_counterparties), dtype=np.int64)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnarLedger':
+        """기존 월별 dict 데이터로 원장 생성"""
+        ledger = cls(initial_months=max(16, len(data)))
+        for month_key, month_data in data.items():
+            ledger.set_month(month_key, month_data)
+        return ledger
+
+    def intern(self, name: str) -> int:
+        """거래처명을 정수 ID로 변환 (없으면 새로 등록)"""
+        counterparty_id = self.name_ids.get(name)
+        if counterparty_id is None:
+            counterparty_id = len(self.names)
+            self.names.append(name)
+            self.name_ids[name] = counterparty_id
+            if counterparty_id >= self.values.shape[2]:
+                self._grow(counterparties=self.values.shape[2] * 2)
+        return counterparty_id
+
+    def _grow(self, months: int = None, counterparties: int = None):
+        """배열 용량 확장 (2배씩 늘려 재할당 비용을 분할 상환)"""
+        rows, kinds, cols = self.values.shape
+        new_shape = (months or rows, kinds, counterparties or cols)
+        values = np.zeros(new_shape, dtype=np.int64)
+        values[:rows, :, :cols] = self.values
+        self.values = values
+
+    def _row_for(self, month_key: str) -> int:
+        """월 키에 해당하는 행 번호 조회 (없으면 할당)"""
+        row = self.month_index.get(month_key)
+        if row is not None:
+            return row
+
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.month_keys[row] = month_key
+        else:
+            row = len(self.month_keys)
+            self.month_keys.append(month_key)
+            if row >= self.values.shape[0]:
+                self._grow(months=self.values.shape[0] * 2)
+        self.month_index[month_key] = row
+        return row
+
+    def set_month(self, month_key: str, month_data: Dict[str, Any]):
+        """특정 월의 데이터 기록 (기존 값은 덮어씀)"""
+        row = self._row_for(month_key)
+        self.values[row] = 0
+
+        for kind_index, kind in enumerate(KINDS):
+            for name, amount in month_data.get(kind, {}).items():
+                counterparty_id = self.intern(name)
+                self.values[row, kind_index, counterparty_id] = int(amount)
+
+    def remove_month(self, month_key: str):
+        """특정 월의 데이터 제거"""
+        row = self.month_index.pop(month_key, None)
+        if row is None:
+            return
+        self.values[row] = 0
+        self.month_keys[row] = None
+        self.free_rows.append(row)
+
+    def rows_for(self, month_keys: Iterable[str]) -> np.ndarray:
+        """월 키 목록을 행 번호 배열로 변환 (없는 월은 제외)"""
+        rows = [self.month_index[key] for key in month_keys if key in self.month_index]
+        return np.asarray(rows, dtype=np.intp)
+
+    def totals(self, rows: np.ndarray) -> np.ndarray:
+        """선택한 행들의 구분 × 거래처 합계 (단일 벡터 연산)"""
+        count = len(self.names)
+        if len(rows) == 0:
+            return np.zeros((len(KINDS), count), dtype=np.int64)
+        return self.values[rows, :, :count].sum(axis=0)
+
+    def aggregate(self, month_keys: Iterable[str]) -> Dict[str, Any]:
+        """aggregate_period_data와 동일한 형식의 기간 집계 (0 이하 합계 제외)"""
+        totals = self.totals(self.rows_for(month_keys))
+        aggregated = {kind: {} for kind in KINDS}
+        for kind_index, kind in enumerate(KINDS):
+            for counterparty_id in np.flatnonzero(totals[kind_index] > 0):
+                aggregated[kind][self.names[counterparty_id]] = int(totals[kind_index, counterparty_id])
+        return aggregated
+
+    def month_matrix(self, month_keys: List[str], kind: str):
+        """월 키 목록 × 거래처 금액 행렬 (해당 기간에 금액이 있는 거래처만, 없는 월은 0행)
+
+        반환값: (거래처명 목록, int64 행렬[len(month_keys), 거래처 수])
+        """
+        kind_index = KINDS.index(kind)
+        count = len(self.names)
+        positions = [i for i, key in enumerate(month_keys) if key in self.month_index]
+        rows = self.rows_for(month_keys[i] for i in positions)
+
+        columns = np.flatnonzero((self.values[rows, kind_index, :count] != 0).any(axis=0))
+        matrix = np.zeros((len(month_keys), len(columns)), dtype=np.int64)
+        if len(rows):
+            matrix[positions] = self.values[rows, kind_index][:, columns]
+        return [self.names[i] for i in columns], matrix
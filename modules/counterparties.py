@@ -0,0 +1,337 @@
+import json
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+from modules.storage import atomic_file, file_signature
+
+KINDS = ('매출', '매입')
+
+# 월 레코드가 거래처 ID로 저장되었음을 나타내는 스키마 버전
+ID_SCHEMA_VERSION = 2
+
+# 처음 생성할 때 등록하는 기본 거래처 (구분, 분류, 이름 목록)
+DEFAULT_COUNTERPARTIES = (
+    ('매출', '전자세금계산서', ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"]),
+    ('매출', '영세', ["Everllence LEO", "Mitsui"]),
+    ('매출', '기타', ["기타"]),
+    ('매입', '매입', ["급여", "수당", "법인카드 사용액", "전자세금계산서", "세금", "이자", "퇴직금", "기타"]),
+)
+
+DEFAULT_CATEGORY = {'매출': '기타', '매입': '매입'}
+
+DEFAULT_COUNTERPARTY_FILE = "data/counterparties.json"
+
+
+class CounterpartyDirectory:
+    """거래처 차원 테이블 (data/counterparties.json)
+
+    거래처마다 변하지 않는 정수 ID, 구분(매출/매입), 분류(전자세금계산서/영세/기타),
+    이전 이름(aliases)을 관리한다. 월 레코드는 이름 대신 ID로 저장되므로
+    이름 변경은 이 테이블만 수정하면 된다.
+    """
+
+    def __init__(self, path: str = DEFAULT_COUNTERPARTY_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self.signature = None
+        # 변경될 때마다 증가 (revision: 모든 변경, name_revision: 이름이 바뀔 수 있는 변경)
+        self.revision = 0
+        self.name_revision = 0
+        self.next_id = 1
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        # (구분, 현재 이름 또는 이전 이름) -> ID
+        self.name_index: Dict[tuple, int] = {}
+        self.load()
+
+    def load(self):
+        """파일에서 거래처 목록 로드 (없으면 기본 거래처로 생성)"""
+        with self.lock:
+            if not os.path.exists(self.path):
+                self.by_id, self.name_index, self.next_id = {}, {}, 1
+                for kind, category, names in DEFAULT_COUNTERPARTIES:
+                    for name in names:
+                        self._add(kind, name, category)
+                self.save()
+                return
+
+            with open(self.path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            self.signature = file_signature(self.path)
+            self.next_id = payload.get('next_id', 1)
+            self.by_id = {}
+            self.name_index = {}
+            for record in payload.get('counterparties', []):
+                self._index(record)
+                self.next_id = max(self.next_id, record['id'] + 1)
+            self.revision += 1
+            self.name_revision += 1
+
+    def reload_if_changed(self) -> bool:
+        """다른 프로세스가 파일을 바꿨으면 다시 로드"""
+        with self.lock:
+            if file_signature(self.path) == self.signature:
+                return False
+            self.load()
+            return True
+
+    def save(self):
+        """거래처 목록을 원자적으로 저장 (고유한 임시 파일 기록, fsync 후 교체)"""
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            payload = {
+                'next_id': self.next_id,
+                'counterparties': [self.by_id[cp_id] for cp_id in sorted(self.by_id)]
+            }
+            with atomic_file(self.path) as f:
+                f.write(json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8'))
+            self.signature = file_signature(self.path)
+            self.revision += 1
+
+    def _index(self, record: Dict[str, Any]):
+        self.by_id[record['id']] = record
+        self.name_index[(record['kind'], record['name'])] = record['id']
+        for alias in record.get('aliases', []):
+            self.name_index.setdefault((record['kind'], alias), record['id'])
+
+    def _add(self, kind: str, name: str, category: Optional[str] = None) -> int:
+        record = {
+            'id': self.next_id,
+            'kind': kind,
+            'name': name,
+            'category': category or DEFAULT_CATEGORY[kind],
+            'aliases': [],
+            'active': True
+        }
+        self.next_id += 1
+        self._index(record)
+        return record['id']
+
+    def find(self, kind: str, name: str) -> Optional[int]:
+        """현재 이름 또는 이전 이름으로 ID 조회"""
+        return self.name_index.get((kind, name))
+
+    def get_or_create(self, kind: str, name: str, category: Optional[str] = None) -> int:
+        """이름으로 ID 조회, 없으면 새 거래처로 등록 후 저장"""
+        with self.lock:
+            cp_id = self.find(kind, name)
+            if cp_id is not None:
+                return cp_id
+            # 다른 프로세스가 먼저 등록했을 수 있으므로 최신 파일 기준으로 다시 확인
+            if self.reload_if_changed():
+                cp_id = self.find(kind, name)
+                if cp_id is not None:
+                    return cp_id
+            cp_id = self._add(kind, name, category)
+            self.save()
+            return cp_id
+
+    def get(self, cp_id: int) -> Optional[Dict[str, Any]]:
+        """ID로 거래처 정보 조회 (없으면 파일을 다시 읽어 확인)"""
+        record = self.by_id.get(cp_id)
+        if record is None and self.reload_if_changed():
+            record = self.by_id.get(cp_id)
+        return record
+
+    def name_of(self, cp_id: int) -> str:
+        """ID의 현재 이름"""
+        record = self.get(cp_id)
+        if record is None:
+            print(f"거래처 조회 오류: 등록되지 않은 ID {cp_id}")
+            return f"#{cp_id}"
+        return record['name']
+
+    def list_by_kind(self, kind: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """구분(및 분류)별 거래처 목록 (ID 순)"""
+        return [
+            record for cp_id, record in sorted(self.by_id.items())
+            if record['kind'] == kind and (category is None or record['category'] == category)
+        ]
+
+    def rename(self, kind: str, old_name: str, new_name: str) -> int:
+        """거래처 이름 변경 - 이전 이름은 aliases에 보관 (월 데이터는 수정하지 않음)"""
+        with self.lock:
+            self.reload_if_changed()
+            cp_id = self.find(kind, old_name)
+            if cp_id is None:
+                raise ValueError(f"등록되지 않은 거래처입니다: {old_name}")
+            existing = self.find(kind, new_name)
+            if existing is not None and existing != cp_id:
+                raise ValueError(f"이미 사용 중인 이름입니다: {new_name}")
+
+            record = self.by_id[cp_id]
+            if record['name'] != new_name:
+                if record['name'] not in record['aliases']:
+                    record['aliases'].append(record['name'])
+                if new_name in record['aliases']:
+                    record['aliases'].remove(new_name)
+                record['name'] = new_name
+                self.name_index[(kind, new_name)] = cp_id
+                self.name_revision += 1
+                self.save()
+            return cp_id
+
+    def alias_owner(self, kind: str, name: str) -> Optional[Dict[str, Any]]:
+        """name이 다른 거래처의 이전 이름(alias)이면 그 거래처 레코드, 아니면 None"""
+        cp_id = self.find(kind, name)
+        if cp_id is not None and self.by_id[cp_id]['name'] != name:
+            return self.by_id[cp_id]
+        return None
+
+    def retire_alias(self, kind: str, name: str) -> int:
+        """이전 이름 연결 해제 - 이후 같은 이름은 새 거래처로 등록됨 (저장된 월 데이터는 ID 기준이라 그대로)"""
+        with self.lock:
+            self.reload_if_changed()
+            record = self.alias_owner(kind, name)
+            if record is None:
+                raise ValueError(f"다른 거래처의 이전 이름이 아닙니다: {name}")
+            record['aliases'].remove(name)
+            del self.name_index[(kind, name)]
+            self.save()
+            return record['id']
+
+    def set_category(self, kind: str, name: str, category: str):
+        """거래처 분류 변경 (없으면 등록, 비활성 상태면 다시 활성화)
+
+        다른 거래처의 이전 이름이면 그 거래처에 합쳐지지 않도록 ValueError (retire_alias로 먼저 해제)
+        """
+        with self.lock:
+            self.reload_if_changed()
+            owner = self.alias_owner(kind, name)
+            if owner is not None:
+                raise ValueError(f"'{name}'은(는) '{owner['name']}'의 이전 이름입니다. 이전 이름 연결을 해제한 뒤 추가하세요.")
+            cp_id = self.get_or_create(kind, name, category)
+            record = self.by_id[cp_id]
+            if record['category'] != category or not record.get('active', True):
+                record['category'] = category
+                record['active'] = True
+                self.save()
+    
+    def set_active(self, kind: str, name: str, active: bool):
+        """입력 목록 표시 여부 변경 (비활성 거래처도 과거 데이터와 ID는 유지)"""
+        with self.lock:
+            cp_id = self.find(kind, name)
+            if cp_id is not None and self.by_id[cp_id].get('active', True) != active:
+                self.by_id[cp_id]['active'] = active
+                self.save()
+
+    def encode_month(self, month_data: Dict[str, Any]) -> Dict[str, Any]:
+        """월 레코드의 거래처명을 ID로 변환 (저장용)"""
+        encoded = {key: value for key, value in month_data.items() if key not in KINDS}
+        encoded['_schema'] = ID_SCHEMA_VERSION
+        for kind in KINDS:
+            if kind in month_data:
+                encoded[kind] = {
+                    str(self.get_or_create(kind, name)): amount
+                    for name, amount in month_data[kind].items()
+                }
+        return encoded
+
+    def decode_month(self, stored: Dict[str, Any]) -> Dict[str, Any]:
+        """저장된 월 레코드를 현재 거래처명 기준으로 변환 (이름 기반 기존 레코드도 지원)"""
+        decoded = {key: value for key, value in stored.items() if key not in KINDS and key != '_schema'}
+        id_encoded = stored.get('_schema') == ID_SCHEMA_VERSION
+        for kind in KINDS:
+            if kind not in stored:
+                continue
+            items = {}
+            for key, amount in stored[kind].items():
+                if id_encoded:
+                    name = self.name_of(int(key))
+                else:
+                    # 이름 기반 레코드: 이전 이름이면 현재 이름으로 연결
+                    cp_id = self.find(kind, key)
+                    name = self.by_id[cp_id]['name'] if cp_id is not None else key
+                items[name] = items.get(name, 0) + amount
+            decoded[kind] = items
+        return decoded
+
+    def decode_totals(self, totals: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """{구분: {ID: 합계}} 집계 결과를 이름 기준으로 변환"""
+        return {kind: {self.name_of(int(key)): total for key, total in items.items()} for kind, items in totals.items()}
+
+
+
+_directories: Dict[str, CounterpartyDirectory] = {}
+_directories_lock = threading.Lock()
+
+
+def get_directory(path: str = DEFAULT_COUNTERPARTY_FILE) -> CounterpartyDirectory:
+    """경로별로 프로세스당 하나의 거래처 테이블 인스턴스 공유"""
+    key = os.path.abspath(path)
+    with _directories_lock:
+        directory = _directories.get(key)
+        if directory is None:
+            directory = _directories[key] = CounterpartyDirectory(path)
+        return directory
+
+
+class IdEncodedStorage:
+    """거래처 ID 인코딩 저장소 래퍼
+
+    내부 저장소에는 ID로 인코딩된 월 레코드를 기록하고, DataManager에는
+    현재 거래처명 기준 레코드를 돌려준다. 이름 기반의 기존 데이터는 처음 로드할 때 한 번 변환한다.
+    """
+
+    def __init__(self, inner, directory: CounterpartyDirectory):
+        self.inner = inner
+        self.directory = directory
+        self.supports_queries = inner.supports_queries
+        # 내부 저장소와 동일한 인코딩 상태의 월 레코드 (변경 감지 비교용)
+        self.stored: Dict[str, Any] = {}
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def decode_all(self) -> Dict[str, Any]:
+        """저장된 전체 월 레코드를 현재 거래처명 기준으로 변환"""
+        return {month_key: self.directory.decode_month(record) for month_key, record in self.stored.items()}
+
+    def load(self) -> Dict[str, Any]:
+        self.stored = self.inner.load()
+        data = self.decode_all()
+        if any(record.get('_schema') != ID_SCHEMA_VERSION for record in self.stored.values()):
+            # 이름 기반 레코드를 ID 기반으로 한 번 변환
+            self.save_all(data)
+        return data
+
+    def save_all(self, data: Dict[str, Any]):
+        self.stored = {month_key: self.directory.encode_month(record) for month_key, record in data.items()}
+        self.inner.save_all(self.stored)
+
+    def save_month(self, month_key: str, month_data: Dict[str, Any], data: Dict[str, Any] = None):
+        encoded = self.directory.encode_month(month_data)
+        self.stored[month_key] = encoded
+        self.inner.save_month(month_key, encoded, self.stored)
+
+    def save_many(self, months: Dict[str, Dict[str, Any]], data: Dict[str, Any] = None):
+        encoded = {month_key: self.directory.encode_month(month_data) for month_key, month_data in months.items()}
+        self.stored.update(encoded)
+        self.inner.save_many(encoded, self.stored)
+
+    def delete_month(self, month_key: str, data: Dict[str, Any] = None):
+        self.stored.pop(month_key, None)
+        self.inner.delete_month(month_key, self.stored)
+
+    def poll_changes(self, data: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        changes = self.inner.poll_changes(self.stored)
+        decoded = {}
+        for month_key, record in changes.items():
+            if record is None:
+                self.stored.pop(month_key, None)
+                decoded[month_key] = None
+            else:
+                self.stored[month_key] = record
+                decoded[month_key] = self.directory.decode_month(record)
+        return decoded
+
+    def get_range(self, start_key: str, end_key: str) -> Dict[str, Any]:
+        return {
+            month_key: self.directory.decode_month(record)
+            for month_key, record in self.inner.get_range(start_key, end_key).items()
+        }
+
+    def aggregate(self, month_keys: List[str]) -> Dict[str, Any]:
+        return self.directory.decode_totals(self.inner.aggregate(month_keys))
@@ -1,118 +1,504 @@
-import json
+import atexit
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from itertools import chain
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.categories import SUBTOTAL_KEY, get_category_registry
+from modules.counterparties import IdEncodedStorage, get_directory
+from modules.long_format import iter_long_rows, iter_month_summaries
+from modules.profiling import profiler
+from modules.rollups import RollupCache
+from modules.storage import create_storage, write_json_atomic
+from modules.year_partitions import YearPartitionStore
 
 class DataManager:
-    def __init__(self, data_file="data/rtb_data.json"):
+    # 합쳐진 쓰기가 실패했을 때 재시도 간격의 상한 (초)
+    WRITE_RETRY_MAX = 30.0
+    
+    def __init__(self, data_file="data/rtb_data.json", columnar=False, backend="json", refresh_interval=1.0,
+                 year_partitions=False, write_delay=0.0):
         self.data_file = data_file
         self.ensure_data_directory()
+        # 월 레코드는 거래처 ID로 저장하고, 메모리에는 현재 거래처명 기준으로 보관
+        counterparty_file = os.path.join(os.path.dirname(data_file), "counterparties.json")
+        self.counterparties = get_directory(counterparty_file)
+        self.categories = get_category_registry(counterparty_file)
+        self.storage = IdEncodedStorage(create_storage(backend, data_file), self.counterparties)
         self.data = self.load_data()
+        self._name_revision = self.counterparties.name_revision
+        self.columnar = columnar
+        
+        # 선택적 연도별 memmap 파티션 (연도 간 추이 조회용, 읽는 연도만 확인하고 바뀌었으면 다시 씀)
+        self.partitions = None
+        # 파티션 파일이 메모리 데이터와 같다고 확인된 연도
+        self._synced_years = set()
+        if year_partitions:
+            self.partitions = YearPartitionStore(os.path.splitext(data_file)[0] + "_years", self.counterparties)
+        
+        # 여러 세션(스레드)이 하나의 인스턴스를 공유하므로 잠금과 버전 카운터로 보호
+        self.lock = threading.RLock()
+        self.version = 0
+        self.change_listeners = []
+        self._rebuild_indexes()
+        
+        # 외부 프로세스(ERP 야간 반영 등)의 파일 변경 감지 주기 (초)
+        self.refresh_interval = refresh_interval
+        self._last_refresh_check = time.monotonic()
+        
+        # 전체 재기록 저장소(JSON/Parquet)는 write_delay(초) 안의 연속 저장을 한 번의 쓰기로 합침
+        self.write_delay = write_delay
+        self._write_timer = None
+        self._write_pending = False
+        self._write_failures = 0
+        self.last_write_error = None
+        if self._coalescing():
+            atexit.register(self.flush)
+    
+    def _rebuild_indexes(self):
+        """전체 데이터 기준으로 파생 인덱스(컬럼형 원장, 집계 캐시) 재구성"""
+        # 선택적 컬럼형 원장 (numpy 기반 벡터 집계)
+        self.ledger = None
+        if self.columnar:
+            from modules.columnar_ledger import ColumnarLedger
+            self.ledger = ColumnarLedger.from_dict(self.data)
+        
+        # 분기/반기/연간 집계 캐시
+        self.rollups = RollupCache.from_dict(self.data)
+
+    
+    def _on_month_changed(self, month_key: str, old_data: Optional[Dict[str, Any]], new_data: Optional[Dict[str, Any]]):
+        """한 달의 변경 사항을 파생 인덱스에 증분 반영"""
+        if self.ledger is not None:
+            if new_data is None:
+                self.ledger.remove_month(month_key)
+            else:
+                self.ledger.set_month(month_key, new_data)
+        self.rollups.apply(month_key, old_data, new_data)
+        self._synced_years.discard(int(month_key[:4]))
+        self.version += 1
+        self._notify_listeners(month_key)
+    
+    def add_change_listener(self, callback):
+        """데이터 변경 알림 등록 - callback(month_key), 전체 교체 시 callback(None)"""
+        self.change_listeners.append(callback)
+    
+    def _notify_listeners(self, month_key: Optional[str]):
+        for callback in self.change_listeners:
+            try:
+                callback(month_key)
+            except Exception as e:
+                print(f"변경 알림 오류: {e}")
+    
+    def get_version(self) -> int:
+        """데이터 버전 조회 (변경될 때마다 1씩 증가)"""
+        return self.version
+    
+    def refresh_if_changed(self, force: bool = False) -> bool:
+        """저장소가 외부에서 변경되었으면 변경된 월만 다시 반영 (mtime/크기/inode 또는 SQLite data_version 확인)"""
+        now = time.monotonic()
+        if not force and now - self._last_refresh_check < self.refresh_interval:
+            return False
+        self._last_refresh_check = now
+        
+        with self.lock:
+            if self._write_pending:
+                # 아직 기록하지 않은 변경이 디스크 내용으로 되돌려지지 않도록 기록 후에 감지
+                return False
+            try:
+                self.counterparties.reload_if_changed()
+                if self.counterparties.name_revision != self._name_revision:
+                    # 다른 프로세스/인스턴스에서 거래처 이름이 바뀐 경우 전체 이름을 다시 매핑
+                    self.storage.poll_changes(self.data)
+                    self.data = self._with_subtotals_all(self.storage.decode_all())
+                    self._name_revision = self.counterparties.name_revision
+                    self._synced_years.clear()
+                    self._rebuild_indexes()
+                    self.version += 1
+                    self._notify_listeners(None)
+                    return True
+                changes = self.storage.poll_changes(self.data)
+            except Exception as e:
+                print(f"데이터 변경 감지 오류: {e}")
+                return False
+            
+            for month_key, new_data in changes.items():
+                old_data = self.data.get(month_key)
+                if new_data is None:
+                    self.data.pop(month_key, None)
+                else:
+                    # 외부에서 바뀐 월은 함께 저장된 소계를 믿지 않고 다시 계산
+                    new_data = self.data[month_key] = self._with_subtotals(new_data, recompute=True)
+                self._on_month_changed(month_key, old_data, new_data)
+            return bool(changes)
     
     def ensure_data_directory(self):
         """데이터 디렉토리가 없으면 생성"""
         os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
     
+    @profiler.timed("data_manager.load_data", size_result=True)
     def load_data(self) -> Dict[str, Any]:
-        """JSON 파일에서 데이터 로드"""
+        """저장소에서 데이터 로드"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
+            return self._with_subtotals_all(self.storage.load())
         except Exception as e:
             print(f"데이터 로드 오류: {e}")
             return {}
     
-    def save_data(self):
-        """데이터를 JSON 파일에 저장"""
+    def _with_subtotals(self, month_data: Dict[str, Any], recompute: bool = False) -> Dict[str, Any]:
+        """파생 소계가 현재 분류 기준인 월 레코드
+
+        저장된 소계는 스키마/분류 구성과 금액 지문이 모두 일치할 때만 사용하고,
+        없거나 오래되었거나 금액이 바뀐 경우(또는 recompute=True) 새로 계산한다.
+        """
+        if not recompute and self.categories.subtotals_verified(month_data):
+            return month_data
+        record = dict(month_data)
+        record[SUBTOTAL_KEY] = self.categories.compute_subtotals(record)
+        return record
+    
+    def _with_subtotals_all(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """모든 월 레코드에 현재 기준 소계 적용 (기존 레코드는 메모리에서만 계산, 다음 저장 시 기록)"""
+        return {month_key: self._with_subtotals(month_data) for month_key, month_data in data.items()}
+    
+    def _coalescing(self) -> bool:
+        return self.write_delay > 0 and self.storage.coalesce_writes
+    
+    def _schedule_flush(self, delay: float):
+        """delay초 후 flush 예약 (잠금 상태에서 호출)"""
+        self._write_timer = threading.Timer(delay, self.flush)
+        self._write_timer.daemon = True
+        self._write_timer.start()
+    
+    def _persist(self, write):
+        """저장소 쓰기 - 쓰기 합치기를 사용하면 예약만 하고 write_delay 후 전체를 한 번에 기록 (잠금 상태에서 호출)"""
+        if self._coalescing():
+            self._write_pending = True
+            if self._write_timer is None:
+                self._schedule_flush(self.write_delay)
+            return
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            write()
         except Exception as e:
             print(f"데이터 저장 오류: {e}")
     
+    def flush(self) -> bool:
+        """예약된 쓰기를 즉시 기록 (종료 시 atexit에서도 호출) - 실패하면 False
+
+        실패하면 last_write_error에 남기고 간격을 두 배씩 늘려(최대 WRITE_RETRY_MAX초) 다시 시도한다.
+        """
+        with self.lock:
+            if self._write_timer is not None:
+                self._write_timer.cancel()
+                self._write_timer = None
+            if not self._write_pending:
+                return True
+            try:
+                self.storage.save_all(self.data)
+            except Exception as e:
+                print(f"데이터 저장 오류: {e}")
+                self.last_write_error = e
+                self._write_failures += 1
+                self._schedule_flush(min(self.write_delay * 2 ** self._write_failures, self.WRITE_RETRY_MAX))
+                return False
+            self._write_pending = False
+            self._write_failures = 0
+            self.last_write_error = None
+            return True
+    
+    def save_data(self):
+        """전체 데이터를 저장소에 저장"""
+        with self.lock:
+            self._persist(lambda: self.storage.save_all(self.data))
+    
     def save_month_data(self, month_key: str, data: Dict[str, Any]):
         """특정 월의 데이터 저장"""
-        self.data[month_key] = data
-        self.save_data()
+        # 이전 이름으로 입력된 거래처는 현재 이름으로 맞추고, 파생 소계는 저장 시 한 번 계산
+        data = self.counterparties.decode_month(data)
+        data[SUBTOTAL_KEY] = self.categories.compute_subtotals(data)
+        with self.lock:
+            old_data = self.data.get(month_key)
+            self.data[month_key] = data
+            self._on_month_changed(month_key, old_data, data)
+            self._persist(lambda: self.storage.save_month(month_key, data, self.data))
+    
+    def save_months(self, months: Dict[str, Dict[str, Any]]):
+        """여러 달 일괄 저장 - 저장소에는 한 번의 쓰기(트랜잭션)로 기록"""
+        months = {month_key: self.counterparties.decode_month(month_data) for month_key, month_data in months.items()}
+        for month_data in months.values():
+            month_data[SUBTOTAL_KEY] = self.categories.compute_subtotals(month_data)
+        with self.lock:
+            for month_key, month_data in sorted(months.items()):
+                old_data = self.data.get(month_key)
+                self.data[month_key] = month_data
+                self._on_month_changed(month_key, old_data, month_data)
+            self._persist(lambda: self.storage.save_many(months, self.data))
     
     def get_month_data(self, month_key: str) -> Dict[str, Any]:
-        """특정 월의 데이터 조회"""
-        return self.data.get(month_key, {})
+        """특정 월의 데이터 조회 (저장된 소계 포함 - 분류 구성이 바뀌었으면 다시 계산)"""
+        self.refresh_if_changed()
+        with self.lock:
+            month_data = self.data.get(month_key)
+            if month_data is None:
+                return {}
+            if not self.categories.subtotals_current(month_data):
+                month_data = self.data[month_key] = self._with_subtotals(month_data)
+            return month_data
     
     def get_all_data(self) -> Dict[str, Any]:
-        """모든 데이터 조회"""
-        return self.data
+        """모든 데이터 조회 (다른 세션의 동시 저장에 안전한 얕은 복사본)"""
+        self.refresh_if_changed()
+        with self.lock:
+            return dict(self.data)
+    
+    def iter_months(self, start_key: Optional[str] = None, end_key: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """월 키 순서로 (월 키, 월 레코드) 순회 - 키 목록만 복사하고 레코드는 하나씩 조회"""
+        self.refresh_if_changed()
+        with self.lock:
+            month_keys = sorted(
+                month_key for month_key in self.data
+                if (start_key is None or month_key >= start_key) and (end_key is None or month_key <= end_key)
+            )
+        for month_key in month_keys:
+            month_data = self.data.get(month_key)
+            if month_data is not None:  # 순회 중 삭제된 월은 건너뜀
+                yield month_key, month_data
+    
+    def iter_long_rows(self, start_key: Optional[str] = None, end_key: Optional[str] = None) -> Iterator[tuple]:
+        """(년도, 월, 구분, 항목, 금액) 행 제너레이터 - 스트리밍 내보내기용"""
+        return iter_long_rows(self.iter_months(start_key, end_key))
+    
+    def iter_month_summaries(self, start_key: Optional[str] = None, end_key: Optional[str] = None) -> Iterator[tuple]:
+        """(년도, 월, 총매출, 총매입, 순이익, 수익률) 행 제너레이터"""
+        return iter_month_summaries(self.iter_months(start_key, end_key))
     
     def delete_month_data(self, month_key: str):
         """특정 월의 데이터 삭제"""
-        if month_key in self.data:
-            del self.data[month_key]
-            self.save_data()
+        with self.lock:
+            if month_key in self.data:
+                old_data = self.data.pop(month_key)
+                self._on_month_changed(month_key, old_data, None)
+                self._persist(lambda: self.storage.delete_month(month_key, self.data))
     
+    def _stored_month_keys(self, period_data: Dict[str, Any]) -> Optional[List[str]]:
+        """period_data가 저장된 월 레코드 객체 그대로인 경우 해당 월 키 목록 반환 (잠금 상태에서 호출)
+
+        내용 비교는 집계만큼 비용이 들므로 객체 동일성만 확인하고, 복사본이나 직접 만든 dict는 None
+        """
+        for month_key, month_data in period_data.items():
+            if self.data.get(month_key) is not month_data:
+                return None
+        return list(period_data.keys())
+    
+    @profiler.timed("data_manager.aggregate_period_data", size_arg=1)
     def aggregate_period_data(self, period_data: Dict[str, Any]) -> Dict[str, Any]:
         """기간별 데이터 자동 집계 - 입력된 모든 매출처/매입처를 동적으로 집계"""
+        with self.lock:
+            if self.ledger is not None:
+                month_keys = self._stored_month_keys(period_data)
+                if month_keys is not None:
+                    return self.ledger.aggregate(month_keys)
+            elif self.storage.supports_queries:
+                month_keys = self._stored_month_keys(period_data)
+                if month_keys is not None:
+                    self.flush()
+                    return self.storage.aggregate(month_keys)
+        
+        return self._aggregate_vectorized(period_data)
+    
+    @staticmethod
+    def _aggregate_vectorized(period_data: Dict[str, Any]) -> Dict[str, Any]:
+        """거래처명을 정수 코드로 인코딩(factorize)한 뒤 구분별로 벡터 합산 한 번으로 집계"""
         aggregated = {
             '매출': {},
             '매입': {}
         }
         
-        # 모든 매출처를 동적으로 수집
-        all_revenue_sources = set()
-        for month_data in period_data.values():
-            if '매출' in month_data:
-                all_revenue_sources.update(month_data['매출'].keys())
-        
-        # 매출처별 집계
-        for source in all_revenue_sources:
-            total = 0
-            for month_data in period_data.values():
-                total += month_data.get('매출', {}).get(source, 0)
-            if total > 0:  # 0보다 큰 항목만 포함
-                aggregated['매출'][source] = total
-        
-        # 모든 매입 항목을 동적으로 수집
-        all_expense_items = set()
-        for month_data in period_data.values():
-            if '매입' in month_data:
-                all_expense_items.update(month_data['매입'].keys())
-        
-        # 매입 항목별 집계
-        for item in all_expense_items:
-            total = 0
-            for month_data in period_data.values():
-                total += month_data.get('매입', {}).get(item, 0)
-            if total > 0:  # 0보다 큰 항목만 포함
-                aggregated['매입'][item] = total
+        for kind in aggregated:
+            month_items = [month_data.get(kind, {}) for month_data in period_data.values()]
+            names = list(chain.from_iterable(month_items))
+            if not names:
+                continue
+            
+            values = list(chain.from_iterable(items.values() for items in month_items))
+            # 원 단위 금액은 int64로 합산 (float 버퍼면 결과가 float가 되어 dict 경로/Excel/백업과 달라짐)
+            integral = all(isinstance(value, (int, np.integer)) or (isinstance(value, float) and value.is_integer())
+                           for value in values)
+            amounts = np.array(values, dtype=np.int64 if integral else np.float64)
+            codes, uniques = pd.factorize(np.array(names, dtype=object))
+            totals = np.zeros(len(uniques), dtype=amounts.dtype)
+            np.add.at(totals, codes, amounts)
+            
+            positive = np.flatnonzero(totals > 0)  # 0보다 큰 항목만 포함
+            aggregated[kind] = dict(zip(uniques[positive].tolist(), totals[positive].tolist()))
         
         return aggregated
     
+    def get_rollup(self, period_type: str, year: int = None, index: int = None) -> Dict[str, Any]:
+        """미리 계산된 기간 집계 조회 (period_type: quarter | half | year | all)"""
+        self.refresh_if_changed()
+        with self.lock:
+            return self.rollups.get(period_type, year, index)
+    
+    def get_rollup_totals(self, period_type: str, year: int = None, index: int = None) -> Dict[str, Any]:
+        """미리 계산된 구분별 총액 조회 ({'매출': 총액, '매입': 총액})"""
+        self.refresh_if_changed()
+        with self.lock:
+            return self.rollups.get_totals(period_type, year, index)
+    
     def get_year_data(self, year: int) -> Dict[str, Any]:
         """특정 연도의 모든 데이터 조회"""
+        self.refresh_if_changed()
+        if self.storage.supports_queries:
+            self.flush()
+            # 저장소 조회 결과도 메모리 데이터와 같은 형식(현재 기준 소계 포함)으로 반환
+            return self._with_subtotals_all(self.storage.get_range(f"{year}-01", f"{year}-12"))
+        
         year_data = {}
-        for month_key, data in self.data.items():
-            if month_key.startswith(str(year)):
-                year_data[month_key] = data
+        with self.lock:
+            for month_key, data in self.data.items():
+                if month_key.startswith(str(year)):
+                    year_data[month_key] = data
         return year_data
     
+    def get_revenue_cube(self, start_year: int, end_year: int, by_month: bool = False, kind: str = '매출') -> pd.DataFrame:
+        """연도(× 월) × 거래처 금액 큐브 - 기간 내 등장한 모든 거래처를 한 번에 집계
+
+        by_month=False면 index가 연도, True면 (연도, 월) MultiIndex인 int64 DataFrame 반환
+        """
+        self.refresh_if_changed()
+        years = list(range(start_year, end_year + 1))
+        month_keys = [f"{year}-{month:02d}" for year in years for month in range(1, 13)]
+        
+        with self.lock:
+            if self.partitions is not None:
+                names, matrix = self._partition_matrix(years, kind)
+            elif self.ledger is not None:
+                names, matrix = self.ledger.month_matrix(month_keys, kind)
+            else:
+                names, matrix = self._month_matrix(month_keys, kind)
+        
+        if by_month:
+            index = pd.MultiIndex.from_product([years, range(1, 13)], names=['연도', '월'])
+            return pd.DataFrame(matrix, index=index, columns=names)
+        
+        yearly = matrix.reshape(len(years), 12, len(names)).sum(axis=1)
+        return pd.DataFrame(yearly, index=pd.Index(years, name='연도'), columns=names)
+    
+    def _partition_matrix(self, years: List[int], kind: str):
+        """여러 연도의 파티션 뷰를 하나의 [연도 × 12, 거래처 수] 행렬로 결합 (해당 연도 파일만 읽음)"""
+        columns = {}
+        blocks = []
+        for year in years:
+            names, view = self._year_matrix(year, kind)
+            blocks.append(([columns.setdefault(name, len(columns)) for name in names], view))
+        
+        matrix = np.zeros((len(years) * 12, len(columns)), dtype=np.int64)
+        for position, (codes, view) in enumerate(blocks):
+            if codes:
+                matrix[position * 12:(position + 1) * 12, codes] = view
+        return list(columns), matrix
+    
+    def _sync_partition(self, year: int) -> bool:
+        """읽으려는 연도의 파티션만 확인 - 이 인스턴스가 확인한 뒤 바뀐 연도만 비교하고, 내용이 다르면 다시 씀
+
+        (잠금 상태에서 호출) 실패하면 False
+        """
+        if year in self._synced_years:
+            return True
+        try:
+            self.partitions.write(year, self.data)
+        except Exception as e:
+            print(f"연도 파티션 저장 오류: {e}")
+            return False
+        self._synced_years.add(year)
+        return True
+    
+    def _year_matrix(self, year: int, kind: str) -> Tuple[List[str], np.ndarray]:
+        """(거래처명 목록, [12, 거래처 수] 행렬) - 파티션이 있으면 memmap 뷰, 없으면 메모리에서 생성 (잠금 상태에서 호출)"""
+        if self.partitions is not None and self._sync_partition(year):
+            partition = self.partitions.open(year)
+            if partition is None:
+                return [], np.zeros((12, 0), dtype=np.int64)
+            ids, view = partition.kind_view(kind)
+            return [self.counterparties.name_of(cp_id) for cp_id in ids], view
+        
+        month_keys = [f"{year}-{month:02d}" for month in range(1, 13)]
+        if self.ledger is not None:
+            return self.ledger.month_matrix(month_keys, kind)
+        return self._month_matrix(month_keys, kind)
+    
+    def get_year_matrix(self, year: int, kind: str = '매출') -> Tuple[List[str], np.ndarray]:
+        """특정 연도의 월 × 거래처 금액 행렬 (year_partitions 사용 시 복사 없는 읽기 전용 뷰)"""
+        self.refresh_if_changed()
+        with self.lock:
+            return self._year_matrix(year, kind)
+    
+    def _month_matrix(self, month_keys: List[str], kind: str):
+        """월 키 목록 × 거래처 금액 행렬을 dict 데이터에서 한 번의 순회로 생성 (잠금 상태에서 호출)"""
+        columns = {}
+        positions, codes, amounts = [], [], []
+        for position, month_key in enumerate(month_keys):
+            month_data = self.data.get(month_key)
+            if not month_data:
+                continue
+            for name, amount in month_data.get(kind, {}).items():
+                positions.append(position)
+                codes.append(columns.setdefault(name, len(columns)))
+                amounts.append(int(amount))
+        
+        matrix = np.zeros((len(month_keys), len(columns)), dtype=np.int64)
+        np.add.at(matrix, (positions, codes), amounts)
+        return list(columns), matrix
+    
     def get_period_data(self, year: int, start_month: int, end_month: int) -> Dict[str, Any]:
         """특정 기간의 데이터 조회"""
+        self.refresh_if_changed()
+        if self.storage.supports_queries:
+            self.flush()
+            # 저장소 조회 결과도 메모리 데이터와 같은 형식(현재 기준 소계 포함)으로 반환
+            return self._with_subtotals_all(self.storage.get_range(f"{year}-{start_month:02d}", f"{year}-{end_month:02d}"))
+        
         period_data = {}
-        for month in range(start_month, end_month + 1):
-            month_key = f"{year}-{month:02d}"
-            if month_key in self.data:
-                period_data[month_key] = self.data[month_key]
+        with self.lock:
+            for month in range(start_month, end_month + 1):
+                month_key = f"{year}-{month:02d}"
+                if month_key in self.data:
+                    period_data[month_key] = self.data[month_key]
         return period_data
     
+    def rename_counterparty(self, kind: str, old_name: str, new_name: str) -> int:
+        """거래처 이름 변경 - 거래처 테이블만 수정하고 저장된 월 데이터는 다시 쓰지 않음"""
+        with self.lock:
+            cp_id = self.counterparties.rename(kind, old_name, new_name)
+            self._name_revision = self.counterparties.name_revision
+            
+            # 메모리의 이름 기준 레코드만 새 이름으로 교체 (디스크 재기록 없음)
+            for month_key, month_data in self.data.items():
+                items = month_data.get(kind)
+                if items and old_name in items:
+                    renamed = {new_name if name == old_name else name: amount for name, amount in items.items()}
+                    self.data[month_key] = {**month_data, kind: renamed}
+            
+            self._rebuild_indexes()
+            self.version += 1
+            self._notify_listeners(None)
+            return cp_id
+    
     def backup_data(self) -> str:
         """데이터 백업 파일 생성"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_filename = f"data/rtb_backup_{timestamp}.json"
         
         try:
-            with open(backup_filename, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            # 사람이 열어 보는 파일이므로 들여쓰기 형식으로 기록
+            with self.lock:
+                write_json_atomic(backup_filename, self.data, pretty=True)
             return backup_filename
         except Exception as e:
             print(f"백업 오류: {e}")
@@ -120,8 +506,13 @@ class DataManager:
     
     def restore_data(self, backup_data: Dict[str, Any]):
         """백업 데이터로 복원"""
-        self.data = backup_data
-        self.save_data()
+        with self.lock:
+            self.data = backup_data
+            self._synced_years.clear()
+            self._rebuild_indexes()
+            self.version += 1
+            self._notify_listeners(None)
+            self.save_data()
     
     def validate_data(self, data: Dict[str, Any]) -> bool:
         """데이터 유효성 검증"""
@@ -131,19 +522,14 @@ class DataManager:
             if key not in data:
                 return False
         
-        # 매출처 검증 (전자세금계산서매출 + 영세매출 + 기타)
-        electronic_tax_sources = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"]
-        zero_rated_sources = ["Everllence LEO", "Mitsui"]
-        other_sources = ["기타"]
-        required_revenue_sources = electronic_tax_sources + [s for s in zero_rated_sources if s not in electronic_tax_sources] + other_sources
-        for source in required_revenue_sources:
-            if source not in data.get('매출', {}):
+        # 매출처/매입 항목 검증 (분류 설정 기준, 없는 항목은 0으로 채움)
+        categories = self.categories.snapshot()
+        for source in categories.revenue_sources:
+            if source not in data['매출']:
                 data['매출'][source] = 0
         
-        # 매입 항목 검증
-        required_expense_items = ["급여", "수당", "법인카드 사용액", "전자세금계산서", "세금", "이자", "퇴직금", "기타"]
-        for item in required_expense_items:
-            if item not in data.get('매입', {}):
+        for item in categories.expense_items:
+            if item not in data['매입']:
                 data['매입'][item] = 0
         
         return True
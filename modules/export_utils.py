@@ -1,24 +1,42 @@
+import csv
+import hashlib
+import io
+import json
 import os
+import threading
+import uuid
+from collections import OrderedDict
 import pandas as pd
-from reportlab.lib.pagesizes import A4, letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
 import tempfile
 
-class ExportManager:
-    def __init__(self):
-        self.temp_dir = tempfile.gettempdir()
-        self._register_fonts()
-    
-    def _register_fonts(self):
-        """한글 폰트 등록 (시스템에 있는 기본 폰트 사용)"""
+from modules.categories import CategoryRegistry, get_category_registry, month_totals
+from modules.long_format import LONG_COLUMNS, SUMMARY_COLUMNS, iter_long_rows, iter_month_summaries
+from modules.profiling import profiler
+
+# reportlab/openpyxl은 실제로 PDF/Excel을 만들 때 각 메서드 안에서 import (앱 시작 시간 단축)
+
+# 보고서 레이아웃을 바꾸면 올려서 기존 캐시 파일을 무효화
+TEMPLATE_VERSION = "1"
+
+# 한글 폰트는 프로세스당 한 번, 첫 PDF 생성 시 등록
+_fonts_registered = False
+_fonts_lock = threading.Lock()
+
+
+def _register_fonts():
+    """한글 폰트 등록 (시스템에 있는 기본 폰트 사용)"""
+    global _fonts_registered
+    if _fonts_registered:
+        return
+    with _fonts_lock:
+        if _fonts_registered:
+            return
         try:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+            
             # 시스템 기본 폰트 경로들
             font_paths = [
                 '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
@@ -35,13 +53,144 @@ class ExportManager:
                 print("한글 폰트를 찾을 수 없어 기본 폰트를 사용합니다.")
         except Exception as e:
             print(f"폰트 등록 오류: {e}")
+        _fonts_registered = True
+
+
+class ExportManager:
+    def __init__(self, cache_dir: str = None, max_artifacts: int = 200, max_cache_bytes: int = 200 * 1024 * 1024,
+                 max_memory_bytes: int = 64 * 1024 * 1024, categories: Optional[CategoryRegistry] = None):
+        # 매출처/매입 항목 분류 설정 (없으면 기본 거래처 테이블 사용)
+        self._categories = categories
+        
+        # 내용 주소 기반(content-addressed) 내보내기 파일 캐시 - 폴더는 실제로 파일을 쓸 때 생성
+        # (화면 다운로드는 메모리에서만 생성하므로 읽기 전용/임시 폴더 없는 환경에서도 동작)
+        self._cache_dir = cache_dir
+        self.max_artifacts = max_artifacts
+        self.max_cache_bytes = max_cache_bytes
+        
+        # 메모리 내보내기(BytesIO) 결과 캐시 - 디스크를 거치지 않음
+        self.max_memory_bytes = max_memory_bytes
+        self._bytes_cache = OrderedDict()
+        self._bytes_cache_size = 0
+        self._bytes_lock = threading.Lock()
+    
+    @property
+    def cache_dir(self) -> str:
+        """내보내기 파일 캐시 폴더 (지정하지 않으면 임시 폴더 아래 rtb_exports)"""
+        if self._cache_dir is None:
+            self._cache_dir = os.path.join(tempfile.gettempdir(), "rtb_exports")
+        return self._cache_dir
+    
+    def _ensure_cache_dir(self) -> str:
+        """파일을 기록하기 직전에 캐시 폴더 생성"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return self.cache_dir
+    
+    @property
+    def categories(self) -> CategoryRegistry:
+        """매출처/매입 항목 분류 설정"""
+        if self._categories is None:
+            self._categories = get_category_registry()
+        return self._categories
+    
+    @staticmethod
+    def _artifact_digest(kind: str, payload: Any, layout: str = "") -> str:
+        """(보고서 내용, 템플릿 버전, 분류 구성) 해시 - PDF에 찍히는 생성 시각(generated_at)도 내용에 포함"""
+        content = json.dumps([kind, TEMPLATE_VERSION, layout, payload], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:20]
+    
+    def artifact_digest(self, kind: str, payload: Any, ignore_generated_at: bool = False) -> str:
+        """현재 분류 구성 기준 내보내기 파일 해시 (분류가 바뀌면 캐시 무효화)
+        
+        ignore_generated_at=True면 보고서 생성 시각을 빼고 데이터만 비교 (배치 매니페스트의 변경 여부 판단용)
+        """
+        if ignore_generated_at and isinstance(payload, dict):
+            payload = {k: v for k, v in payload.items() if k != 'generated_at'}
+        return self._artifact_digest(kind, payload, self.categories.signature())
+    
+    def _cached_artifact(self, kind: str, filename: str, payload: Any, extension: str, writer: Callable[[str], None]) -> str:
+        """같은 내용의 파일이 캐시에 있으면 재사용하고, 없으면 생성 후 캐시에 등록"""
+        filepath = os.path.join(self._ensure_cache_dir(), f"{filename}_{self.artifact_digest(kind, payload)}.{extension}")
+        
+        if os.path.exists(filepath):
+            os.utime(filepath)  # LRU 제거 기준 갱신
+            return filepath
+        
+        # 동시 사용자가 같은 파일을 덮어쓰지 않도록 고유 임시 파일에 생성 후 교체
+        tmp_path = os.path.join(self.cache_dir, f".{uuid.uuid4().hex}.tmp.{extension}")
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        self._evict_artifacts()
+        return filepath
+    
+    def _cached_bytes(self, kind: str, payload: Any, writer: Callable[[Any], None]) -> bytes:
+        """임시 파일 없이 io.BytesIO에 직접 생성 (같은 내용이면 메모리 LRU 캐시에서 반환)"""
+        digest = self.artifact_digest(kind, payload)
+        with self._bytes_lock:
+            content = self._bytes_cache.get(digest)
+            if content is not None:
+                self._bytes_cache.move_to_end(digest)
+                return content
+        
+        buffer = io.BytesIO()
+        writer(buffer)
+        content = buffer.getvalue()
+        
+        with self._bytes_lock:
+            if digest not in self._bytes_cache:
+                self._bytes_cache[digest] = content
+                self._bytes_cache_size += len(content)
+            while self._bytes_cache and self._bytes_cache_size > self.max_memory_bytes:
+                _, evicted = self._bytes_cache.popitem(last=False)
+                self._bytes_cache_size -= len(evicted)
+        return content
+    
+    def _evict_artifacts(self):
+        """개수/용량 한도를 넘으면 가장 오래 사용되지 않은 파일부터 삭제"""
+        try:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if name.startswith('.'):
+                    continue  # 생성 중인 임시 파일
+                path = os.path.join(self.cache_dir, name)
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+            
+            entries.sort()
+            total_bytes = sum(size for _, size, _ in entries)
+            while entries and (len(entries) > self.max_artifacts or total_bytes > self.max_cache_bytes):
+                _, size, path = entries.pop(0)
+                os.remove(path)
+                total_bytes -= size
+        except OSError as e:
+            print(f"내보내기 캐시 정리 오류: {e}")
     
     def generate_pdf_report(self, report_data: Dict[str, Any], filename: str) -> str:
-        """PDF 보고서 생성"""
-        filepath = os.path.join(self.temp_dir, f"{filename}.pdf")
+        """PDF 보고서 생성 (같은 내용이면 캐시된 파일 반환)"""
+        return self._cached_artifact('pdf', filename, report_data, 'pdf',
+                                     lambda filepath: self._write_pdf_report(report_data, filepath))
+    
+    def render_pdf_bytes(self, report_data: Dict[str, Any]) -> bytes:
+        """PDF 보고서를 파일 없이 메모리에서 생성"""
+        return self._cached_bytes('pdf', report_data, lambda buffer: self._write_pdf_report(report_data, buffer))
+    
+    def _write_pdf_report(self, report_data: Dict[str, Any], target):
+        """PDF 보고서 생성 (target: 파일 경로 또는 파일 객체)"""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.lib import colors
+        
+        _register_fonts()
         
         doc = SimpleDocTemplate(
-            filepath,
+            target,
             pagesize=A4,
             rightMargin=72,
             leftMargin=72,
@@ -119,8 +268,12 @@ class ExportManager:
         story.append(Spacer(1, 12))
         
         # 기본 정보
+        # 작성일시는 캐시 키에 포함된 보고서 생성 시각 (렌더링 시각을 찍으면 캐시된 파일과 어긋남)
+        # generated_at이 없는 내용이면 지금 시각
+        generated_at = report_data.get('generated_at') if isinstance(report_data, dict) else None
+        created = datetime.fromisoformat(generated_at) if generated_at else datetime.now()
         info_data = [
-            ['작성일시', datetime.now().strftime('%Y년 %m월 %d일 %H:%M')],
+            ['작성일시', created.strftime('%Y년 %m월 %d일 %H:%M')],
             ['작성부서', 'RTB 회계팀'],
             ['보고기간', report_data.get('period', '') if isinstance(report_data, dict) else '']
         ]
@@ -144,11 +297,14 @@ class ExportManager:
             # 단순 데이터인 경우
             self._add_simple_data_content(story, report_data, heading_style, normal_style)
         
-        doc.build(story)
-        return filepath
+        with profiler.measure("export.pdf_build", len(story)):
+            doc.build(story)
     
     def _add_report_content(self, story, report_data: Dict[str, Any], heading_style, normal_style):
         """보고서 내용 추가"""
+        from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.units import inch
+        from reportlab.lib import colors
         
         # 요약 정보
         if 'summary' in report_data:
@@ -179,20 +335,18 @@ class ExportManager:
         if 'data' in report_data:
             data = report_data['data']
             
-            # 매출 데이터 (분류별로 표시)
+            # 매출 데이터 (분류별로 표시, 소계는 저장된 값 사용)
             if '매출' in data:
                 story.append(Paragraph("■ 매출 현황", heading_style))
+                subtotals = self.categories.subtotals(data)
                 
                 # 전자세금계산서매출
                 story.append(Paragraph("○ 전자세금계산서매출", normal_style))
-                electronic_tax_sources = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"]
+                electronic_tax_sources = self.categories.revenue_sources('전자세금계산서')
                 electronic_data = [['매출처', '금액']]
-                electronic_total = 0
                 for source in electronic_tax_sources:
-                    amount = data['매출'].get(source, 0)
-                    electronic_data.append([source, f"{amount:,}원"])
-                    electronic_total += amount
-                electronic_data.append(['소계', f"{electronic_total:,}원"])
+                    electronic_data.append([source, f"{data['매출'].get(source, 0):,}원"])
+                electronic_data.append(['소계', f"{subtotals['전자세금계산서매출']:,}원"])
                 
                 electronic_table = Table(electronic_data, colWidths=[2.5*inch, 2.5*inch])
                 electronic_table.setStyle(TableStyle([
@@ -208,14 +362,11 @@ class ExportManager:
                 
                 # 영세매출
                 story.append(Paragraph("○ 영세매출", normal_style))
-                zero_rated_sources = ["Everllence LEO", "Mitsui"]
+                zero_rated_sources = self.categories.revenue_sources('영세')
                 zero_data = [['매출처', '금액']]
-                zero_total = 0
                 for source in zero_rated_sources:
-                    amount = data['매출'].get(source, 0)
-                    zero_data.append([source, f"{amount:,}원"])
-                    zero_total += amount
-                zero_data.append(['소계', f"{zero_total:,}원"])
+                    zero_data.append([source, f"{data['매출'].get(source, 0):,}원"])
+                zero_data.append(['소계', f"{subtotals['영세매출']:,}원"])
                 
                 zero_table = Table(zero_data, colWidths=[2.5*inch, 2.5*inch])
                 zero_table.setStyle(TableStyle([
@@ -231,8 +382,9 @@ class ExportManager:
                 
                 # 기타 매출
                 story.append(Paragraph("○ 기타 매출", normal_style))
-                other_amount = data['매출'].get("기타", 0)
-                other_data = [['매출처', '금액'], ['기타', f"{other_amount:,}원"]]
+                other_data = [['매출처', '금액']]
+                for source in self.categories.revenue_sources('기타'):
+                    other_data.append([source, f"{data['매출'].get(source, 0):,}원"])
                 
                 other_table = Table(other_data, colWidths=[2.5*inch, 2.5*inch])
                 other_table.setStyle(TableStyle([
@@ -266,6 +418,8 @@ class ExportManager:
     
     def _add_simple_data_content(self, story, data, heading_style, normal_style):
         """단순 데이터 내용 추가"""
+        from reportlab.platypus import Paragraph, Spacer
+        
         if isinstance(data, dict):
             for key, value in data.items():
                 story.append(Paragraph(f"■ {key}", heading_style))
@@ -273,10 +427,17 @@ class ExportManager:
                 story.append(Spacer(1, 12))
     
     def generate_excel_report(self, data: Dict[str, Any], filename: str) -> str:
-        """Excel 보고서 생성"""
-        filepath = os.path.join(self.temp_dir, f"{filename}.xlsx")
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+        """Excel 보고서 생성 (같은 내용이면 캐시된 파일 반환)"""
+        return self._cached_artifact('excel', filename, data, 'xlsx',
+                                     lambda filepath: self._write_excel_report(data, filepath))
+    
+    def render_excel_bytes(self, data: Dict[str, Any]) -> bytes:
+        """Excel 보고서를 파일 없이 메모리에서 생성"""
+        return self._cached_bytes('excel', data, lambda buffer: self._write_excel_report(data, buffer))
+    
+    def _write_excel_report(self, data: Dict[str, Any], target):
+        """Excel 보고서 생성 (target: 파일 경로 또는 파일 객체)"""
+        with pd.ExcelWriter(target, engine='openpyxl') as writer:
             
             # 요약 시트
             if isinstance(data, dict):
@@ -291,8 +452,7 @@ class ExportManager:
                     expense_df.to_excel(writer, sheet_name='매입현황', index=False)
                 
                 # 요약 정보
-                total_revenue = sum(data.get('매출', {}).values())
-                total_expense = sum(data.get('매입', {}).values())
+                total_revenue, total_expense = month_totals(data)
                 net_profit = total_revenue - total_expense
                 
                 summary_data = {
@@ -307,22 +467,20 @@ class ExportManager:
                 
                 summary_df = pd.DataFrame(summary_data)
                 summary_df.to_excel(writer, sheet_name='요약', index=False)
-        
-        return filepath
     
     def generate_comparison_excel(self, period_data: Dict[str, Any], filename: str) -> str:
+        """기간별 비교 Excel 생성 (같은 내용이면 캐시된 파일 반환)"""
+        return self._cached_artifact('comparison_excel', filename, period_data, 'xlsx',
+                                     lambda filepath: self._write_comparison_excel(period_data, filepath))
+    
+    def _write_comparison_excel(self, period_data: Dict[str, Any], filepath: str):
         """기간별 비교 Excel 생성"""
-        filepath = os.path.join(self.temp_dir, f"{filename}.xlsx")
-        
         with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
             
             # 월별 매출 현황
             months = sorted(period_data.keys())
             # 매출처 구성 (전자세금계산서매출 + 영세매출 + 기타)
-            electronic_tax_sources = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"]
-            zero_rated_sources = ["Everllence LEO", "Mitsui"]
-            other_sources = ["기타"]
-            revenue_sources = electronic_tax_sources + [s for s in zero_rated_sources if s not in electronic_tax_sources] + other_sources
+            revenue_sources = self.categories.revenue_sources()
             
             revenue_comparison = {'월': []}
             for source in revenue_sources:
@@ -340,7 +498,7 @@ class ExportManager:
             revenue_df.to_excel(writer, sheet_name='월별매출비교', index=False)
             
             # 월별 매입 현황
-            expense_items = ["급여", "수당", "법인카드 사용액", "전자세금계산서", "세금", "이자", "퇴직금", "기타"]
+            expense_items = self.categories.expense_items()
             
             expense_comparison = {'월': []}
             for item in expense_items:
@@ -370,8 +528,7 @@ class ExportManager:
                 month_label = f"{month.split('-')[0]}년 {int(month.split('-')[1])}월"
                 data = period_data[month]
                 
-                total_revenue = sum(data.get('매출', {}).values())
-                total_expense = sum(data.get('매입', {}).values())
+                total_revenue, total_expense = month_totals(data)
                 net_profit = total_revenue - total_expense
                 profit_margin = (net_profit / total_revenue * 100) if total_revenue > 0 else 0
                 
@@ -383,63 +540,100 @@ class ExportManager:
             
             summary_df = pd.DataFrame(monthly_summary)
             summary_df.to_excel(writer, sheet_name='월별요약', index=False)
-        
-        return filepath
     
     def export_backup_data(self, all_data: Dict[str, Any], filename: str) -> str:
-        """전체 데이터 백업 Excel 생성"""
-        filepath = os.path.join(self.temp_dir, f"{filename}.xlsx")
+        """전체 데이터 백업 Excel 생성 (같은 내용이면 캐시된 파일 반환)"""
+        return self._cached_artifact('backup_excel', filename, all_data, 'xlsx',
+                                     lambda filepath: self._write_backup_data(all_data, filepath))
+    
+    def _write_backup_data(self, all_data: Dict[str, Any], filepath: str):
+        """전체 데이터 백업 Excel 생성 (행 단위 스트리밍 기록)"""
+        self.write_backup_stream(lambda: sorted(all_data.items()), filepath, 'xlsx')
+    
+    def write_backup_stream(self, months: Callable[[], Iterable[Tuple[str, Dict[str, Any]]]], target, fmt: str = 'xlsx') -> int:
+        """(월 키, 월 레코드) 순회를 긴 형식 백업으로 스트리밍 기록하고 기록한 행 수 반환
         
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            
-            # 전체 데이터를 하나의 시트에 정리
-            export_data = []
-            
-            for month_key, month_data in sorted(all_data.items()):
-                year, month = month_key.split('-')
-                
-                # 매출 데이터
-                for source, amount in month_data.get('매출', {}).items():
-                    export_data.append({
-                        '년도': int(year),
-                        '월': int(month),
-                        '구분': '매출',
-                        '항목': source,
-                        '금액': amount
-                    })
-                
-                # 매입 데이터
-                for item, amount in month_data.get('매입', {}).items():
-                    export_data.append({
-                        '년도': int(year),
-                        '월': int(month),
-                        '구분': '매입',
-                        '항목': item,
-                        '금액': amount
-                    })
-            
-            df = pd.DataFrame(export_data)
-            df.to_excel(writer, sheet_name='전체데이터', index=False)
-            
-            # 월별 요약 시트
-            monthly_summaries = []
-            for month_key, month_data in sorted(all_data.items()):
-                year, month = month_key.split('-')
-                
-                total_revenue = sum(month_data.get('매출', {}).values())
-                total_expense = sum(month_data.get('매입', {}).values())
-                net_profit = total_revenue - total_expense
-                
-                monthly_summaries.append({
-                    '년도': int(year),
-                    '월': int(month),
-                    '총매출': total_revenue,
-                    '총매입': total_expense,
-                    '순이익': net_profit,
-                    '수익률(%)': round((net_profit / total_revenue * 100) if total_revenue > 0 else 0, 1)
-                })
+        months는 호출할 때마다 새 순회를 돌려주는 함수 (Excel은 요약 시트를 위해 두 번 순회).
+        행을 리스트/DataFrame으로 모으지 않으므로 메모리 사용량이 이력 길이와 무관하다.
+        """
+        writers = {'xlsx': self._stream_excel, 'csv': self._stream_csv, 'parquet': self._stream_parquet}
+        if fmt not in writers:
+            raise ValueError(f"지원하지 않는 백업 형식입니다: {fmt}")
+        with profiler.measure(f"export.backup_stream.{fmt}") as info:
+            info['size'] = writers[fmt](months, target)
+        return info['size']
+    
+    @staticmethod
+    def _stream_excel(months, target) -> int:
+        """openpyxl write-only 워크북 - 행을 바로 임시 파일로 내보내고 셀 객체를 보관하지 않음"""
+        from openpyxl import Workbook
+        
+        workbook = Workbook(write_only=True)
+        rows_sheet = workbook.create_sheet('전체데이터')
+        rows_sheet.append(LONG_COLUMNS)
+        count = 0
+        for row in iter_long_rows(months()):
+            rows_sheet.append(row)
+            count += 1
+        
+        summary_sheet = workbook.create_sheet('월별요약')
+        summary_sheet.append(SUMMARY_COLUMNS)
+        for row in iter_month_summaries(months()):
+            summary_sheet.append(row)
+        
+        workbook.save(target)
+        return count
+    
+    @staticmethod
+    def _stream_csv(months, target) -> int:
+        """CSV (UTF-8 BOM - Excel에서 한글이 깨지지 않도록)"""
+        count = 0
+        with open(target, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(LONG_COLUMNS)
+            for row in iter_long_rows(months()):
+                writer.writerow(row)
+                count += 1
+        return count
+    
+    @staticmethod
+    def _stream_parquet(months, target, batch_rows: int = 50_000) -> int:
+        """Parquet - batch_rows 행씩 row group으로 기록 (pyarrow 필요)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        schema = pa.schema([
+            ('년도', pa.int16()), ('월', pa.int8()), ('구분', pa.string()), ('항목', pa.string()), ('금액', pa.int64())
+        ])
+        count = 0
+        with pq.ParquetWriter(target, schema, compression='zstd') as writer:
+            def flush(batch):
+                columns = zip(*batch)
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema))
             
-            summary_df = pd.DataFrame(monthly_summaries)
-            summary_df.to_excel(writer, sheet_name='월별요약', index=False)
+            batch = []
+            for row in iter_long_rows(months()):
+                batch.append(row)
+                if len(batch) >= batch_rows:
+                    flush(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+                count += len(batch)
+        return count
+    
+    def export_backup_stream(self, data_manager, filename: str, fmt: str = 'xlsx') -> str:
+        """DataManager 전체 이력을 스트리밍 백업 파일로 생성 (내용 해시 없이 바로 기록)"""
+        filepath = os.path.join(self._ensure_cache_dir(), f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.{fmt}")
+        tmp_path = os.path.join(self.cache_dir, f".{uuid.uuid4().hex}.tmp.{fmt}")
+        try:
+            self.write_backup_stream(data_manager.iter_months, tmp_path, fmt)
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         
+        self._evict_artifacts()
         return filepath
@@ -0,0 +1,45 @@
+import importlib
+import sys
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """처음 속성에 접근할 때 실제 모듈을 import하는 대리(proxy) 모듈
+
+    plotly 등 무거운 라이브러리를 모듈 상단에서 바로 불러오지 않고,
+    차트를 처음 만들 때까지 import를 미뤄 앱 시작 시간을 줄인다.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__['_lazy_module'] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """import를 첫 사용 시점까지 미루는 모듈 객체 반환 (이미 로드된 경우 그대로 반환)"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
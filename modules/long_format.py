@@ -0,0 +1,31 @@
+"""월 레코드 <-> 긴 형식(년도, 월, 구분, 항목, 금액) 행 변환
+
+백업 내보내기(Excel/CSV/Parquet)와 일괄 가져오기가 같은 열 구성을 사용한다.
+모든 함수는 제너레이터라 전체 이력을 한 번에 메모리에 올리지 않는다.
+"""
+from typing import Dict, Any, Iterable, Iterator, Tuple
+
+from modules.categories import month_totals
+from modules.storage import KINDS
+
+LONG_COLUMNS = ('년도', '월', '구분', '항목', '금액')
+SUMMARY_COLUMNS = ('년도', '월', '총매출', '총매입', '순이익', '수익률(%)')
+
+
+def iter_long_rows(months: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[tuple]:
+    """(월 키, 월 레코드) 순회 -> (년도, 월, 구분, 항목, 금액) 행"""
+    for month_key, month_data in months:
+        year, month = (int(part) for part in month_key.split('-'))
+        for kind in KINDS:
+            for name, amount in month_data.get(kind, {}).items():
+                yield (year, month, kind, name, amount)
+
+
+def iter_month_summaries(months: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[tuple]:
+    """(월 키, 월 레코드) 순회 -> (년도, 월, 총매출, 총매입, 순이익, 수익률) 행"""
+    for month_key, month_data in months:
+        year, month = (int(part) for part in month_key.split('-'))
+        total_revenue, total_expense = month_totals(month_data)
+        net_profit = total_revenue - total_expense
+        profit_margin = round((net_profit / total_revenue * 100) if total_revenue > 0 else 0, 1)
+        yield (year, month, total_revenue, total_expense, net_profit, profit_margin)
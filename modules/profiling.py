@@ -0,0 +1,119 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+def payload_size(obj: Any) -> Optional[int]:
+    """처리한 데이터 크기 (len()이 가능한 객체의 항목 수, 아니면 None)"""
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+class Profiler:
+    """구간별 실행 시간/호출 횟수/데이터 크기 기록기
+
+    데코레이터(timed) 또는 컨텍스트 매니저(measure)로 주요 구간을 감싸 사용하며,
+    결과는 설정 화면의 "성능" 탭에서 확인하거나 JSON/Prometheus 텍스트로 내보낼 수 있다.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, size: Optional[int] = None):
+        """한 번의 실행 결과 기록"""
+        with self.lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = {
+                    'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'last_seconds': 0.0,
+                    'payload_total': 0, 'payload_last': None
+                }
+            stat['count'] += 1
+            stat['total_seconds'] += seconds
+            stat['max_seconds'] = max(stat['max_seconds'], seconds)
+            stat['last_seconds'] = seconds
+            if size is not None:
+                stat['payload_total'] += size
+                stat['payload_last'] = size
+
+    @contextmanager
+    def measure(self, name: str, size: Optional[int] = None):
+        """with 블록의 실행 시간 기록 (블록 안에서 info['size']로 데이터 크기 지정 가능)"""
+        info = {'size': size}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(name, time.perf_counter() - start, info['size'])
+
+    def timed(self, name: str, size_arg: Optional[int] = None, size_result: bool = False):
+        """함수 실행 시간 기록 데코레이터 (size_arg 위치 인자 또는 반환값의 크기를 함께 기록)"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                size = None
+                if size_result:
+                    size = payload_size(result)
+                elif size_arg is not None and len(args) > size_arg:
+                    size = payload_size(args[size_arg])
+                self.record(name, time.perf_counter() - start, size)
+                return result
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """현재까지의 기록 (평균 포함) 복사본"""
+        with self.lock:
+            result = {}
+            for name, stat in sorted(self.stats.items()):
+                entry = dict(stat)
+                entry['avg_seconds'] = stat['total_seconds'] / stat['count'] if stat['count'] else 0.0
+                result[name] = entry
+            return result
+
+    def reset(self):
+        """기록 초기화"""
+        with self.lock:
+            self.stats.clear()
+            self.started_at = time.time()
+
+    def to_json(self) -> str:
+        """JSON 형식으로 내보내기"""
+        return json.dumps({
+            'started_at': self.started_at,
+            'uptime_seconds': time.time() - self.started_at,
+            'sections': self.snapshot()
+        }, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = "rtb") -> str:
+        """Prometheus 텍스트 형식으로 내보내기"""
+        metrics = [
+            ('calls_total', 'counter', '구간 호출 횟수', 'count'),
+            ('seconds_total', 'counter', '구간 누적 실행 시간(초)', 'total_seconds'),
+            ('seconds_max', 'gauge', '구간 최대 실행 시간(초)', 'max_seconds'),
+            ('seconds_last', 'gauge', '구간 마지막 실행 시간(초)', 'last_seconds'),
+            ('payload_items_total', 'counter', '구간에서 처리한 누적 항목 수', 'payload_total'),
+        ]
+        sections = self.snapshot()
+        lines = []
+        for suffix, metric_type, help_text, field in metrics:
+            metric = f"{prefix}_profile_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for name, stat in sections.items():
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{metric}{{section="{label}"}} {stat[field]}')
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전체에서 공유하는 기본 프로파일러
+profiler = Profiler()
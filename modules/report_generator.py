@@ -1,13 +1,62 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable
 import pandas as pd
 
+from modules.categories import month_totals
+
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, cache_size: int = 64):
         self.company_name = "RTB"
         self.department = "회계팀"
+        
+        # (보고서 유형, 기간, 데이터 해시) -> (해당 월 목록, 보고서) LRU 캐시
+        self.cache_size = cache_size
+        self._report_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    @staticmethod
+    def _content_hash(*parts: Any) -> str:
+        """보고서 입력 데이터의 내용 해시"""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def _memoized(self, key: tuple, months: set, builder: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """캐시된 보고서가 있으면 반환하고, 없으면 생성 후 저장 (LRU 제거)"""
+        with self._cache_lock:
+            cached = self._report_cache.get(key)
+            if cached is not None:
+                self._report_cache.move_to_end(key)
+                return cached[1]
+        
+        report = builder()
+        with self._cache_lock:
+            self._report_cache[key] = (months, report)
+            self._report_cache.move_to_end(key)
+            while len(self._report_cache) > self.cache_size:
+                self._report_cache.popitem(last=False)
+        return report
+    
+    def invalidate_month(self, month_key: Optional[str] = None):
+        """특정 월이 포함된 보고서 캐시 제거 (None이면 전체 제거) - DataManager 변경 알림용"""
+        with self._cache_lock:
+            if month_key is None:
+                self._report_cache.clear()
+                return
+            stale_keys = [key for key, (months, _) in self._report_cache.items() if month_key in months]
+            for key in stale_keys:
+                del self._report_cache[key]
     
     def generate_monthly_report(self, year: int, month: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        """월말 보고서 생성 (같은 입력이면 캐시된 보고서 반환)"""
+        key = ('monthly', year, month, self._content_hash(data))
+        months = {f"{year}-{month:02d}"}
+        return self._memoized(key, months, lambda: self._build_monthly_report(year, month, data))
+    
+    def _build_monthly_report(self, year: int, month: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """월말 보고서 생성"""
         report = {
             'type': 'monthly',
@@ -23,6 +72,13 @@ class ReportGenerator:
         return report
     
     def generate_semi_annual_report(self, year: int, period: str, aggregated_data: Dict[str, Any], monthly_data: Dict[str, Any]) -> Dict[str, Any]:
+        """반기 보고서 생성 (같은 입력이면 캐시된 보고서 반환)"""
+        key = ('semi_annual', year, period, self._content_hash(aggregated_data, monthly_data))
+        month_range = range(1, 7) if "상반기" in period else range(7, 13)
+        months = {f"{year}-{month:02d}" for month in month_range} | set(monthly_data.keys())
+        return self._memoized(key, months, lambda: self._build_semi_annual_report(year, period, aggregated_data, monthly_data))
+    
+    def _build_semi_annual_report(self, year: int, period: str, aggregated_data: Dict[str, Any], monthly_data: Dict[str, Any]) -> Dict[str, Any]:
         """반기 보고서 생성"""
         report = {
             'type': 'semi_annual',
@@ -40,6 +96,12 @@ class ReportGenerator:
         return report
     
     def generate_annual_report(self, year: int, annual_data: Dict[str, Any], first_half: Dict[str, Any], second_half: Dict[str, Any]) -> Dict[str, Any]:
+        """연말 보고서 생성 (같은 입력이면 캐시된 보고서 반환)"""
+        key = ('annual', year, self._content_hash(annual_data, first_half, second_half))
+        months = {f"{year}-{month:02d}" for month in range(1, 13)}
+        return self._memoized(key, months, lambda: self._build_annual_report(year, annual_data, first_half, second_half))
+    
+    def _build_annual_report(self, year: int, annual_data: Dict[str, Any], first_half: Dict[str, Any], second_half: Dict[str, Any]) -> Dict[str, Any]:
         """연말 보고서 생성"""
         report = {
             'type': 'annual',
@@ -58,9 +120,8 @@ class ReportGenerator:
         return report
     
     def _calculate_monthly_summary(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """월별 요약 계산"""
-        total_revenue = sum(data.get('매출', {}).values())
-        total_expense = sum(data.get('매입', {}).values())
+        """월별 요약 계산 (저장된 소계가 있으면 다시 합산하지 않음)"""
+        total_revenue, total_expense = month_totals(data)
         net_profit = total_revenue - total_expense
         profit_margin = (net_profit / total_revenue * 100) if total_revenue > 0 else 0
         
@@ -83,10 +144,8 @@ class ReportGenerator:
         
         # 상하반기 비교
         if first_half and second_half:
-            first_revenue = sum(first_half.get('매출', {}).values())
-            second_revenue = sum(second_half.get('매출', {}).values())
-            first_expense = sum(first_half.get('매입', {}).values())
-            second_expense = sum(second_half.get('매입', {}).values())
+            first_revenue, first_expense = month_totals(first_half)
+            second_revenue, second_expense = month_totals(second_half)
             
             annual_summary.update({
                 'first_half_revenue': first_revenue,
@@ -106,19 +165,19 @@ class ReportGenerator:
         revenue_data = data.get('매출', {})
         expense_data = data.get('매입', {})
         
+        total_revenue, total_expense = month_totals(data)
+        
         # 매출 분석
         top_revenue = max(revenue_data.items(), key=lambda x: x[1]) if revenue_data else ("", 0)
         if top_revenue[1] > 0:
-            analysis.append(f"주요 매출처는 {top_revenue[0]}로 전체 매출의 {(top_revenue[1]/sum(revenue_data.values())*100):.1f}%를 차지합니다.")
+            analysis.append(f"주요 매출처는 {top_revenue[0]}로 전체 매출의 {(top_revenue[1]/total_revenue*100):.1f}%를 차지합니다.")
         
         # 매입 분석
         top_expense = max(expense_data.items(), key=lambda x: x[1]) if expense_data else ("", 0)
         if top_expense[1] > 0:
-            analysis.append(f"주요 매입 항목은 {top_expense[0]}로 전체 매입의 {(top_expense[1]/sum(expense_data.values())*100):.1f}%를 차지합니다.")
+            analysis.append(f"주요 매입 항목은 {top_expense[0]}로 전체 매입의 {(top_expense[1]/total_expense*100):.1f}%를 차지합니다.")
         
         # 수익성 분석
-        total_revenue = sum(revenue_data.values())
-        total_expense = sum(expense_data.values())
         profit_margin = ((total_revenue - total_expense) / total_revenue * 100) if total_revenue > 0 else 0
         
         if profit_margin > 20:
@@ -178,8 +237,7 @@ class ReportGenerator:
         """연간 성과 분석"""
         analysis = []
         
-        total_revenue = sum(annual_data.get('매출', {}).values())
-        total_expense = sum(annual_data.get('매입', {}).values())
+        total_revenue, total_expense = month_totals(annual_data)
         net_profit = total_revenue - total_expense
         
         # 매출 성과
@@ -0,0 +1,85 @@
+from typing import Dict, Any, Optional, Tuple
+
+KINDS = ('매출', '매입')
+
+PERIOD_TYPES = ('quarter', 'half', 'year', 'all')
+
+
+class RollupCache:
+    """분기/반기/연간/전체 기간 집계를 미리 계산해 두는 캐시
+
+    월 데이터가 저장/삭제될 때 해당 월이 속한 집계만 증분 갱신하므로
+    보고서 화면은 원본 월 데이터를 다시 순회하지 않고 합계를 바로 읽을 수 있다.
+    """
+
+    def __init__(self):
+        # {버킷: {구분: {거래처: 합계}}}
+        self.buckets: Dict[Tuple, Dict[str, Dict[str, Any]]] = {}
+        # {버킷: {구분: 합계}}
+        self.kind_totals: Dict[Tuple, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RollupCache':
+        """기존 월별 dict 데이터로 캐시 생성"""
+        cache = cls()
+        for month_key, month_data in data.items():
+            cache.apply(month_key, None, month_data)
+        return cache
+
+    @staticmethod
+    def bucket_key(period_type: str, year: int = None, index: int = None) -> Tuple:
+        """집계 버킷 키 생성 (quarter: 1-4, half: 1-2)"""
+        if period_type not in PERIOD_TYPES:
+            raise ValueError(f"지원하지 않는 집계 단위입니다: {period_type}")
+        if period_type == 'all':
+            return ('all',)
+        if period_type == 'year':
+            return ('year', year)
+        return (period_type, year, index)
+
+    @classmethod
+    def buckets_for_month(cls, month_key: str):
+        """특정 월이 속하는 모든 집계 버킷"""
+        year, month = (int(part) for part in month_key.split('-'))
+        return (
+            cls.bucket_key('quarter', year, (month - 1) // 3 + 1),
+            cls.bucket_key('half', year, 1 if month <= 6 else 2),
+            cls.bucket_key('year', year),
+            cls.bucket_key('all'),
+        )
+
+    def _add(self, month_key: str, month_data: Dict[str, Any], sign: int):
+        for bucket in self.buckets_for_month(month_key):
+            totals = self.buckets.setdefault(bucket, {kind: {} for kind in KINDS})
+            kind_totals = self.kind_totals.setdefault(bucket, {kind: 0 for kind in KINDS})
+            for kind in KINDS:
+                items = totals[kind]
+                for name, amount in month_data.get(kind, {}).items():
+                    total = items.get(name, 0) + sign * amount
+                    if total == 0:
+                        items.pop(name, None)
+                    else:
+                        items[name] = total
+                    kind_totals[kind] += sign * amount
+
+    def apply(self, month_key: str, old_data: Optional[Dict[str, Any]], new_data: Optional[Dict[str, Any]]):
+        """한 달의 변경 사항을 증분 반영 (old_data 차감 후 new_data 가산)"""
+        if old_data:
+            self._add(month_key, old_data, -1)
+        if new_data:
+            self._add(month_key, new_data, 1)
+
+    def get(self, period_type: str, year: int = None, index: int = None) -> Dict[str, Any]:
+        """aggregate_period_data와 동일한 형식의 집계 (0 이하 합계 제외)"""
+        totals = self.buckets.get(self.bucket_key(period_type, year, index), {})
+        return {
+            kind: {name: total for name, total in totals.get(kind, {}).items() if total > 0}
+            for kind in KINDS
+        }
+
+    def get_totals(self, period_type: str, year: int = None, index: int = None) -> Dict[str, Any]:
+        """구분별 총액 조회 (O(1))"""
+        kind_totals = self.kind_totals.get(self.bucket_key(period_type, year, index))
+        if not kind_totals:
+            return {kind: 0 for kind in KINDS}
+        return dict(kind_totals)
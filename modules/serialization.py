@@ -0,0 +1,59 @@
+"""JSON 직렬화 (orjson -> msgspec -> 표준 json 순으로 설치된 구현 사용)
+
+저장 파일과 저널은 공백 없는 compact 형식으로 기록하고, 사람이 읽는 백업 파일만
+pretty(들여쓰기 2칸) 형식을 사용한다. 어느 구현으로 기록해도 같은 UTF-8 JSON이므로
+기존 indent=2 파일과 서로 읽고 쓸 수 있다.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# 사용할 구현 (설치된 것 중 가장 빠른 것) - 호출할 때마다 이 값으로 분기
+BACKEND = 'orjson' if orjson is not None else 'msgspec' if msgspec is not None else 'json'
+AVAILABLE_BACKENDS = tuple(name for name, module in (('orjson', orjson), ('msgspec', msgspec), ('json', json))
+                           if module is not None)
+
+# 손상된 JSON을 읽을 때 구현별로 발생하는 예외 (msgspec.DecodeError는 ValueError가 아님)
+DecodeError = (ValueError, msgspec.DecodeError) if msgspec is not None else (ValueError,)
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """UTF-8 JSON 바이트로 직렬화 (기본 compact, pretty=True면 들여쓰기 2칸)"""
+    if BACKEND == 'orjson':
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if pretty else 0))
+    if BACKEND == 'msgspec':
+        encoded = _msgspec_encoder.encode(obj)
+        return msgspec.json.format(encoded, indent=2) if pretty else encoded
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """JSON 바이트/문자열 역직렬화 (손상된 입력이면 DecodeError 중 하나)"""
+    if BACKEND == 'orjson':
+        return orjson.loads(data)
+    if BACKEND == 'msgspec':
+        return _msgspec_decoder.decode(data)
+    return json.loads(data)
+
+
+def load_file(path: str) -> Any:
+    """JSON 파일 전체 읽기"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
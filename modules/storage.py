@@ -0,0 +1,829 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from modules.serialization import DecodeError, dumps, loads, load_file
+
+try:
+    import fcntl
+except ImportError:  # Windows - 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+KINDS = ('매출', '매입')
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """파일 변경 감지용 서명 (inode, 크기, 수정시각) - 파일이 없으면 None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def fsync_directory(directory: str):
+    """디렉토리 항목(파일 교체)을 디스크에 반영 - 지원하지 않는 플랫폼에서는 무시"""
+    try:
+        fd = os.open(directory, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_file(path: str):
+    """고유한 임시 파일(바이너리)에 기록 -> fsync -> os.replace -> 디렉토리 fsync
+
+    기록 중 중단되거나 여러 프로세스가 동시에 저장해도 대상 파일은 이전 내용 또는 새 내용 중 하나로만 남는다.
+    """
+    tmp_file = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def write_json_atomic(path: str, data: Any, pretty: bool = False):
+    """JSON 파일을 원자적으로 저장"""
+    with atomic_file(path) as f:
+        f.write(dumps(data, pretty=pretty))
+
+
+class FileLock:
+    """잠금 파일에 대한 fcntl.flock 배타 잠금 (프로세스 간)
+
+    열 때마다 별도의 잠금이므로 같은 프로세스에서도 중첩해서 잡지 않는다.
+    fcntl이 없는 플랫폼에서는 항상 성공한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """잠금 획득 - blocking=False면 다른 프로세스가 잡고 있을 때 바로 False"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        self.fd = fd
+        return True
+
+    def release(self):
+        """잠금 해제 (파일을 닫으면 flock도 풀림)"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def diff_months(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """두 전체 데이터 간 변경된 월 목록 ({월: 새 레코드 또는 삭제 시 None})"""
+    changes = {key: record for key, record in new.items() if old.get(key) != record}
+    changes.update({key: None for key in old if key not in new})
+    return changes
+
+
+class JsonStorage:
+    """JSON 파일 저장소 (기본값) - 저장 시 전체 파일을 다시 기록"""
+
+    supports_queries = False
+    # 저장할 때마다 전체를 다시 쓰므로 DataManager가 연속 저장을 한 번의 쓰기로 합칠 수 있음
+    coalesce_writes = True
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self.signature = None
+
+    def load(self) -> Dict[str, Any]:
+        """JSON 파일에서 전체 데이터 로드"""
+        self.signature = file_signature(self.data_file)
+        if os.path.exists(self.data_file):
+            return load_file(self.data_file)
+        return {}
+
+    def save_all(self, data: Dict[str, Any]):
+        """전체 데이터를 JSON 파일에 원자적으로 저장"""
+        write_json_atomic(self.data_file, data)
+        self.signature = file_signature(self.data_file)
+
+    def save_month(self, month_key: str, month_data: Dict[str, Any], data: Dict[str, Any]):
+        """특정 월 저장 (JSON은 전체 재기록)"""
+        self.save_all(data)
+
+    def save_many(self, months: Dict[str, Dict[str, Any]], data: Dict[str, Any]):
+        """여러 달 일괄 저장 (전체 재기록 한 번)"""
+        self.save_all(data)
+
+    def delete_month(self, month_key: str, data: Dict[str, Any]):
+        """특정 월 삭제 (JSON은 전체 재기록)"""
+        self.save_all(data)
+
+    def poll_changes(self, data: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """다른 프로세스가 파일을 바꿨으면 변경된 월만 반환 (변경 없으면 빈 dict)"""
+        if file_signature(self.data_file) == self.signature:
+            return {}
+        return diff_months(data, self.load())
+
+
+class JournaledJsonStorage(JsonStorage):
+    """JSON 스냅샷 + 추가 전용 저널 저장소
+
+    변경 사항은 저널에 한 줄(JSON)씩 추가되고, 로드 시 마지막 스냅샷 위에 재생된다.
+    저널이 임계 크기를 넘으면 백그라운드에서 새 스냅샷으로 압축(compaction)한다.
+    읽기(로드/변경 감지)는 마지막 완전한 줄까지만 읽고 파일을 수정하지 않으며,
+    기록은 저널 잠금(<base>.journal.lock)을 잡은 상태에서만 한다.
+    압축과 중단된 압축의 복구는 압축 잠금(<base>.compact.lock)을 잡은 프로세스 하나만 수행한다.
+    
+    이 저장소가 쓴 스냅샷의 CRC32는 <base>.journal.base에 남긴다. 스냅샷이 외부(야간 ERP 덮어쓰기 등)에서
+    교체되어 목록에 없으면 저널 항목 중 스냅샷 수정 시각 이후에 기록된 것(ts)만 재생하고,
+    다음 기록 시 압축으로 저널을 새 스냅샷에 합친다.
+    """
+
+    # 월 단위 저장은 저널 한 줄 추가라 합칠 필요 없음
+    coalesce_writes = False
+
+    def __init__(self, data_file: str, compact_threshold: int = 1024 * 1024):
+        super().__init__(data_file)
+        base = os.path.splitext(data_file)[0]
+        self.journal_file = base + ".journal"
+        self.compacting_file = base + ".journal.compacting"
+        self.journal_lock_file = base + ".journal.lock"
+        self.compact_lock_file = base + ".compact.lock"
+        self.snapshot_marker_file = base + ".journal.base"
+        self.compact_threshold = compact_threshold
+        self.lock = threading.RLock()
+        self.journal = None
+        self.compaction_thread = None
+        # 이 프로세스가 알고 있는 저널 상태 (inode, 읽거나 쓴 위치)
+        self.journal_inode = None
+        self.journal_offset = 0
+        # 마지막으로 확인한 스냅샷 (파일 서명, 외부 교체 시각 또는 None)
+        self._checked_snapshot = None
+
+    def _trusted_checksums(self) -> Optional[List[int]]:
+        """이 저장소가 기록한 스냅샷의 CRC32 목록 (아직 기록한 적이 없으면 None)"""
+        try:
+            return load_file(self.snapshot_marker_file)
+        except (OSError, *DecodeError):
+            return None
+
+    def _read_snapshot(self) -> Optional[bytes]:
+        if not os.path.exists(self.data_file):
+            return None
+        with open(self.data_file, 'rb') as f:
+            return f.read()
+
+    def _snapshot_cutoff(self, signature, raw: Optional[bytes] = None) -> Optional[int]:
+        """스냅샷이 외부에서 교체됐으면 그 수정 시각(ns), 이 저장소가 쓴 스냅샷이면 None
+
+        저널은 스냅샷 위에 쌓인 변경이므로, 외부 스냅샷 위에는 그 이후에 기록된 항목만 재생해야 한다.
+        """
+        if signature is None:
+            return None
+        checked = self._checked_snapshot
+        if checked is not None and checked[0] == signature:
+            return checked[1]
+        trusted = self._trusted_checksums()
+        cutoff = None
+        if trusted is not None:
+            if raw is None:
+                raw = self._read_snapshot()
+            if raw is not None and zlib.crc32(raw) not in trusted:
+                cutoff = signature[2]
+        self._checked_snapshot = (signature, cutoff)
+        return cutoff
+
+    def _record_snapshot(self, content: Optional[bytes]):
+        """기록할 스냅샷의 CRC32를 신뢰 목록에 추가 (교체 전에 호출 - 교체가 끝날 때까지 이전 것도 유지)"""
+        trusted = self._trusted_checksums() or []
+        write_json_atomic(self.snapshot_marker_file, trusted[-1:] + ([zlib.crc32(content)] if content is not None else []))
+
+    def _read_all(self) -> Dict[str, Any]:
+        """스냅샷 로드 후 저널 재생 (복구 작업 없음) - 외부에서 교체된 스냅샷이면 그 이후 항목만 재생"""
+        self.signature = file_signature(self.data_file)
+        raw = self._read_snapshot()
+        data = loads(raw) if raw is not None else {}
+        cutoff = self._snapshot_cutoff(self.signature, raw)
+        self._replay(self.compacting_file, data, cutoff)
+        self.journal_offset = self._replay(self.journal_file, data, cutoff)
+        journal_signature = file_signature(self.journal_file)
+        self.journal_inode = journal_signature[0] if journal_signature else None
+        return data
+
+    def load(self) -> Dict[str, Any]:
+        """스냅샷 로드 후 저널 재생 (중단된 압축이 있으면 먼저 복구)"""
+        with self.lock:
+            self._recover_compaction()
+            return self._read_all()
+
+    def _needs_compaction(self) -> bool:
+        """중단된 압축이 남았거나 스냅샷이 외부에서 교체되어 저널을 합쳐야 하는지 여부"""
+        return (os.path.exists(self.compacting_file)
+                or self._snapshot_cutoff(file_signature(self.data_file)) is not None)
+
+    def _recover_compaction(self):
+        """중단된 압축의 분리 저널, 또는 외부에서 교체된 스냅샷 이전의 저널을 스냅샷에 반영
+
+        압축 잠금을 바로 잡을 수 없으면 다른 프로세스가 압축 중이므로 건너뛴다.
+        """
+        if not self._needs_compaction():
+            return
+        lock = FileLock(self.compact_lock_file)
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            if self._needs_compaction():
+                self._compact()
+        except Exception as e:
+            print(f"저널 압축 복구 오류: {e}")
+        finally:
+            lock.release()
+
+    def _compact(self):
+        """디스크의 스냅샷 + 분리 저널로 새 스냅샷 작성 후 분리 저널 삭제 (압축 잠금 상태에서 호출)
+
+        메모리 상태가 아니라 디스크 내용을 합치므로 다른 프로세스가 기록한 항목도 보존되며,
+        현재 저널은 건드리지 않는다 (월 단위 put/delete라 새 스냅샷 위에 다시 재생해도 결과가 같음).
+        스냅샷이 외부에서 교체됐으면 저널 잠금도 잡고 현재 저널까지 합쳐 교체 이후의 항목만 남긴다.
+        """
+        raw = self._read_snapshot()
+        data = loads(raw) if raw is not None else {}
+        cutoff = self._snapshot_cutoff(file_signature(self.data_file), raw)
+        if cutoff is None:
+            if os.path.exists(self.compacting_file):
+                self._replay(self.compacting_file, data)
+                self._write_snapshot(data)
+                os.remove(self.compacting_file)
+            return
+
+        with FileLock(self.journal_lock_file):
+            for journal_file in (self.compacting_file, self.journal_file):
+                self._replay(journal_file, data, cutoff)
+            print(f"외부에서 교체된 스냅샷에 저널 반영: {self.data_file}")
+            self._write_snapshot(data)
+            for journal_file in (self.compacting_file, self.journal_file):
+                if os.path.exists(journal_file):
+                    os.remove(journal_file)
+
+    def _replay(self, journal_file: str, data: Dict[str, Any], since: Optional[int] = None) -> int:
+        """저널 파일의 변경 사항을 data에 적용하고 마지막 완전한 줄까지의 바이트 수 반환 (파일은 수정하지 않음)
+
+        다른 프로세스가 기록 중인 마지막 줄은 읽지 않고 남겨 두며, 이후 변경 감지에서 이어서 읽는다.
+        since(ns)가 있으면 그 이후에 기록된 항목만 적용한다.
+        """
+        if not os.path.exists(journal_file):
+            return 0
+        valid_size = 0
+        with open(journal_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = loads(line)
+                except DecodeError:
+                    break
+                if since is None or entry.get('ts', 0) > since:
+                    self._apply_entry(entry, data)
+                valid_size += len(line)
+        return valid_size
+
+    def _repair_tail(self):
+        """기록 도중 중단된(개행 없는) 마지막 줄 잘라내기 - 저널 잠금을 잡은 기록 측에서만 호출
+
+        잠금을 잡은 동안에는 다른 기록이 진행 중일 수 없으므로 남은 조각은 중단된 기록이다.
+        """
+        size = os.path.getsize(self.journal_file)
+        if size == 0:
+            return
+        with open(self.journal_file, 'rb') as f:
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            valid_size, position = 0, size
+            while position > 0:
+                start = max(0, position - 65536)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    valid_size = start + newline + 1
+                    break
+                position = start
+        print(f"저널 손상 줄 제거: {self.journal_file} ({valid_size} bytes 이후)")
+        os.truncate(self.journal_file, valid_size)
+
+    @staticmethod
+    def _apply_entry(entry: Dict[str, Any], data: Dict[str, Any]):
+        """저널 항목 하나를 data에 적용"""
+        if entry['op'] == 'put':
+            data[entry['key']] = entry['data']
+        elif entry['op'] == 'put_many':
+            data.update(entry['data'])
+        elif entry['op'] == 'delete':
+            data.pop(entry['key'], None)
+
+    def _close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def _append(self, entry: Dict[str, Any]):
+        """저널에 한 줄(기록 시각 ts 포함) 추가 후 필요 시 압축 시작 (저널 잠금 상태에서 기록)"""
+        entry = dict(entry, ts=time.time_ns())
+        with self.lock, FileLock(self.journal_lock_file):
+            if not os.path.exists(self.snapshot_marker_file):
+                # 이전 버전에서 만든 저널 - 지금 스냅샷을 저널의 기준으로 기록
+                self._record_snapshot(self._read_snapshot())
+            if self.journal is not None:
+                # 다른 프로세스가 저널을 회전(압축)했으면 분리된 파일이 아닌 새 저널에 기록
+                signature = file_signature(self.journal_file)
+                if signature is None or signature[0] != os.fstat(self.journal.fileno()).st_ino:
+                    self._close_journal()
+            if self.journal is None:
+                self.journal = open(self.journal_file, 'ab')
+                self.journal_inode = os.fstat(self.journal.fileno()).st_ino
+            self._repair_tail()
+            self.journal.write(dumps(entry) + b"\n")
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.journal_offset = self.journal.tell()
+
+            if (self.journal_offset >= self.compact_threshold
+                    or self._snapshot_cutoff(file_signature(self.data_file)) is not None):
+                self._start_compaction()
+
+    def _write_snapshot(self, data: Dict[str, Any]):
+        """임시 파일에 기록 후 교체하는 원자적 스냅샷 저장 (교체 전에 CRC32를 신뢰 목록에 기록)"""
+        content = dumps(data)
+        self._record_snapshot(content)
+        with atomic_file(self.data_file) as f:
+            f.write(content)
+
+    def _start_compaction(self):
+        """현재 저널을 분리하고 백그라운드에서 스냅샷으로 압축 (저널 잠금 상태에서 호출)
+
+        다른 프로세스가 압축 중이면(압축 잠금을 잡을 수 없으면) 이번에는 건너뛴다.
+        압축이 끝나면 스냅샷 서명이 바뀌므로 다음 변경 감지에서 디스크 기준으로 다시 맞춘다.
+        """
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        lock = FileLock(self.compact_lock_file)
+        if not lock.acquire(blocking=False):
+            return
+        # 중단된 압축이 남아 있으면 그것부터 합치고, 현재 저널은 다음 기회에 분리
+        if not os.path.exists(self.compacting_file):
+            self._close_journal()
+            os.replace(self.journal_file, self.compacting_file)
+            self.journal_inode = None
+            self.journal_offset = 0
+
+        def compact():
+            try:
+                self._compact()
+            except Exception as e:
+                print(f"저널 압축 오류: {e}")
+            finally:
+                lock.release()
+
+        self.compaction_thread = threading.Thread(target=compact, name="rtb-journal-compaction", daemon=True)
+        self.compaction_thread.start()
+
+    def wait_for_compaction(self):
+        """진행 중인 압축 완료 대기"""
+        thread = self.compaction_thread
+        if thread is not None:
+            thread.join()
+
+    def save_all(self, data: Dict[str, Any]):
+        """전체 데이터를 새 스냅샷으로 기록하고 저널 비움"""
+        self.wait_for_compaction()
+        with self.lock, FileLock(self.compact_lock_file), FileLock(self.journal_lock_file):
+            self._close_journal()
+            self._write_snapshot(data)
+            self.signature = file_signature(self.data_file)
+            for journal_file in (self.journal_file, self.compacting_file):
+                if os.path.exists(journal_file):
+                    os.remove(journal_file)
+            self.journal_inode = None
+            self.journal_offset = 0
+
+    def save_month(self, month_key: str, month_data: Dict[str, Any], data: Dict[str, Any]):
+        """특정 월 저장 (저널에 한 줄 추가)"""
+        self._append({'op': 'put', 'key': month_key, 'data': month_data})
+
+    def save_many(self, months: Dict[str, Dict[str, Any]], data: Dict[str, Any]):
+        """여러 달 일괄 저장 (저널 한 줄 - 재생 시 전부 적용되거나 전부 무시됨)"""
+        self._append({'op': 'put_many', 'data': months})
+
+    def delete_month(self, month_key: str, data: Dict[str, Any]):
+        """특정 월 삭제 (저널에 한 줄 추가)"""
+        self._append({'op': 'delete', 'key': month_key})
+
+    def poll_changes(self, data: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """다른 프로세스의 변경 감지 - 저널이 뒤에 추가되기만 했으면 추가된 줄만 재생"""
+        with self.lock:
+            if self.compaction_thread is not None and self.compaction_thread.is_alive():
+                return {}
+
+            journal_signature = file_signature(self.journal_file)
+            journal_inode = journal_signature[0] if journal_signature else None
+            journal_size = journal_signature[1] if journal_signature else 0
+            snapshot_unchanged = file_signature(self.data_file) == self.signature
+
+            if snapshot_unchanged and journal_inode == self.journal_inode:
+                if journal_size == self.journal_offset:
+                    return {}
+                if journal_size > self.journal_offset:
+                    return self._read_appended()
+
+            # 스냅샷 교체, 저널 회전 등은 전체 재로드 후 변경된 월만 반영
+            self._close_journal()
+            return diff_months(data, self._read_all())
+
+    def _read_appended(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """마지막으로 읽은 위치 이후 저널에 추가된 완전한 줄만 파싱"""
+        changes = {}
+        with open(self.journal_file, 'rb') as f:
+            f.seek(self.journal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 다른 프로세스가 기록 중인 줄
+                try:
+                    entry = loads(line)
+                except DecodeError:
+                    break
+                if entry['op'] == 'put_many':
+                    changes.update(entry['data'])
+                else:
+                    changes[entry['key']] = entry['data'] if entry['op'] == 'put' else None
+                self.journal_offset += len(line)
+        return changes
+
+
+class SqliteStorage:
+    """SQLite 저장소 - 정규화된 entries 테이블과 기간/거래처 인덱스 사용"""
+
+    supports_queries = True
+    coalesce_writes = False
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS months (
+            period TEXT PRIMARY KEY,
+            meta TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            period TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            counterparty TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            PRIMARY KEY (period, kind, counterparty)
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_period ON entries (period);
+        CREATE INDEX IF NOT EXISTS idx_entries_counterparty ON entries (counterparty, period);
+    """
+
+    def __init__(self, db_file: str, legacy_json_file: str = None):
+        self.db_file = db_file
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.data_version = self._data_version()
+
+        # 최초 실행 시 기존 JSON 데이터 이관
+        if legacy_json_file and os.path.exists(legacy_json_file) and self._is_empty():
+            self.save_all(JsonStorage(legacy_json_file).load())
+
+    def _is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM months LIMIT 1").fetchone() is None
+
+    def _write_month(self, month_key: str, month_data: Dict[str, Any]):
+        """트랜잭션 내부에서 한 달 기록"""
+        meta = {k: v for k, v in month_data.items() if k not in KINDS}
+        self.conn.execute(
+            "INSERT INTO months (period, meta) VALUES (?, ?) "
+            "ON CONFLICT(period) DO UPDATE SET meta = excluded.meta",
+            (month_key, json.dumps(meta, ensure_ascii=False))
+        )
+        self.conn.execute("DELETE FROM entries WHERE period = ?", (month_key,))
+        self.conn.executemany(
+            "INSERT INTO entries (period, kind, counterparty, amount) VALUES (?, ?, ?, ?)",
+            [
+                (month_key, kind, name, amount)
+                for kind in KINDS
+                for name, amount in month_data.get(kind, {}).items()
+            ]
+        )
+
+    def _build_months(self, month_rows, entry_rows) -> Dict[str, Any]:
+        """조회 결과를 월별 dict 형식으로 재구성"""
+        months = {}
+        for period, meta in month_rows:
+            record = {kind: {} for kind in KINDS}
+            record.update(json.loads(meta))
+            months[period] = record
+        for period, kind, name, amount in entry_rows:
+            if period in months:
+                months[period][kind][name] = amount
+        return months
+
+    def _data_version(self) -> int:
+        """다른 연결이 커밋할 때마다 바뀌는 SQLite data_version"""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll_changes(self, data: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """다른 프로세스가 DB를 변경했으면 변경된 월만 반환 (변경 없으면 빈 dict)"""
+        with self.lock:
+            if self._data_version() == self.data_version:
+                return {}
+            return diff_months(data, self.load())
+
+    def load(self) -> Dict[str, Any]:
+        """전체 데이터 로드"""
+        with self.lock:
+            self.data_version = self._data_version()
+            month_rows = self.conn.execute("SELECT period, meta FROM months ORDER BY period").fetchall()
+            entry_rows = self.conn.execute(
+                "SELECT period, kind, counterparty, amount FROM entries ORDER BY rowid"
+            ).fetchall()
+        return self._build_months(month_rows, entry_rows)
+
+    def save_all(self, data: Dict[str, Any]):
+        """전체 데이터 교체"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("DELETE FROM months")
+            for month_key, month_data in data.items():
+                self._write_month(month_key, month_data)
+
+    def save_month(self, month_key: str, month_data: Dict[str, Any], data: Dict[str, Any] = None):
+        """특정 월만 upsert (전체 재기록 없음)"""
+        with self.lock, self.conn:
+            self._write_month(month_key, month_data)
+
+    def save_many(self, months: Dict[str, Dict[str, Any]], data: Dict[str, Any] = None):
+        """여러 달 일괄 upsert (하나의 트랜잭션)"""
+        with self.lock, self.conn:
+            for month_key, month_data in months.items():
+                self._write_month(month_key, month_data)
+
+    def delete_month(self, month_key: str, data: Dict[str, Any] = None):
+        """특정 월 삭제"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM entries WHERE period = ?", (month_key,))
+            self.conn.execute("DELETE FROM months WHERE period = ?", (month_key,))
+
+    def get_range(self, start_key: str, end_key: str) -> Dict[str, Any]:
+        """기간 범위 조회 (period 인덱스 범위 스캔)"""
+        with self.lock:
+            month_rows = self.conn.execute(
+                "SELECT period, meta FROM months WHERE period BETWEEN ? AND ? ORDER BY period",
+                (start_key, end_key)
+            ).fetchall()
+            entry_rows = self.conn.execute(
+                "SELECT period, kind, counterparty, amount FROM entries "
+                "WHERE period BETWEEN ? AND ? ORDER BY rowid",
+                (start_key, end_key)
+            ).fetchall()
+        return self._build_months(month_rows, entry_rows)
+
+    def aggregate(self, month_keys: List[str]) -> Dict[str, Any]:
+        """월 목록에 대한 구분/거래처별 합계 (GROUP BY, 0 이하 합계 제외)"""
+        aggregated = {kind: {} for kind in KINDS}
+        if not month_keys:
+            return aggregated
+
+        placeholders = ", ".join("?" for _ in month_keys)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT kind, counterparty, SUM(amount) FROM entries "
+                f"WHERE period IN ({placeholders}) "
+                "GROUP BY kind, counterparty HAVING SUM(amount) > 0 "
+                "ORDER BY MIN(rowid)",
+                list(month_keys)
+            ).fetchall()
+        for kind, name, total in rows:
+            aggregated[kind][name] = total
+        return aggregated
+
+
+class ParquetStorage:
+    """Parquet 스냅샷 저장소 (pyarrow) - 긴 형식 (period, kind, counterparty, amount)
+
+    연도마다 row group 하나로 기록하고, 파일 메타데이터에 연도 -> row group 번호와
+    월별 부가 정보(입력일시, 소계 등)를 함께 저장한다. 읽기는 memory map을 사용하며,
+    기간 조회/집계는 해당 연도의 row group만 읽는다. 저장은 스냅샷 전체를 원자적으로 다시 기록한다.
+    """
+
+    supports_queries = True
+    # 월 단위 저장도 스냅샷 전체 재기록이므로 연속 저장을 합쳐서 기록
+    coalesce_writes = True
+
+    COLUMNS = ('period', 'kind', 'counterparty', 'amount')
+    MONTHS_KEY = b'rtb.months'
+    YEAR_INDEX_KEY = b'rtb.year_row_groups'
+
+    def __init__(self, parquet_file: str, legacy_json_file: str = None):
+        import pyarrow as pa
+
+        self.parquet_file = parquet_file
+        self.lock = threading.RLock()
+        self.signature = None
+        self.schema = pa.schema([
+            ('period', pa.string()),
+            ('kind', pa.string()),
+            ('counterparty', pa.string()),
+            ('amount', pa.int64())
+        ])
+
+        # 최초 실행 시 기존 JSON 데이터 이관
+        if legacy_json_file and os.path.exists(legacy_json_file) and not os.path.exists(parquet_file):
+            self.save_all(JsonStorage(legacy_json_file).load())
+
+    def _open(self):
+        """memory map으로 파일 열기 - (ParquetFile, 월별 부가 정보, 연도 -> row group 번호)"""
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(self.parquet_file, memory_map=True, read_dictionary=['period', 'kind', 'counterparty'])
+        metadata = parquet.schema_arrow.metadata or {}
+        months = loads(metadata.get(self.MONTHS_KEY, b'{}'))
+        year_index = loads(metadata.get(self.YEAR_INDEX_KEY, b'{}'))
+        return parquet, months, year_index
+
+    @staticmethod
+    def _build_months(table, months_meta: Dict[str, Any]) -> Dict[str, Any]:
+        """긴 형식 테이블과 월별 부가 정보를 월별 dict 형식으로 재구성"""
+        months = {}
+        for month_key, meta in months_meta.items():
+            record = {kind: {} for kind in KINDS}
+            record.update(meta)
+            months[month_key] = record
+        if table.num_rows == 0:
+            return months
+
+        # 문자열 열은 사전 인코딩(dictionary)으로 읽어 고유 값만 Python 문자열로 변환
+        def decoded(name):
+            column = table.column(name).combine_chunks()
+            if not hasattr(column, 'dictionary'):
+                column = column.dictionary_encode()
+            return column.indices.to_numpy(zero_copy_only=False), np.array(column.dictionary.to_pylist(), dtype=object)
+
+        period_codes, period_values = decoded('period')
+        kind_codes, kind_values = decoded('kind')
+        name_codes, name_values = decoded('counterparty')
+        names = name_values[name_codes].tolist()
+        amounts = table.column('amount').to_numpy().tolist()
+
+        # 행은 (period, kind) 순서로 기록되어 있으므로 연속 구간 단위로 dict 생성
+        boundaries = np.flatnonzero((period_codes[1:] != period_codes[:-1]) | (kind_codes[1:] != kind_codes[:-1])) + 1
+        starts = [0, *boundaries.tolist()]
+        ends = [*boundaries.tolist(), table.num_rows]
+        for start, end in zip(starts, ends):
+            record = months.get(period_values[period_codes[start]])
+            if record is not None:
+                record[kind_values[kind_codes[start]]].update(zip(names[start:end], amounts[start:end]))
+        return months
+
+    def _read_years(self, first_key: str, last_key: str, columns=None):
+        """월 키 범위에 걸친 연도의 row group만 읽기 - (테이블, 범위 내 월별 부가 정보)"""
+        import pyarrow.compute as pc
+
+        parquet, months_meta, year_index = self._open()
+        row_groups = [
+            year_index[str(year)] for year in range(int(first_key[:4]), int(last_key[:4]) + 1)
+            if str(year) in year_index
+        ]
+        table = parquet.read_row_groups(row_groups, columns=columns) if row_groups else self.schema.empty_table()
+        in_range = pc.and_(pc.greater_equal(table['period'], first_key), pc.less_equal(table['period'], last_key))
+        months_meta = {key: meta for key, meta in months_meta.items() if first_key <= key <= last_key}
+        return table.filter(in_range), months_meta
+
+    def load(self) -> Dict[str, Any]:
+        """전체 데이터 로드"""
+        with self.lock:
+            self.signature = file_signature(self.parquet_file)
+            if self.signature is None:
+                return {}
+            parquet, months_meta, _ = self._open()
+            table = parquet.read(columns=list(self.COLUMNS))
+        return self._build_months(table, months_meta)
+
+    def save_all(self, data: Dict[str, Any]):
+        """연도별 row group으로 스냅샷 전체를 임시 파일에 기록 후 교체"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        years = {}
+        for month_key in sorted(data):
+            month_data = data[month_key]
+            rows = years.setdefault(month_key[:4], [])
+            for kind in KINDS:
+                for name, amount in month_data.get(kind, {}).items():
+                    rows.append((month_key, kind, name, amount))
+
+        year_rows = [(year, rows) for year, rows in sorted(years.items()) if rows]
+        metadata = {
+            self.MONTHS_KEY: dumps(
+                {key: {k: v for k, v in record.items() if k not in KINDS} for key, record in data.items()}
+            ),
+            self.YEAR_INDEX_KEY: json.dumps({year: index for index, (year, _) in enumerate(year_rows)}).encode('utf-8')
+        }
+        schema = self.schema.with_metadata(metadata)
+
+        with self.lock:
+            with atomic_file(self.parquet_file) as f:
+                with pq.ParquetWriter(f, schema, compression='zstd') as writer:
+                    for _, rows in year_rows:
+                        arrays = [pa.array(column, type=field.type) for column, field in zip(zip(*rows), self.schema)]
+                        writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=len(rows))
+            self.signature = file_signature(self.parquet_file)
+
+    def save_month(self, month_key: str, month_data: Dict[str, Any], data: Dict[str, Any]):
+        """특정 월 저장 (스냅샷 재기록)"""
+        self.save_all(data)
+
+    def save_many(self, months: Dict[str, Dict[str, Any]], data: Dict[str, Any]):
+        """여러 달 일괄 저장 (스냅샷 재기록 한 번)"""
+        self.save_all(data)
+
+    def delete_month(self, month_key: str, data: Dict[str, Any]):
+        """특정 월 삭제 (스냅샷 재기록)"""
+        self.save_all(data)
+
+    def poll_changes(self, data: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """다른 프로세스가 파일을 바꿨으면 변경된 월만 반환 (변경 없으면 빈 dict)"""
+        with self.lock:
+            if file_signature(self.parquet_file) == self.signature:
+                return {}
+            return diff_months(data, self.load())
+
+    def get_range(self, start_key: str, end_key: str) -> Dict[str, Any]:
+        """기간 범위 조회 (해당 연도 row group만 읽음)"""
+        with self.lock:
+            if file_signature(self.parquet_file) is None:
+                return {}
+            table, months_meta = self._read_years(start_key, end_key, list(self.COLUMNS))
+        return self._build_months(table, months_meta)
+
+    def aggregate(self, month_keys: List[str]) -> Dict[str, Any]:
+        """월 목록에 대한 구분/거래처별 합계 (처음 나온 순서, 0 이하 합계 제외)"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        aggregated = {kind: {} for kind in KINDS}
+        if not month_keys or file_signature(self.parquet_file) is None:
+            return aggregated
+
+        with self.lock:
+            table, _ = self._read_years(min(month_keys), max(month_keys), list(self.COLUMNS))
+        table = table.filter(pc.is_in(table['period'], value_set=pa.array(list(month_keys), type=pa.string())))
+        totals = table.group_by(['kind', 'counterparty'], use_threads=False).aggregate([('amount', 'sum')])
+        for kind, name, total in zip(*(totals.column(name).to_pylist() for name in ('kind', 'counterparty', 'amount_sum'))):
+            if total > 0:
+                aggregated[kind][name] = total
+        return aggregated
+
+
+def create_storage(backend: str, data_file: str):
+    """저장소 백엔드 생성 (json | journal | sqlite | parquet)"""
+    if backend == "json":
+        return JsonStorage(data_file)
+    if backend == "journal":
+        return JournaledJsonStorage(data_file)
+    if backend == "sqlite":
+        db_file = os.path.splitext(data_file)[0] + ".db"
+        return SqliteStorage(db_file, legacy_json_file=data_file)
+    if backend == "parquet":
+        parquet_file = os.path.splitext(data_file)[0] + ".parquet"
+        return ParquetStorage(parquet_file, legacy_json_file=data_file)
+    raise ValueError(f"지원하지 않는 저장소 백엔드입니다: {backend}")
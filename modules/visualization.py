@@ -1,11 +1,64 @@
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
-from typing import Dict, Any
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from modules.categories import CategoryRegistry, get_category_registry, month_totals
+from modules.lazy_import import lazy_module
+from modules.profiling import profiler, payload_size
+
+# plotly는 첫 차트를 만들 때 로드 (앱 시작 시간 단축)
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
+pio = lazy_module("plotly.io")
+
+
+def cached_figure(method):
+    """차트 종류 + 입력 데이터 지문(fingerprint)으로 생성된 Figure를 직렬화(JSON)해 캐시
+
+    캐시는 세션 간에 공유되므로 Figure 객체 자체가 아니라 JSON을 보관하고, 호출마다 새 Figure로
+    복원해 반환한다 (호출 측에서 update_layout 등으로 수정해도 다른 세션의 차트는 바뀌지 않음).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # 분류 구성이 바뀌면 매출처 목록을 쓰는 차트도 다시 생성
+        key = (method.__name__, self.categories.signature(), self._fingerprint(args, kwargs))
+        with self._figure_lock:
+            cached = self._figure_cache.get(key)
+            if cached is not None:
+                self._figure_cache.move_to_end(key)
+        if cached is not None:
+            return pio.from_json(cached)
+        
+        first_arg = args[0] if args else None
+        with profiler.measure(f"visualization.{method.__name__}", payload_size(first_arg)):
+            fig = method(self, *args, **kwargs)
+            cached = fig.to_json()
+        with self._figure_lock:
+            self._figure_cache[key] = cached
+            while len(self._figure_cache) > self.figure_cache_size:
+                self._figure_cache.popitem(last=False)
+        return fig
+    return wrapper
+
 
 class VisualizationManager:
-    def __init__(self):
+    def __init__(self, figure_cache_size: int = 128, categories: Optional[CategoryRegistry] = None):
+        # 매출처/매입 항목 분류 설정 (없으면 기본 거래처 테이블 사용)
+        self._categories = categories
+        
+        # 차트 캐시 (동일한 입력이면 Figure를 다시 만들지 않고 JSON에서 복원)
+        self.figure_cache_size = figure_cache_size
+        self._figure_cache = OrderedDict()
+        self._figure_lock = threading.Lock()
+        
+        # 모든 차트가 공유하는 RTB 레이아웃 템플릿 (첫 차트 생성 시 한 번만 만듦)
+        self._layout_template: Optional[go.layout.Template] = None
+        
         # RTB 브랜드 색상 팔레트 (로고 색상에 가까운 버건디 기반)
         self.color_palette = [
             '#B8344F',  # RTB 로고 스타일 버건디
@@ -20,30 +73,61 @@ class VisualizationManager:
             '#E5E7EB'   # 매우 연한 그레이
         ]
     
+    @property
+    def layout_template(self) -> go.layout.Template:
+        """RTB 공통 레이아웃 템플릿 (지연 생성)"""
+        if self._layout_template is None:
+            with self._figure_lock:
+                if self._layout_template is None:
+                    self._layout_template = self._build_layout_template()
+        return self._layout_template
+    
+    @property
+    def categories(self) -> CategoryRegistry:
+        """매출처/매입 항목 분류 설정"""
+        if self._categories is None:
+            self._categories = get_category_registry()
+        return self._categories
+    
+    @staticmethod
+    def _build_layout_template() -> go.layout.Template:
+        """기본 plotly 템플릿에 RTB 공통 레이아웃(제목 정렬, 크기, 여백)을 더한 템플릿"""
+        template = go.layout.Template(pio.templates[pio.templates.default])
+        template.layout.update(
+            title=dict(x=0.5, xanchor='center'),
+            height=400,
+            margin=dict(t=50, b=50, l=50, r=50)
+        )
+        return template
+    
+    @staticmethod
+    def _fingerprint(args: tuple, kwargs: Dict[str, Any]) -> str:
+        """차트 입력 데이터 지문"""
+        payload = json.dumps([args, kwargs], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def _empty_figure(self, text: str) -> go.Figure:
+        """데이터가 없을 때 표시하는 안내 Figure"""
+        fig = go.Figure()
+        fig.add_annotation(
+            text=text,
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, xanchor='center', yanchor='middle',
+            showarrow=False, font_size=16
+        )
+        return fig
+    
+    @cached_figure
     def create_revenue_pie_chart(self, revenue_data: Dict[str, int]) -> go.Figure:
         """매출처별 파이차트 생성"""
         if not revenue_data or sum(revenue_data.values()) == 0:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("데이터가 없습니다")
         
         # 0이 아닌 값만 필터링
         filtered_data = {k: v for k, v in revenue_data.items() if v > 0}
         
         if not filtered_data:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="매출 데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("매출 데이터가 없습니다")
         
         labels = list(filtered_data.keys())
         values = list(filtered_data.values())
@@ -61,15 +145,12 @@ class VisualizationManager:
         )])
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '매출처별 분포',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 16, 'family': 'Inter, sans-serif', 'color': '#B8344F'}
             },
             showlegend=True,
-            height=400,
-            margin=dict(t=50, b=50, l=50, r=50),
             font=dict(family="Inter, sans-serif", size=12, color='#374151'),
             plot_bgcolor='white',
             paper_bgcolor='white'
@@ -77,30 +158,17 @@ class VisualizationManager:
         
         return fig
     
+    @cached_figure
     def create_expense_pie_chart(self, expense_data: Dict[str, int]) -> go.Figure:
         """매입 항목별 파이차트 생성"""
         if not expense_data or sum(expense_data.values()) == 0:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("데이터가 없습니다")
         
         # 0이 아닌 값만 필터링
         filtered_data = {k: v for k, v in expense_data.items() if v > 0}
         
         if not filtered_data:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="매입 데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("매입 데이터가 없습니다")
         
         labels = list(filtered_data.keys())
         values = list(filtered_data.values())
@@ -118,15 +186,12 @@ class VisualizationManager:
         )])
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '매입 항목별 분포',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 16, 'family': 'Inter, sans-serif', 'color': '#B8344F'}
             },
             showlegend=True,
-            height=400,
-            margin=dict(t=50, b=50, l=50, r=50),
             font=dict(family="Inter, sans-serif", size=12, color='#374151'),
             plot_bgcolor='white',
             paper_bgcolor='white'
@@ -134,17 +199,11 @@ class VisualizationManager:
         
         return fig
     
+    @cached_figure
     def create_monthly_trend_chart(self, monthly_data: Dict[str, Any]) -> go.Figure:
         """월별 추이 차트 생성"""
         if not monthly_data:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("데이터가 없습니다")
         
         # 데이터 준비
         months = sorted(monthly_data.keys())
@@ -154,8 +213,7 @@ class VisualizationManager:
         
         for month in months:
             data = monthly_data[month]
-            revenue = sum(data.get('매출', {}).values())
-            expense = sum(data.get('매입', {}).values())
+            revenue, expense = month_totals(data)
             profit = revenue - expense
             
             revenues.append(revenue)
@@ -210,16 +268,13 @@ class VisualizationManager:
         ))
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '월별 실적 추이',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 18}
             },
             xaxis_title="기간",
             yaxis_title="금액 (원)",
-            height=400,
-            margin=dict(t=50, b=50, l=50, r=50),
             font=dict(family="Arial", size=12),
             legend=dict(
                 orientation="h",
@@ -236,23 +291,14 @@ class VisualizationManager:
         
         return fig
     
+    @cached_figure
     def create_revenue_source_comparison(self, period_data: Dict[str, Any]) -> go.Figure:
         """매출처별 기간 비교 차트"""
         if not period_data:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("데이터가 없습니다")
         
         # 매출처별 월별 데이터 준비 (전자세금계산서매출 + 영세매출 + 기타)
-        electronic_tax_sources = ["Everllence Prime", "SUNJIN & FMD", "USNS", "RENK", "Vine Plant", "종합해사", "Jodiac", "BCKR"]
-        zero_rated_sources = ["Everllence LEO", "Mitsui"]
-        other_sources = ["기타"]
-        revenue_sources = electronic_tax_sources + [s for s in zero_rated_sources if s not in electronic_tax_sources] + other_sources
+        revenue_sources = self.categories.revenue_sources()
         months = sorted(period_data.keys())
         month_labels = [f"{month.split('-')[1]}월" for month in months]
         
@@ -276,17 +322,14 @@ class VisualizationManager:
                 ))
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '매출처별 월별 비교',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 18}
             },
             xaxis_title="월",
             yaxis_title="매출액 (원)",
             barmode='group',
-            height=400,
-            margin=dict(t=50, b=50, l=50, r=50),
             font=dict(family="Arial", size=12),
             legend=dict(
                 orientation="h",
@@ -301,31 +344,18 @@ class VisualizationManager:
         
         return fig
     
+    @cached_figure
     def create_expense_breakdown_chart(self, expense_data: Dict[str, int]) -> go.Figure:
         """매입 항목별 막대차트"""
         if not expense_data or sum(expense_data.values()) == 0:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("데이터가 없습니다")
         
         # 0이 아닌 값만 필터링 및 정렬
         filtered_data = {k: v for k, v in expense_data.items() if v > 0}
         sorted_data = dict(sorted(filtered_data.items(), key=lambda x: x[1], reverse=True))
         
         if not sorted_data:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="매입 데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("매입 데이터가 없습니다")
         
         items = list(sorted_data.keys())
         values = list(sorted_data.values())
@@ -342,16 +372,13 @@ class VisualizationManager:
         )])
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '매입 항목별 금액',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 18}
             },
             xaxis_title="매입 항목",
             yaxis_title="금액 (원)",
-            height=400,
-            margin=dict(t=50, b=50, l=50, r=50),
             font=dict(family="Arial", size=12)
         )
         
@@ -362,25 +389,18 @@ class VisualizationManager:
         
         return fig
     
+    @cached_figure
     def create_profit_analysis_chart(self, monthly_data: Dict[str, Any]) -> go.Figure:
         """수익률 분석 차트"""
         if not monthly_data:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("데이터가 없습니다")
         
         months = sorted(monthly_data.keys())
         profit_margins = []
         
         for month in months:
             data = monthly_data[month]
-            revenue = sum(data.get('매출', {}).values())
-            expense = sum(data.get('매입', {}).values())
+            revenue, expense = month_totals(data)
             profit_margin = ((revenue - expense) / revenue * 100) if revenue > 0 else 0
             profit_margins.append(profit_margin)
         
@@ -414,45 +434,29 @@ class VisualizationManager:
                      annotation_text="적정 기준 (10%)", annotation_position="right")
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '월별 수익률 분석',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 18}
             },
             xaxis_title="월",
             yaxis_title="수익률 (%)",
-            height=400,
-            margin=dict(t=50, b=50, l=50, r=50),
             font=dict(family="Arial", size=12)
         )
         
         return fig
     
+    @cached_figure
     def create_revenue_summary_pie_chart(self, revenue_summary: Dict[str, int]) -> go.Figure:
         """매출 구성 요약 파이차트 생성 (전자세금계산서/영세/기타)"""
         if not revenue_summary or sum(revenue_summary.values()) == 0:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="매출 데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("매출 데이터가 없습니다")
         
         # 0이 아닌 값만 필터링
         filtered_data = {k: v for k, v in revenue_summary.items() if v > 0}
         
         if not filtered_data:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="매출 데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("매출 데이터가 없습니다")
         
         labels = list(filtered_data.keys())
         values = list(filtered_data.values())
@@ -475,15 +479,12 @@ class VisualizationManager:
         )])
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '매출 구성 분포',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 16, 'family': 'Inter, sans-serif', 'color': '#B8344F'}
             },
             showlegend=True,
-            height=400,
-            margin=dict(t=50, b=50, l=50, r=50),
             font=dict(family="Inter, sans-serif", size=12, color='#374151'),
             plot_bgcolor='white',
             paper_bgcolor='white'
@@ -491,17 +492,11 @@ class VisualizationManager:
         
         return fig
     
+    @cached_figure
     def create_simple_monthly_trend(self, monthly_data: Dict[str, Any]) -> go.Figure:
         """심플한 월별 추이 차트 (매출/순이익만)"""
         if not monthly_data:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="데이터가 없습니다",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle',
-                showarrow=False, font_size=16
-            )
-            return fig
+            return self._empty_figure("데이터가 없습니다")
         
         # 데이터 준비
         months = sorted(monthly_data.keys())
@@ -510,8 +505,7 @@ class VisualizationManager:
         
         for month in months:
             data = monthly_data[month]
-            revenue = sum(data.get('매출', {}).values())
-            expense = sum(data.get('매입', {}).values())
+            revenue, expense = month_totals(data)
             profit = revenue - expense
             
             revenues.append(revenue)
@@ -549,10 +543,9 @@ class VisualizationManager:
         ))
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '월별 실적 추이',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 16}
             },
             xaxis_title="월",
@@ -574,7 +567,6 @@ class VisualizationManager:
                 xanchor="right",
                 x=1
             ),
-            height=400,
             margin=dict(t=60, b=50, l=50, r=50),
             font=dict(family="Arial", size=12),
             hovermode='x unified'
@@ -582,6 +574,7 @@ class VisualizationManager:
         
         return fig
     
+    @cached_figure
     def create_revenue_expense_comparison_chart(self, total_revenue: int, total_expense: int, net_profit: int) -> go.Figure:
         """매출 vs 매입 총액 비교 차트 생성 - 직관적인 색상과 디자인"""
         categories = ['매출', '매입', '순이익']
@@ -619,10 +612,9 @@ class VisualizationManager:
             fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.7, line_width=2)
         
         fig.update_layout(
+            template=self.layout_template,
             title={
                 'text': '매출 vs 매입 총액 비교',
-                'x': 0.5,
-                'xanchor': 'center',
                 'font': {'size': 16, 'family': 'Inter, sans-serif', 'color': '#374151'}
             },
             xaxis_title="구분",
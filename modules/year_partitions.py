@@ -0,0 +1,154 @@
+"""연도별 고정 폭 int64 행렬 파일 (numpy.memmap으로 읽는 읽기 전용 파티션)
+
+파일 하나가 한 해를 담는다:
+
+    0   매직 b"RTBYEAR1" (8바이트)
+    8   헤더 크기 (uint32, 페이지 단위로 올림 - 행렬이 페이지 경계에서 시작)
+    12  JSON 길이 (uint32)
+    16  JSON {"year", "months": [입력된 월], "columns": {"매출": [거래처 ID...], "매입": [...]}}
+    헤더 크기 이후: little-endian int64 행렬 [12(월), 매출 열 + 매입 열]
+
+열은 거래처 ID 기준이라 이름이 바뀌어도 파일을 다시 쓸 필요가 없다.
+파일은 고유한 임시 파일에 쓰고 fsync한 뒤 os.replace로 교체하므로, 다른 프로세스가 열어 둔
+memmap은 이전 내용을 그대로 보고 OS 페이지 캐시는 프로세스 간에 공유된다.
+"""
+import json
+import os
+import struct
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from modules.counterparties import KINDS, CounterpartyDirectory
+from modules.storage import atomic_file
+
+MAGIC = b"RTBYEAR1"
+PREAMBLE = struct.Struct("<8sII")
+PAGE_SIZE = 4096
+VALUE_DTYPE = np.dtype('<i8')
+
+
+class YearPartition:
+    """열린 연도 파티션 하나 (values는 파일을 직접 가리키는 읽기 전용 memmap)"""
+
+    def __init__(self, year: int, months: List[int], columns: Dict[str, List[int]], values: np.ndarray, signature: tuple):
+        self.year = year
+        self.months = tuple(months)
+        self.columns = {kind: list(columns.get(kind, [])) for kind in KINDS}
+        self.values = values
+        self.signature = signature
+
+        self.kind_slices = {}
+        offset = 0
+        for kind in KINDS:
+            width = len(self.columns[kind])
+            self.kind_slices[kind] = slice(offset, offset + width)
+            offset += width
+
+    def kind_view(self, kind: str) -> Tuple[List[int], np.ndarray]:
+        """(거래처 ID 목록, [12, 거래처 수] 뷰) - 복사 없이 memmap의 열 구간만 잘라 반환"""
+        return self.columns[kind], self.values[:, self.kind_slices[kind]]
+
+    def matches(self, months: List[int], columns: Dict[str, List[int]], matrix: np.ndarray) -> bool:
+        """파일 내용이 주어진 행렬과 같은지 여부 (같으면 다시 쓰지 않음)"""
+        return (list(self.months) == months and self.columns == columns
+                and self.values.shape == matrix.shape and np.array_equal(self.values, matrix))
+
+
+class YearPartitionStore:
+    """연도 파티션 파일 디렉토리 (쓰기는 해당 연도 전체 재작성, 읽기는 memmap 캐시)"""
+
+    def __init__(self, directory: str, counterparties: CounterpartyDirectory):
+        self.directory = directory
+        self.counterparties = counterparties
+        self._open: Dict[int, YearPartition] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, year: int) -> str:
+        return os.path.join(self.directory, f"{year}.year")
+
+    @staticmethod
+    def _signature(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def open(self, year: int) -> Optional[YearPartition]:
+        """연도 파티션 열기 (파일이 바뀌지 않았으면 기존 memmap 재사용, 없으면 None)"""
+        path = self.path_for(year)
+        signature = self._signature(path)
+        with self._lock:
+            partition = self._open.get(year)
+            if partition is not None and partition.signature == signature:
+                return partition
+            self._open.pop(year, None)
+            if signature is None:
+                return None
+
+            with open(path, 'rb') as f:
+                magic, header_size, json_length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+                if magic != MAGIC:
+                    raise ValueError(f"연도 파티션 형식이 아닙니다: {path}")
+                header = json.loads(f.read(json_length).decode('utf-8'))
+
+            width = sum(len(header['columns'].get(kind, [])) for kind in KINDS)
+            if width:
+                values = np.memmap(path, dtype=VALUE_DTYPE, mode='r', offset=header_size, shape=(12, width))
+            else:
+                # 빈 영역은 mmap할 수 없으므로 0열 배열로 대체
+                values = np.zeros((12, 0), dtype=VALUE_DTYPE)
+            partition = self._open[year] = YearPartition(header['year'], header['months'], header['columns'], values, signature)
+            return partition
+
+    def build(self, year: int, data: Dict[str, Any]) -> Tuple[List[int], Dict[str, List[int]], np.ndarray]:
+        """월별 dict 데이터에서 한 해의 (입력된 월, 구분별 거래처 ID 열, 행렬) 생성"""
+        months, entries = [], []
+        for month in range(1, 13):
+            month_data = data.get(f"{year}-{month:02d}")
+            if month_data is None:
+                continue
+            months.append(month)
+            for kind in KINDS:
+                for name, amount in month_data.get(kind, {}).items():
+                    cp_id = self.counterparties.find(kind, name)
+                    if cp_id is None:
+                        cp_id = self.counterparties.get_or_create(kind, name)
+                    entries.append((month - 1, kind, cp_id, int(amount)))
+
+        columns = {kind: sorted({cp_id for _, entry_kind, cp_id, _ in entries if entry_kind == kind}) for kind in KINDS}
+        positions = {}
+        for kind in KINDS:
+            for cp_id in columns[kind]:
+                positions[(kind, cp_id)] = len(positions)
+
+        matrix = np.zeros((12, len(positions)), dtype=VALUE_DTYPE)
+        for row, kind, cp_id, amount in entries:
+            matrix[row, positions[(kind, cp_id)]] = amount
+        return months, columns, matrix
+
+    def write(self, year: int, data: Dict[str, Any]) -> bool:
+        """한 해의 파티션을 다시 쓰기 (내용이 같으면 건너뜀, 입력된 월이 없으면 파일 삭제) - 썼으면 True"""
+        months, columns, matrix = self.build(year, data)
+        path = self.path_for(year)
+        if not months:
+            if os.path.exists(path):
+                os.remove(path)
+                return True
+            return False
+
+        existing = self.open(year)
+        if existing is not None and existing.matches(months, columns, matrix):
+            return False
+
+        header = json.dumps({'year': year, 'months': months, 'columns': columns}, separators=(',', ':')).encode('utf-8')
+        header_size = -(-(PREAMBLE.size + len(header)) // PAGE_SIZE) * PAGE_SIZE
+        with atomic_file(path) as f:
+            f.write(PREAMBLE.pack(MAGIC, header_size, len(header)))
+            f.write(header)
+            f.write(b"\0" * (header_size - PREAMBLE.size - len(header)))
+            f.write(matrix.tobytes())
+        return True
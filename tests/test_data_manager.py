@@ -0,0 +1,13 @@
+from modules.data_manager import DataManager
+
+
+def test_vectorized_aggregate_keeps_integer_amounts():
+    """정수(또는 정수 값 float) 금액의 집계 결과는 dict 경로와 같은 int"""
+    period_data = {
+        '2025-01': {'매출': {'USNS': 1_000, '영세매출': 2.0}, '매입': {'급여': 5}},
+        '2025-02': {'매출': {'USNS': 1.0}, '매입': {}},
+    }
+    aggregated = DataManager._aggregate_vectorized(period_data)
+
+    assert aggregated == {'매출': {'USNS': 1_001, '영세매출': 2}, '매입': {'급여': 5}}
+    assert all(type(amount) is int for kind in aggregated.values() for amount in kind.values())
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from modules import serialization
+from modules.categories import get_category_registry, source_fingerprint
+from modules.storage import JournaledJsonStorage
+
+BACKENDS = serialization.AVAILABLE_BACKENDS
+
+LARGE = 2 ** 63 - 1
+
+MONTH = {
+    '매출': {'전자세금계산서매출': 1_234_567_890_123, '영세매출': 0, '한국 거래처 (주)': LARGE},
+    '매입': {'급여': 35_000_000, '임차료': -1_500_000},
+}
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    monkeypatch.setattr(serialization, 'BACKEND', request.param)
+    return request.param
+
+
+@pytest.fixture
+def month_with_subtotals(tmp_path):
+    registry = get_category_registry(str(tmp_path / 'counterparties.json'))
+    return dict(MONTH, 소계=registry.compute_subtotals(MONTH))
+
+
+def _encode_with(name, obj, pretty=False):
+    previous = serialization.BACKEND
+    serialization.BACKEND = name
+    try:
+        return serialization.dumps(obj, pretty=pretty)
+    finally:
+        serialization.BACKEND = previous
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+def test_round_trip_korean_keys_and_large_ints(backend, month_with_subtotals, pretty):
+    data = {'2025-01': month_with_subtotals, '2025-02': MONTH}
+    encoded = serialization.dumps(data, pretty=pretty)
+    assert serialization.loads(encoded) == data
+    assert json.loads(encoded) == data
+    assert '전자세금계산서매출'.encode('utf-8') in encoded  # \uXXXX 이스케이프 없이 UTF-8 그대로
+
+
+@pytest.mark.parametrize('writer', BACKENDS)
+def test_output_readable_by_every_backend(backend, writer, month_with_subtotals):
+    data = {'2025-01': month_with_subtotals}
+    assert serialization.loads(_encode_with(writer, data)) == data
+
+
+def test_reads_legacy_indented_files(backend, month_with_subtotals):
+    legacy = json.dumps({'2025-01': month_with_subtotals}, ensure_ascii=False, indent=2).encode('utf-8')
+    assert serialization.loads(legacy) == {'2025-01': month_with_subtotals}
+
+
+def test_compact_output_is_identical_across_backends(month_with_subtotals):
+    """소계 지문(source_fingerprint)이 구현과 무관하도록 compact 출력 바이트가 같아야 함"""
+    outputs = {name: _encode_with(name, month_with_subtotals) for name in BACKENDS}
+    assert len(set(outputs.values())) == 1, outputs
+
+
+def test_source_fingerprint_stable_across_backends(monkeypatch):
+    fingerprints = set()
+    for name in BACKENDS:
+        monkeypatch.setattr(serialization, 'BACKEND', name)
+        fingerprints.add(source_fingerprint(MONTH))
+    assert len(fingerprints) == 1
+
+
+def test_decode_error_covers_backend(backend):
+    with pytest.raises(serialization.DecodeError):
+        serialization.loads(b'{"op": "put", "ke')
+
+
+def test_journal_lines_round_trip(backend, tmp_path, month_with_subtotals):
+    storage = JournaledJsonStorage(str(tmp_path / 'rtb_data.json'))
+    data = storage.load()
+    storage.save_month('2025-01', month_with_subtotals, data)
+    storage.save_many({'2025-02': MONTH, '2025-03': MONTH}, data)
+    storage.delete_month('2025-03', data)
+
+    assert JournaledJsonStorage(str(tmp_path / 'rtb_data.json')).load() == {
+        '2025-01': month_with_subtotals, '2025-02': MONTH}
+
+
+def test_torn_journal_line_does_not_abort_load(backend, tmp_path):
+    storage = JournaledJsonStorage(str(tmp_path / 'rtb_data.json'))
+    storage.save_month('2025-01', MONTH, storage.load())
+    with open(storage.journal_file, 'ab') as f:
+        f.write(b'{"op": "put", "ke\n')
+        f.write(b'{"op": "put", "key": "2025-02", "da')
+
+    reader = JournaledJsonStorage(str(tmp_path / 'rtb_data.json'))
+    assert reader.load() == {'2025-01': MONTH}
+    assert reader.poll_changes({'2025-01': MONTH}) == {}
@@ -0,0 +1,85 @@
+import json
+import os
+import time
+
+from modules.storage import JournaledJsonStorage
+
+
+def _month(amount):
+    return {'매출': {'USNS': amount}, '매입': {}}
+
+
+def _overwrite_externally(path, data):
+    """ERP 야간 덮어쓰기처럼 저장소를 거치지 않고 스냅샷 교체"""
+    time.sleep(0.01)
+    with open(path + '.erp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(path + '.erp', path)
+
+
+def test_external_overwrite_drops_older_journal_entries(tmp_path):
+    """외부에서 교체된 스냅샷 위에 그 이전 저널 항목을 다시 재생하지 않음"""
+    data_file = str(tmp_path / 'rtb_data.json')
+    storage = JournaledJsonStorage(data_file)
+    data = storage.load()
+    data['2025-01'] = _month(2)
+    storage.save_month('2025-01', data['2025-01'], data)
+
+    _overwrite_externally(data_file, {'2025-01': _month(999), '2025-02': _month(5)})
+
+    changes = storage.poll_changes(data)
+    assert changes['2025-01'] == _month(999)
+    assert changes['2025-02'] == _month(5)
+
+    reloaded = JournaledJsonStorage(data_file).load()
+    assert reloaded == {'2025-01': _month(999), '2025-02': _month(5)}
+
+
+def test_load_folds_journal_into_external_snapshot(tmp_path):
+    """외부 교체 후 첫 로드에서 이전 저널을 정리하고, 이후 기록은 그대로 재생됨"""
+    data_file = str(tmp_path / 'rtb_data.json')
+    storage = JournaledJsonStorage(data_file)
+    data = storage.load()
+    storage.save_month('2025-01', _month(2), data)
+
+    _overwrite_externally(data_file, {'2025-01': _month(999)})
+
+    writer = JournaledJsonStorage(data_file)
+    data = writer.load()
+    assert data == {'2025-01': _month(999)}
+    assert not os.path.exists(writer.journal_file)
+
+    writer.save_month('2025-03', _month(7), data)
+    assert JournaledJsonStorage(data_file).load() == {'2025-01': _month(999), '2025-03': _month(7)}
+
+
+def test_entries_written_after_external_overwrite_are_kept(tmp_path):
+    """외부 교체 이후 (정리 전에) 기록된 항목은 유지되고, 압축 후 스냅샷에 합쳐짐"""
+    data_file = str(tmp_path / 'rtb_data.json')
+    storage = JournaledJsonStorage(data_file)
+    data = storage.load()
+    storage.save_month('2025-01', _month(2), data)
+
+    _overwrite_externally(data_file, {'2025-01': _month(999)})
+
+    storage.save_month('2025-03', _month(7), data)
+    storage.wait_for_compaction()
+
+    expected = {'2025-01': _month(999), '2025-03': _month(7)}
+    assert JournaledJsonStorage(data_file).load() == expected
+    with open(data_file, 'rb') as f:
+        assert json.loads(f.read()) == expected
+    assert not os.path.exists(storage.journal_file)
+    assert not os.path.exists(storage.compacting_file)
+
+
+def test_own_compaction_is_not_treated_as_external(tmp_path):
+    """저장소가 직접 쓴 스냅샷 위에서는 저널을 모두 재생"""
+    data_file = str(tmp_path / 'rtb_data.json')
+    storage = JournaledJsonStorage(data_file, compact_threshold=256)
+    data = storage.load()
+    for month in range(1, 13):
+        storage.save_month(f"2025-{month:02d}", _month(month), data)
+        storage.wait_for_compaction()
+
+    assert JournaledJsonStorage(data_file).load() == {f"2025-{month:02d}": _month(month) for month in range(1, 13)}